@@ -1,20 +1,36 @@
-from pathlib import Path
-from dotenv import load_dotenv
+import asyncio
+from contextlib import asynccontextmanager
 
-load_dotenv(Path(__file__).resolve().parent / ".env")
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import digest, settings
-import os
+from services.config import get_settings
 
-app = FastAPI(title="Connection OS API")
 
-_raw = os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000")
-_allowed_origins = [o.strip() for o in _raw.split(",") if o.strip()]
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts the scheduler, warms clients off the request path and picks up
+    message batches a previous process left pending; closes clients on shutdown.
+    """
+    from services.batch_synthesizer import resume_pending_batches
+    from services.clients import close_clients, warm_up
+    from services.cron_jobs import start_cron_jobs
+
+    start_cron_jobs()
+    warming = asyncio.create_task(asyncio.to_thread(warm_up))
+    resuming = asyncio.create_task(resume_pending_batches())
+    yield
+    await warming
+    resuming.cancel()
+    await close_clients()
+
+
+app = FastAPI(title="Connection OS API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=_allowed_origins,
+    allow_origins=list(get_settings().allowed_origins),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -24,10 +40,13 @@ app.include_router(digest.router, prefix="/digest", tags=["Digest"])
 app.include_router(settings.router, prefix="/settings", tags=["Settings"])
 
 
-@app.on_event("startup")
-def start_scheduler():
-    from services.cron_jobs import start_cron_jobs
-    start_cron_jobs()
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint for digest pipeline stage metrics."""
+    from fastapi.responses import PlainTextResponse
+    from services.telemetry import render_prometheus
+
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/")
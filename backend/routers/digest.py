@@ -1,35 +1,47 @@
+import json
 import os
 from datetime import date, timedelta
 from typing import Any, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from supabase import create_client
+
+from services.db import execute, run
 
 router = APIRouter()
 
 
 def get_supabase():
-    return create_client(
-        os.environ.get("SUPABASE_URL", ""),
-        os.environ.get("SUPABASE_SERVICE_KEY", ""),
-    )
+    """Shared client, built on first use — importing the router stays cheap."""
+    from services.clients import get_supabase as shared_supabase
+
+    return shared_supabase()
 
 
 class GenerateRequest(BaseModel):
     week_start: Optional[str] = None
+    all_audiences: bool = False
+    batch: bool = False  # submit through the Message Batches API (half price, slower)
+
+
+def for_audience(query, audience_id: Optional[str]):
+    """Scopes a digests query to one audience — the primary reader when None."""
+    if audience_id:
+        return query.eq("audience_id", audience_id)
+    return query.is_("audience_id", "null")
 
 
 @router.get("/latest")
-async def get_latest_digest() -> dict[str, Any]:
+async def get_latest_digest(audience_id: Optional[str] = None) -> dict[str, Any]:
     """Returns most recent digest and marks it as read."""
     supabase = get_supabase()
 
-    result = supabase.table("digests") \
-        .select("*") \
-        .order("generated_at", desc=True) \
-        .limit(1) \
-        .execute()
+    result = await execute(
+        for_audience(supabase.table("digests").select("*"), audience_id)
+        .order("generated_at", desc=True)
+        .limit(1)
+    )
 
     if not result.data:
         return {"digest": None}
@@ -37,37 +49,42 @@ async def get_latest_digest() -> dict[str, Any]:
     digest = result.data[0]
 
     # Mark as read
-    supabase.table("digests") \
-        .update({"is_read": True, "read_at": "now()"}) \
-        .eq("id", digest["id"]) \
-        .execute()
+    await execute(
+        supabase.table("digests")
+        .update({"is_read": True, "read_at": "now()"})
+        .eq("id", digest["id"])
+    )
 
     digest["is_read"] = True
     return {"digest": digest}
 
 
 @router.get("/all")
-async def get_all_digests() -> dict[str, Any]:
+async def get_all_digests(audience_id: Optional[str] = None) -> dict[str, Any]:
     """Returns all digests newest first (list view — no full content)."""
     supabase = get_supabase()
 
-    result = supabase.table("digests") \
-        .select("id, week_number, week_start, week_end, week_summary, external_source_count, is_read, generated_at") \
-        .order("generated_at", desc=True) \
-        .execute()
+    result = await execute(
+        for_audience(
+            supabase.table("digests")
+            .select("id, week_number, week_start, week_end, week_summary, external_source_count, is_read, generated_at"),
+            audience_id,
+        )
+        .order("generated_at", desc=True)
+    )
 
     return {"digests": result.data or []}
 
 
 @router.get("/stats")
-async def get_stats() -> dict[str, Any]:
+async def get_stats(audience_id: Optional[str] = None) -> dict[str, Any]:
     """Returns dashboard overview stats."""
     supabase = get_supabase()
 
-    all_result = supabase.table("digests") \
-        .select("id, week_number, is_read, generated_at") \
-        .order("generated_at", desc=True) \
-        .execute()
+    all_result = await execute(
+        for_audience(supabase.table("digests").select("id, week_number, is_read, generated_at"), audience_id)
+        .order("generated_at", desc=True)
+    )
 
     digests = all_result.data or []
     total = len(digests)
@@ -93,16 +110,120 @@ async def get_stats() -> dict[str, Any]:
     }
 
 
+@router.get("/search")
+async def search_digests(q: str, limit: int = 20, audience_id: Optional[str] = None) -> dict[str, Any]:
+    """Full-text search over the archive — ranked, with highlighted snippets."""
+    from services.digest_search import search_digests as run_search
+
+    if len(q.strip()) < 2:
+        raise HTTPException(status_code=400, detail="Query must be at least 2 characters.")
+
+    results = await run(run_search, get_supabase(), q.strip(), min(max(limit, 1), 50), audience_id)
+    return {"query": q, "results": results}
+
+
+@router.get("/trends")
+async def get_trends(
+    kind: str = "company",
+    top: int = 10,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    key: Optional[list[str]] = Query(None),
+    audience_id: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Weekly mention counts for companies, industries or topics, read from
+    aggregates maintained as digests are stored.
+    """
+    from services.local_store import is_seeded
+    from services.trends import KINDS, TRENDS_PATH, query_trends, rebuild_from_digests
+
+    if kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(KINDS)}")
+    for bound in (since, until):
+        if bound:
+            try:
+                date.fromisoformat(bound)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+
+    if not await run(is_seeded, TRENDS_PATH):
+        # Fresh disk after a restart or deploy — count the archive once
+        await run(rebuild_from_digests, get_supabase())
+    return await run(query_trends, kind, min(max(top, 1), 50), since, until, audience_id, key)
+
+
+async def _feed_response(fmt: str, request: Request, audience_id: Optional[str]) -> Response:
+    """Serves a pre-rendered feed, or a 304 when the reader's copy is current."""
+    from services.digest_feed import (
+        DIGEST_FEED_PATH, FORMATS, feed_body, feed_headers, not_modified, rebuild_from_digests,
+    )
+    from services.local_store import is_seeded
+
+    if not await run(is_seeded, DIGEST_FEED_PATH):
+        # Seed even if a digest stored since the restart has already rendered a feed
+        await run(rebuild_from_digests, get_supabase())
+    headers = await run(feed_headers, fmt, audience_id)
+    if headers is None:
+        raise HTTPException(status_code=404, detail="No digests for this audience")
+
+    if not_modified(headers, request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=headers)
+    return Response(await run(feed_body, fmt, audience_id), media_type=FORMATS[fmt], headers=headers)
+
+
+@router.get("/feed.xml")
+async def get_feed_xml(request: Request, audience_id: Optional[str] = None) -> Response:
+    """Atom feed of the latest digests, rebuilt only when a digest is stored."""
+    return await _feed_response("xml", request, audience_id)
+
+
+@router.get("/feed.json")
+async def get_feed_json(request: Request, audience_id: Optional[str] = None) -> Response:
+    """JSON Feed 1.1 of the latest digests, rebuilt only when a digest is stored."""
+    return await _feed_response("json", request, audience_id)
+
+
+@router.get("/stream")
+async def stream_digest(week_start: Optional[str] = None) -> StreamingResponse:
+    """
+    Generates a digest and streams it as server-sent events.
+    Emits each digest section (week_summary first) as soon as the
+    model finishes writing it, then a final "done" event.
+    """
+    from services.digest_synthesizer import stream_digest as run_stream
+
+    if week_start:
+        try:
+            start = date.fromisoformat(week_start)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+    else:
+        today = date.today()
+        start = today - timedelta(days=today.weekday())
+
+    async def event_source():
+        async for event, payload in run_stream(start):
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{digest_id}")
 async def get_digest(digest_id: str) -> dict[str, Any]:
     """Returns full digest by ID and marks it as read."""
     supabase = get_supabase()
 
-    result = supabase.table("digests") \
-        .select("*") \
-        .eq("id", digest_id) \
-        .limit(1) \
-        .execute()
+    result = await execute(
+        supabase.table("digests")
+        .select("*")
+        .eq("id", digest_id)
+        .limit(1)
+    )
 
     if not result.data:
         raise HTTPException(status_code=404, detail="Digest not found")
@@ -110,10 +231,11 @@ async def get_digest(digest_id: str) -> dict[str, Any]:
     digest = result.data[0]
 
     # Mark as read
-    supabase.table("digests") \
-        .update({"is_read": True, "read_at": "now()"}) \
-        .eq("id", digest_id) \
-        .execute()
+    await execute(
+        supabase.table("digests")
+        .update({"is_read": True, "read_at": "now()"})
+        .eq("id", digest_id)
+    )
 
     digest["is_read"] = True
     return {"digest": digest}
@@ -124,6 +246,7 @@ async def generate_digest(body: GenerateRequest = None) -> dict[str, Any]:
     """Triggers digest generation as a background task to avoid gateway timeouts."""
     import asyncio
     from services.digest_synthesizer import generate_digest as run_generate
+    from services.digest_synthesizer import generate_digests_for_audiences
 
     if body and body.week_start:
         try:
@@ -136,7 +259,13 @@ async def generate_digest(body: GenerateRequest = None) -> dict[str, Any]:
 
     # Run generation in background so the HTTP response returns immediately
     # (digest takes 60-90s — longer than Railway/Vercel gateway timeouts)
-    asyncio.create_task(run_generate(week_start))
+    if body and body.batch:
+        from services.batch_synthesizer import generate_digests_batch
+        asyncio.create_task(generate_digests_batch([week_start], None if body.all_audiences else [None]))
+    elif body and body.all_audiences:
+        asyncio.create_task(generate_digests_for_audiences(week_start))
+    else:
+        asyncio.create_task(run_generate(week_start))
 
     return {
         "success": True,
@@ -1,18 +1,18 @@
-import os
 from typing import Any, Optional
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from supabase import create_client
+
+from services.db import execute
 
 router = APIRouter()
 
 
 def get_supabase():
-    return create_client(
-        os.environ.get("SUPABASE_URL", ""),
-        os.environ.get("SUPABASE_SERVICE_KEY", ""),
-    )
+    """Shared client, built on first use — importing the router stays cheap."""
+    from services.clients import get_supabase as shared_supabase
+
+    return shared_supabase()
 
 
 class SettingsUpdate(BaseModel):
@@ -36,10 +36,11 @@ async def get_settings() -> dict[str, Any]:
     """Returns current settings row."""
     supabase = get_supabase()
 
-    result = supabase.table("settings") \
-        .select("*") \
-        .limit(1) \
-        .execute()
+    result = await execute(
+        supabase.table("settings")
+        .select("*")
+        .limit(1)
+    )
 
     if not result.data:
         raise HTTPException(status_code=404, detail="No settings found")
@@ -55,15 +56,16 @@ async def update_settings(payload: SettingsUpdate) -> dict[str, Any]:
     updates = {k: v for k, v in payload.model_dump().items() if v is not None or k in ('slack_token', 'slack_connected')}
     updates["updated_at"] = "now()"
 
-    existing = supabase.table("settings").select("id").limit(1).execute()
+    existing = await execute(supabase.table("settings").select("id").limit(1))
 
     if not existing.data:
         raise HTTPException(status_code=404, detail="No settings row found")
 
-    result = supabase.table("settings") \
-        .update(updates) \
-        .eq("id", existing.data[0]["id"]) \
-        .execute()
+    result = await execute(
+        supabase.table("settings")
+        .update(updates)
+        .eq("id", existing.data[0]["id"])
+    )
 
     return {"settings": result.data[0] if result.data else updates}
 
@@ -88,15 +90,15 @@ async def test_slack_connection(payload: SlackTestPayload) -> dict[str, Any]:
 
     # Save credentials now that the connection is confirmed
     supabase = get_supabase()
-    existing = supabase.table("settings").select("id").limit(1).execute()
+    existing = await execute(supabase.table("settings").select("id").limit(1))
     if existing.data:
-        supabase.table("settings").update({
+        await execute(supabase.table("settings").update({
             "slack_token": payload.token,
             "slack_channel": payload.channel_id,
             "slack_connected": True,
             "slack_last_synced": None,
             "updated_at": "now()",
-        }).eq("id", existing.data[0]["id"]).execute()
+        }).eq("id", existing.data[0]["id"]))
 
     return {"success": True, "channel_name": channel_name}
 
@@ -114,15 +116,24 @@ async def send_test_email() -> dict[str, Any]:
     return result
 
 
+@router.get("/model-routing")
+async def get_model_routing() -> dict[str, Any]:
+    """Returns the stage-to-model table and per-stage latency/cost since startup."""
+    from services.model_router import routing_table, stage_report
+
+    return {"routing": routing_table(), "stages": stage_report()}
+
+
 @router.get("/email-log")
 async def get_email_log() -> dict[str, Any]:
     """Returns last 10 email sends."""
     supabase = get_supabase()
 
-    result = supabase.table("email_log") \
-        .select("id, week_number, subject, sent_to, sent_at, status") \
-        .order("sent_at", desc=True) \
-        .limit(10) \
-        .execute()
+    result = await execute(
+        supabase.table("email_log")
+        .select("id, week_number, subject, sent_to, sent_at, status, size_bytes")
+        .order("sent_at", desc=True)
+        .limit(10)
+    )
 
     return {"email_log": result.data or []}
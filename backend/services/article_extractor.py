@@ -0,0 +1,281 @@
+import asyncio
+import os
+import re
+import sqlite3
+import time
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+
+from services.clients import http_client
+from services.local_store import connect
+from services.story_memory import normalize_url
+from services.telemetry import span
+
+# ── Article full-text extraction ─────────────────────────────────────────────
+# Optional (ARTICLE_EXTRACTION=1). Scraped summaries are often one thin
+# sentence, so the model falls back to web search. This stage fetches each
+# article's HTML through one pooled client and runs boilerplate removal and
+# readability-style scoring in a small shared process pool, so thousands of
+# pages never block the event loop. Text is cached by URL; pages that failed
+# to download are not cached at all, and pages with no readable text are
+# retried after EMPTY_CACHE_TTL_HOURS.
+
+ARTICLE_CACHE_PATH = Path(__file__).resolve().parents[1] / "data" / "article_cache.db"
+
+PER_HOST_LIMIT = 4
+MAX_IN_FLIGHT = 32          # pages being downloaded or parsed at once
+MAX_HTML_BYTES = 2_000_000  # larger pages are cut here
+EXTRACT_CHARS = 4000        # text kept per article
+PROMPT_CHARS = 1500         # of which the selection prompt sees this much
+CACHE_TTL_DAYS = 30
+EMPTY_CACHE_TTL_HOURS = 24
+# os.cpu_count() inside a dyno reports the host's cores, not the dyno's share
+DEFAULT_WORKERS = 2
+
+USER_AGENT = "Mozilla/5.0 (compatible; ReturnReadyReader/1.0)"
+
+
+def extraction_enabled() -> bool:
+    return os.environ.get("ARTICLE_EXTRACTION", "").lower() in ("1", "true", "yes")
+
+
+def max_workers() -> int:
+    return max(1, int(os.environ.get("ARTICLE_EXTRACTION_WORKERS", DEFAULT_WORKERS)))
+
+
+@lru_cache(maxsize=1)
+def _executor() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=max_workers())
+
+
+def shutdown():
+    """Stops the parser processes; the next extraction starts a fresh pool."""
+    if _executor.cache_info().currsize:
+        _executor().shutdown(wait=False)
+        _executor.cache_clear()
+
+
+# ── Readability ──────────────────────────────────────────────────────────────
+# Runs in worker processes, so it must stay picklable: plain functions,
+# stdlib only.
+
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "nav", "header", "footer",
+             "aside", "form", "button", "select", "figcaption"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+BLOCK_TAGS = {"p", "div", "section", "article", "main", "li", "blockquote", "pre", "td",
+              "h1", "h2", "h3", "h4", "h5", "h6"}
+BOILERPLATE = re.compile(
+    r"comment|share|social|related|promo|subscribe|newsletter|sidebar|footer|masthead|cookie|"
+    r"advert|\bads?\b|banner|breadcrumb|menu|popup|modal|sponsor|byline|caption",
+    re.IGNORECASE,
+)
+MIN_PARAGRAPH_CHARS = 40
+
+
+class _ReadabilityParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []      # (tag, node id, skipped)
+        self.parent = {0: None}
+        self.text = defaultdict(list)
+        self.link_chars = defaultdict(int)
+        self.block_nodes = set()
+        self.order = []      # block node ids in document order
+        self.in_link = 0
+
+    def _skipping(self) -> bool:
+        return bool(self.stack) and self.stack[-1][2]
+
+    def _nearest_block(self) -> int:
+        for _, node, _ in reversed(self.stack):
+            if node in self.block_nodes:
+                return node
+        return 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        if tag == "p" and self.stack and self.stack[-1][0] == "p":
+            self.handle_endtag("p")  # an open <p> ends where the next starts
+        attributes = dict(attrs)
+        hint = f"{attributes.get('class') or ''} {attributes.get('id') or ''}"
+        skipped = self._skipping() or tag in SKIP_TAGS or bool(BOILERPLATE.search(hint))
+        node = len(self.parent)
+        self.parent[node] = self.stack[-1][1] if self.stack else 0
+        if tag in BLOCK_TAGS and not skipped:
+            self.block_nodes.add(node)
+            self.order.append(node)
+        if tag == "a":
+            self.in_link += 1
+        self.stack.append((tag, node, skipped))
+
+    def handle_endtag(self, tag):
+        if not any(open_tag == tag for open_tag, _, _ in self.stack):
+            return
+        while self.stack:
+            open_tag, _, _ = self.stack.pop()
+            if open_tag == "a":
+                self.in_link = max(self.in_link - 1, 0)
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._skipping() or not data.strip():
+            return
+        node = self._nearest_block()
+        self.text[node].append(data)
+        if self.in_link:
+            self.link_chars[node] += len(data.strip())
+
+
+def extract_text(html: str, max_chars: int = EXTRACT_CHARS) -> str:
+    """
+    Main article text of an HTML page. Boilerplate subtrees are dropped,
+    paragraphs are scored by length, commas and link density, scores
+    flow to the parent and grandparent, and the best container's
+    paragraphs are returned in document order.
+    """
+    parser = _ReadabilityParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        return ""
+
+    paragraphs, scores = {}, defaultdict(float)
+    for node in parser.order:
+        text = re.sub(r"\s+", " ", "".join(parser.text.get(node, []))).strip()
+        if len(text) < MIN_PARAGRAPH_CHARS or parser.link_chars[node] > len(text) / 2:
+            continue
+        paragraphs[node] = text
+        score = 1 + text.count(",") + min(len(text) / 100, 3)
+        parent = parser.parent.get(node)
+        grandparent = parser.parent.get(parent) if parent is not None else None
+        if parent is not None:
+            scores[parent] += score
+        if grandparent is not None:
+            scores[grandparent] += score / 2
+
+    if not scores:
+        return ""
+    best = max(scores, key=scores.get)
+
+    def within(node):
+        while node is not None:
+            if node == best:
+                return True
+            node = parser.parent.get(node)
+        return False
+
+    text = "\n\n".join(p for node, p in paragraphs.items() if within(node))
+    return text[:max_chars]
+
+
+# ── Cache ────────────────────────────────────────────────────────────────────
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return connect(path, """
+        CREATE TABLE IF NOT EXISTS article_text (
+            url          TEXT PRIMARY KEY,  -- normalized
+            text         TEXT NOT NULL,     -- '' when the page had no readable text
+            extracted_at REAL NOT NULL
+        );
+    """)
+
+
+def _load_cached(keys: list, path: Path) -> dict:
+    if not keys:
+        return {}
+    cached = {}
+    with _connect(path) as conn:
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            cached.update(conn.execute(
+                f"SELECT url, text FROM article_text WHERE extracted_at > ? AND (text != '' OR extracted_at > ?) "
+                f"AND url IN ({','.join('?' * len(batch))})",
+                [time.time() - CACHE_TTL_DAYS * 86400, time.time() - EMPTY_CACHE_TTL_HOURS * 3600, *batch],
+            ).fetchall())
+    return cached
+
+
+def _save_cached(texts: dict, path: Path):
+    now = time.time()
+    with _connect(path) as conn:
+        conn.executemany("INSERT OR REPLACE INTO article_text VALUES (?, ?, ?)",
+                         [(key, text, now) for key, text in texts.items()])
+
+
+# ── Fetching ─────────────────────────────────────────────────────────────────
+
+async def _fetch_html(client: httpx.AsyncClient, url: str) -> str | None:
+    """The page's HTML, "" when it isn't HTML, None when the download failed."""
+    async with client.stream("GET", url) as resp:
+        if resp.status_code != 200:
+            return None
+        if "html" not in resp.headers.get("content-type", "text/html"):
+            return ""
+        body = bytearray()
+        async for chunk in resp.aiter_bytes():
+            body += chunk
+            if len(body) >= MAX_HTML_BYTES:
+                break
+        return body[:MAX_HTML_BYTES].decode(resp.encoding or "utf-8", errors="replace")
+
+
+async def _extract_one(client, url: str, executor: Executor, host_limits: dict, in_flight) -> str | None:
+    """Extracted text, or None when the page couldn't be downloaded (timeouts, 429s, 5xx...)."""
+    async with in_flight:
+        try:
+            async with host_limits[urlsplit(url).netloc.lower()]:
+                html = await _fetch_html(client, url)
+        except httpx.HTTPError as e:
+            print(f"Article fetch failed for {url}: {e}")
+            return None
+        if not html:
+            return html
+        return await asyncio.get_running_loop().run_in_executor(executor, extract_text, html)
+
+
+async def extract_articles(urls: list, client: httpx.AsyncClient | None = None,
+                           cache_path: Path | None = None, executor: Executor | None = None) -> dict:
+    """
+    Full text for each URL ("" when unreadable), keyed by the URL as given.
+    Pages are downloaded concurrently and parsed in the shared process
+    pool (ARTICLE_EXTRACTION_WORKERS); cached results are reused for
+    CACHE_TTL_DAYS, failed downloads are tried again next time.
+    """
+    cache_path = cache_path or ARTICLE_CACHE_PATH
+    keys = {url: normalize_url(url) for url in urls if normalize_url(url)}
+    texts = _load_cached(list(set(keys.values())), cache_path)
+    pending = {}  # one fetch per normalized URL
+    for url, key in keys.items():
+        if key not in texts:
+            pending.setdefault(key, url)
+
+    with span("article_extract") as extract_span:
+        if pending:
+            owns_client = client is None
+            client = client or http_client(USER_AGENT, 10.0, MAX_IN_FLIGHT)
+            executor = executor or _executor()
+            host_limits = defaultdict(lambda: asyncio.Semaphore(PER_HOST_LIMIT))
+            in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+            try:
+                extracted = await asyncio.gather(*[
+                    _extract_one(client, url, executor, host_limits, in_flight) for url in pending.values()
+                ])
+            finally:
+                if owns_client:
+                    await client.aclose()
+            fresh = dict(zip(pending, extracted))
+            _save_cached({key: text for key, text in fresh.items() if text is not None}, cache_path)
+            texts.update(fresh)
+        extract_span.add(urls=len(keys), fetched=len(pending),
+                         empty=sum(1 for key in keys.values() if not texts.get(key)))
+
+    return {url: texts.get(key) or "" for url, key in keys.items()}
@@ -0,0 +1,186 @@
+"""
+Generates or regenerates digests over a date range.
+
+    python -m services.backfill --start 2025-03-03 --end 2025-06-30 --workers 4
+    python -m services.backfill --start 2025-03-03 --audience <audience_id> --regenerate
+
+Weeks that already have a digest are skipped unless --regenerate is given.
+Finished weeks are checkpointed, so an interrupted run picks up where it
+stopped when started again with the same arguments.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from services.config import load_env
+from services.db import execute
+from services.digest_synthesizer import generate_digest, get_supabase
+from services.model_router import stage_report
+from services.scrape_cache import article_window
+from services.slack_ingest import sync_from_settings
+
+CHECKPOINT_DIR = Path(__file__).resolve().parents[1] / "data" / "backfill"
+
+
+def monday_of(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def week_range(start: date, end: date) -> list:
+    """Every Monday from the week containing start through the week containing end."""
+    weeks, week = [], monday_of(start)
+    while week <= end:
+        weeks.append(week)
+        week += timedelta(days=7)
+    return weeks
+
+
+async def existing_weeks(supabase, weeks: list, audience_id: str | None) -> set:
+    query = supabase.table("digests") \
+        .select("week_start") \
+        .gte("week_start", str(weeks[0])) \
+        .lte("week_start", str(weeks[-1]))
+    query = query.eq("audience_id", audience_id) if audience_id else query.is_("audience_id", "null")
+    return {date.fromisoformat(row["week_start"]) for row in (await execute(query)).data or []}
+
+
+# ── Checkpoint ───────────────────────────────────────────────────────────────
+
+def _checkpoint_path(start: date, end: date, audience_id: str | None) -> Path:
+    return CHECKPOINT_DIR / f"{audience_id or 'primary'}_{start}_{end}.json"
+
+
+def load_checkpoint(path: Path) -> set:
+    if not path.exists():
+        return set()
+    return {date.fromisoformat(week) for week in json.loads(path.read_text())["completed"]}
+
+
+def save_checkpoint(path: Path, completed: set):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"completed": sorted(str(week) for week in completed)}))
+
+
+# ── Run ──────────────────────────────────────────────────────────────────────
+
+async def backfill(start: date, end: date, workers: int = 3, audience: dict | None = None,
+                   regenerate: bool = False) -> dict:
+    """
+    Runs generate_digest for each pending week with at most `workers`
+    weeks in flight, and returns a throughput and cost summary.
+    """
+    weeks = week_range(start, end)
+    if not weeks:
+        return {"success": False, "error": "Empty date range"}
+
+    supabase = get_supabase()
+    audience_id = (audience or {}).get("id")
+    checkpoint = _checkpoint_path(weeks[0], weeks[-1], audience_id)
+    completed = load_checkpoint(checkpoint)
+
+    skip = set(completed)
+    if not regenerate:
+        skip |= await existing_weeks(supabase, weeks, audience_id)
+    pending = [week for week in weeks if week not in skip]
+    print(f"Backfill {weeks[0]} → {weeks[-1]}: {len(weeks)} weeks, "
+          f"{len(weeks) - len(pending)} already complete, {len(pending)} to run with {workers} workers")
+
+    if pending:
+        # One Slack sync for the whole range before the workers start, so they don't race on it;
+        # a backfill leaves the live slack_last_synced in settings alone
+        await sync_from_settings(supabase, since=article_window(pending[0])[0], record=False)
+
+    semaphore = asyncio.Semaphore(max(1, workers))
+    failures = []
+    cost_before = sum(row["cost_usd"] for row in stage_report())
+    started = time.monotonic()
+
+    async def run_week(week: date):
+        async with semaphore:
+            week_started = time.monotonic()
+            try:
+                # A past week must come from its own archive, never from today's web search
+                result = await generate_digest(week, audience=audience, sync_slack=False, archived_only=True)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+
+        if result["success"]:
+            completed.add(week)
+            save_checkpoint(checkpoint, completed)
+            status = f"ok {result['digest_id']}"
+        else:
+            failures.append({"week_start": str(week), "error": result.get("error")})
+            status = f"FAILED {result.get('error')}"
+        done = len(completed - skip) + len(failures)
+        print(f"[{done}/{len(pending)}] week of {week}: {status} ({time.monotonic() - week_started:.1f}s)")
+
+    await asyncio.gather(*[run_week(week) for week in pending])
+
+    elapsed = time.monotonic() - started
+    generated = len(completed - skip)
+    cost = sum(row["cost_usd"] for row in stage_report()) - cost_before
+    summary = {
+        "success": not failures,
+        "weeks": len(weeks),
+        "skipped": len(weeks) - len(pending),
+        "generated": generated,
+        "failed": failures,
+        "elapsed_s": round(elapsed, 1),
+        "weeks_per_minute": round(generated / elapsed * 60, 2) if elapsed else 0.0,
+        "cost_usd": round(cost, 4),
+        "cost_per_week_usd": round(cost / generated, 4) if generated else 0.0,
+    }
+
+    if not failures:
+        checkpoint.unlink(missing_ok=True)
+    return summary
+
+
+def _print_summary(summary: dict):
+    print("\nBackfill summary")
+    print(f"  generated   {summary['generated']} / {summary['weeks']} weeks "
+          f"({summary['skipped']} skipped, {len(summary['failed'])} failed)")
+    print(f"  elapsed     {summary['elapsed_s']}s — {summary['weeks_per_minute']} weeks/min")
+    print(f"  cost        ${summary['cost_usd']:.4f} (${summary['cost_per_week_usd']:.4f} per week)")
+    for failure in summary["failed"]:
+        print(f"  failed      {failure['week_start']}: {failure['error']}")
+    for row in stage_report():
+        print(f"  [{row['stage']}] {row['model']} calls={row['calls']} "
+              f"avg={row['avg_latency_s']:.1f}s ${row['cost_usd']:.4f}")
+
+
+def main(argv: list | None = None):
+    load_env()
+    parser = argparse.ArgumentParser(description="Generate or regenerate digests over a date range.")
+    parser.add_argument("--start", required=True, type=date.fromisoformat, help="first week (YYYY-MM-DD, snapped to Monday)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="last week (default: this week)")
+    parser.add_argument("--workers", type=int, default=3, help="weeks generated concurrently")
+    parser.add_argument("--audience", default=None, help="audience id (default: primary reader)")
+    parser.add_argument("--regenerate", action="store_true", help="rebuild weeks that already have a digest")
+    args = parser.parse_args(argv)
+
+    audience = None
+    if args.audience:
+        result = get_supabase().table("audiences") \
+            .select("id, name, pursuit_context, email_to") \
+            .eq("id", args.audience) \
+            .limit(1) \
+            .execute()
+        if not result.data:
+            parser.error(f"Unknown audience {args.audience}")
+        audience = result.data[0]
+
+    summary = asyncio.run(backfill(
+        args.start, args.end or date.today(), args.workers, audience, args.regenerate,
+    ))
+    if "error" in summary:
+        parser.error(summary["error"])
+    _print_summary(summary)
+    raise SystemExit(0 if summary["success"] else 1)
+
+
+if __name__ == "__main__":
+    main()
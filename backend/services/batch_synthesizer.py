@@ -0,0 +1,271 @@
+import asyncio
+import json
+import os
+import time
+from datetime import date
+
+import anthropic
+
+from services.clients import LazyProxy, get_batch_anthropic
+from services.db import execute
+from services.digest_synthesizer import (
+    _audience_prompt,
+    _digest_record,
+    _gather_slack,
+    _index_stored,
+    _parse_digest_text,
+    _remembered,
+    fetch_week_news,
+    get_supabase,
+    load_audiences,
+)
+from services.model_router import model_for, record_stage
+from services.telemetry import pipeline_run, span
+from services.url_verifier import verify_digest_links
+
+# ── Batch mode ───────────────────────────────────────────────────────────────
+# For non-urgent work (archive regeneration, overnight multi-audience runs)
+# synthesis requests go through the Message Batches API instead of one
+# synchronous call each: tokens are billed at half price and batch traffic
+# does not compete with the live pipeline for rate limit.
+
+# Batch endpoints have their own limits, so this client skips the shared limiter
+client = LazyProxy(get_batch_anthropic)
+
+# Each submitted batch gets a manifest row in digest_batches. A batch can
+# take up to 24h and the dyno may restart meanwhile, so on startup the app
+# collects every batch still pending (see resume_pending_batches). Whoever
+# collects first claims the row (pending → collecting), so two dynos or a
+# restart mid-collect never store the same digests twice.
+
+
+def _poll_interval() -> float:
+    return float(os.environ.get("BATCH_POLL_INTERVAL", 60))
+
+
+def _custom_id(week_start: date, audience: dict | None) -> str:
+    return f"{week_start}_{(audience or {}).get('id') or 'primary'}"
+
+
+async def prepare_jobs(supabase, week_starts: list, audiences: list) -> tuple[dict, list]:
+    """
+    Builds one synthesis request per (week, audience). News and Slack are
+    gathered once per week. Returns (jobs keyed by custom_id, failures).
+    """
+    jobs, failures = {}, []
+    for week_start in week_starts:
+        news_result = await fetch_week_news(week_start)
+        if not news_result["success"]:
+            failures.append({
+                "week_start": str(week_start),
+                "success": False,
+                "error": "News fetch failed",
+                "details": news_result.get("error"),
+            })
+            continue
+
+        slack_section, slack_count = await _gather_slack(supabase, week_start)
+        for audience in audiences:
+            jobs[_custom_id(week_start, audience)] = {
+                "week_start": str(week_start),
+                "audience": (audience or {}).get("name", "primary"),
+                "audience_id": (audience or {}).get("id"),
+                "source_count": news_result["source_count"],
+                "slack_count": slack_count,
+                "remember": _remembered(news_result, week_start),
+                "prompt": await _audience_prompt(supabase, news_result, slack_section, audience),
+            }
+    return jobs, failures
+
+
+def submit_batch(jobs: dict, supabase=None) -> tuple[str, dict]:
+    """Submits every job as one message batch and records its manifest. Returns (batch_id, manifest)."""
+    batch = client.beta.messages.batches.create(
+        requests=[
+            {
+                "custom_id": custom_id,
+                "params": {
+                    "model": model_for("synthesis"),
+                    "max_tokens": 4096,
+                    "messages": [{"role": "user", "content": job["prompt"]}],
+                },
+            }
+            for custom_id, job in jobs.items()
+        ]
+    )
+
+    manifest = {custom_id: {k: v for k, v in job.items() if k != "prompt"} for custom_id, job in jobs.items()}
+    try:
+        (supabase or get_supabase()).table("digest_batches").insert(
+            {"batch_id": batch.id, "manifest": manifest, "status": "pending"}
+        ).execute()
+    except Exception:
+        # Without a manifest a restart would orphan the batch — cancel it before it is billed
+        print(f"Batch manifest for {batch.id} not saved — canceling the batch")
+        try:
+            client.beta.messages.batches.cancel(batch.id)
+        except anthropic.APIError as e:
+            print(f"Batch {batch.id} could not be canceled: {e}")
+        raise
+
+    print(f"Submitted batch {batch.id} with {len(jobs)} synthesis requests")
+    return batch.id, manifest
+
+
+async def wait_for_batch(batch_id: str, poll_interval: float | None = None):
+    """Polls until the batch has ended (succeeded, errored, expired or canceled)."""
+    interval = _poll_interval() if poll_interval is None else poll_interval
+    while True:
+        batch = await asyncio.to_thread(client.beta.messages.batches.retrieve, batch_id)
+        if batch.processing_status == "ended":
+            return batch
+        counts = batch.request_counts
+        print(f"Batch {batch_id}: {counts.processing} processing, {counts.succeeded} succeeded")
+        await asyncio.sleep(interval)
+
+
+async def claim_batch(batch_id: str, supabase) -> bool:
+    """Moves a pending manifest to collecting. False when another process already claimed it."""
+    claimed = await execute(
+        supabase.table("digest_batches").update({"status": "collecting"})
+        .eq("batch_id", batch_id).eq("status", "pending")
+    )
+    return bool(claimed.data)
+
+
+async def collect_batch(batch_id: str, jobs: dict, supabase=None) -> dict:
+    """
+    Claims an ended batch, parses its results, stores every successful
+    digest in a single insert and marks the batch collected. `jobs` is
+    the manifest written at submit time.
+    """
+    supabase = supabase or get_supabase()
+    model = model_for("synthesis")
+    if not await claim_batch(batch_id, supabase):
+        print(f"Batch {batch_id} is already being collected")
+        return {"success": False, "batch_id": batch_id, "error": "Batch already claimed", "digests": []}
+
+    try:
+        items = await asyncio.to_thread(lambda: list(client.beta.messages.batches.results(batch_id)))
+    except Exception:
+        # Nothing stored yet — hand the batch back for the next attempt
+        await execute(supabase.table("digest_batches").update({"status": "pending"}).eq("batch_id", batch_id))
+        raise
+
+    records, results, remember = [], [], []
+    with span("batch_collect", batch_id=batch_id) as collect_span:
+        for item in items:
+            job = jobs.get(item.custom_id)
+            if job is None:
+                continue
+            outcome = {"audience": job["audience"], "week_start": job["week_start"]}
+
+            if item.result.type != "succeeded":
+                results.append({**outcome, "success": False, "error": f"Batch request {item.result.type}"})
+                continue
+
+            message = item.result.message
+            # Batch calls finish asynchronously, so there is no meaningful per-call latency
+            record_stage("synthesis_batch", model, 0.0, message.usage, batch=True)
+            result_text = "".join(block.text for block in message.content if block.type == "text")
+            try:
+                digest_data = _parse_digest_text(result_text)
+            except json.JSONDecodeError:
+                results.append({**outcome, "success": False, "error": "JSON parse failed", "raw": result_text[:500]})
+                continue
+
+            records.append(_digest_record(
+                date.fromisoformat(job["week_start"]), digest_data, job["source_count"],
+                job["slack_count"], audience_id=job["audience_id"],
+            ))
+            remember.append(job.get("remember", True))
+            results.append({**outcome, "success": True, "week_number": records[-1]["week_number"],
+                            "source_count": job["source_count"]})
+
+        stored = []
+        if records:
+            # Rows share their section lists with full_digest_json, so this fixes both
+            await verify_digest_links(*(r["full_digest_json"] for r in records))
+            with span("digest_insert", rows=len(records)):
+                stored = (await execute(supabase.table("digests").insert(records))).data or []
+
+        # Stored rows come back in insert order — pair them with the successful results
+        for result, row in zip((r for r in results if r["success"]), stored):
+            result["digest_id"] = row["id"]
+        rows = [{**record, "id": row["id"]} for record, row in zip(records, stored)]
+        _index_stored(rows, [row for row, keep in zip(rows, remember) if keep])
+        await execute(supabase.table("digest_batches").update(
+            {"status": "collected", "collected_at": "now()"}
+        ).eq("batch_id", batch_id))
+        collect_span.add(stored=len(stored), failed=len(results) - len(records))
+
+    return {"success": all(r["success"] for r in results), "batch_id": batch_id, "digests": results}
+
+
+async def generate_digests_batch(week_starts: list, audiences: list | None = None,
+                                 poll_interval: float | None = None) -> dict:
+    """
+    Batch counterpart of generate_digests_for_audiences for one or more
+    weeks. Submits every synthesis as one message batch, waits for it
+    to end, then stores the digests in bulk.
+    """
+    with pipeline_run(), span("pipeline_batch") as run_span:
+        supabase = get_supabase()
+        if audiences is None:
+            audiences = [None] + await load_audiences(supabase)
+
+        jobs, failures = await prepare_jobs(supabase, week_starts, audiences)
+        if not jobs:
+            return {"success": False, "error": "Nothing to synthesize", "digests": failures}
+
+        try:
+            batch_id, manifest = await asyncio.to_thread(submit_batch, jobs, supabase)
+        except anthropic.APIError as e:
+            print(f"Batch submit failed: {e}")
+            return {"success": False, "error": f"Anthropic API error: {e}", "digests": failures}
+        except Exception as e:
+            return {"success": False, "error": f"Batch manifest not saved: {e}", "digests": failures}
+
+        started = time.monotonic()
+        await wait_for_batch(batch_id, poll_interval)
+        run_span.add(batch_id=batch_id, requests=len(jobs), wait_s=round(time.monotonic() - started, 1))
+
+        result = await collect_batch(batch_id, manifest, supabase)
+
+    result["digests"] = failures + result["digests"]
+    result["success"] = result["success"] and not failures
+    return result
+
+
+async def resume_pending_batches(supabase=None) -> list:
+    """
+    Collects every batch whose manifest is still pending — submitted by
+    a process that restarted before its results came back. Waits for
+    any that are still running.
+    """
+    try:
+        supabase = supabase or get_supabase()
+        pending = (await execute(
+            supabase.table("digest_batches").select("batch_id, manifest").eq("status", "pending")
+        )).data or []
+    except Exception as e:
+        print(f"Pending batch lookup failed: {e}")
+        return []
+
+    results = []
+    for row in pending:
+        print(f"Resuming batch {row['batch_id']}")
+        try:
+            await wait_for_batch(row["batch_id"])
+            results.append(await collect_batch(row["batch_id"], row["manifest"], supabase))
+        except anthropic.APIError as e:
+            print(f"Batch {row['batch_id']} could not be collected: {e}")
+            results.append({"success": False, "batch_id": row["batch_id"], "error": f"Anthropic API error: {e}"})
+    return results
+
+
+if __name__ == "__main__":
+    from services.config import load_env
+
+    load_env()
+    print(asyncio.run(resume_pending_batches()))
@@ -0,0 +1,117 @@
+from functools import lru_cache
+
+from services.config import get_settings
+
+# ── Shared clients ───────────────────────────────────────────────────────────
+# Anthropic and Supabase clients are built on first use and then reused, so
+# importing a service costs nothing and every request shares one connection
+# pool. The app lifespan warms them in a background thread at startup and
+# closes them on shutdown.
+
+
+class LazyProxy:
+    """Stands in for a module-level client; resolves the factory on every access."""
+
+    def __init__(self, factory):
+        self._factory = factory
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            # Introspection (mock.patch, inspect, copy) must not build the client
+            raise AttributeError(name)
+        return getattr(self._factory(), name)
+
+
+@lru_cache(maxsize=1)
+def get_anthropic():
+    """
+    Sync Anthropic client that feeds every response to the shared rate
+    limiter. The SDK's own retries are off: create_message retries under
+    the limiter, and stacking both would re-send a call up to 9 times.
+    """
+    import anthropic
+    from services.rate_limiter import limited_http_client
+
+    return anthropic.Anthropic(
+        api_key=get_settings().anthropic_api_key,
+        http_client=limited_http_client(),
+        max_retries=0,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_batch_anthropic():
+    """Batch endpoints have their own limits, so this client skips the shared limiter."""
+    import anthropic
+
+    return anthropic.Anthropic(api_key=get_settings().anthropic_api_key)
+
+
+@lru_cache(maxsize=1)
+def get_async_anthropic():
+    import anthropic
+    from services.rate_limiter import limited_async_http_client
+
+    return anthropic.AsyncAnthropic(
+        api_key=get_settings().anthropic_api_key,
+        http_client=limited_async_http_client(),
+        max_retries=0,  # stream_message retries under the limiter
+    )
+
+
+def http_client(user_agent: str, timeout: float = 10.0, max_connections: int = 20, **kwargs):
+    """Pooled httpx client shared by every URL in one pass (link checks, feeds, article pages)."""
+    import httpx
+
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=httpx.Timeout(timeout),
+        limits=httpx.Limits(max_connections=max_connections),
+        headers={"User-Agent": user_agent},
+        **kwargs,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_supabase():
+    from supabase import create_client
+
+    settings = get_settings()
+    if not settings.supabase_url or not settings.supabase_service_key:
+        raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY in backend/.env")
+    return create_client(settings.supabase_url, settings.supabase_service_key)
+
+
+def warm_up() -> dict:
+    """
+    Builds every client and opens the Supabase connection so the first
+    request doesn't pay for imports, TLS or DNS. Blocking — run it off
+    the event loop. Failures are reported, never raised.
+    """
+    warmed = {}
+    for name, warm in (
+        ("anthropic", lambda: (get_anthropic(), get_async_anthropic())),
+        ("supabase", lambda: get_supabase().table("settings").select("id").limit(1).execute()),
+    ):
+        try:
+            warm()
+            warmed[name] = True
+        except Exception as e:
+            print(f"Warm-up skipped for {name}: {e}")
+            warmed[name] = False
+    return warmed
+
+
+async def close_clients():
+    """Closes any client that was built and forgets it."""
+    from services import article_extractor, db
+
+    db.shutdown()
+    article_extractor.shutdown()
+    for factory in (get_anthropic, get_batch_anthropic):
+        if factory.cache_info().currsize:
+            factory().close()
+    if get_async_anthropic.cache_info().currsize:
+        await get_async_anthropic().close()
+    for factory in (get_anthropic, get_batch_anthropic, get_async_anthropic, get_supabase):
+        factory.cache_clear()
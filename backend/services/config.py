@@ -0,0 +1,42 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+# ── Settings ─────────────────────────────────────────────────────────────────
+# backend/.env is read once, the first time anything asks for settings —
+# never at import — so a cold start only pays for it when a handler needs it.
+# Most tuning knobs (ANTHROPIC_RPM, MODEL_TIER_*, ARTICLE_EXTRACTION, ...) are
+# read straight from os.environ, so every CLI and scheduler entry point calls
+# load_env() before doing anything else.
+
+ENV_PATH = Path(__file__).resolve().parents[1] / ".env"
+
+
+@dataclass(frozen=True)
+class Settings:
+    anthropic_api_key: str | None
+    supabase_url: str | None
+    supabase_service_key: str | None
+    resend_api_key: str | None
+    allowed_origins: tuple
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    from dotenv import load_dotenv
+
+    load_dotenv(ENV_PATH)
+    origins = os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000")
+    return Settings(
+        anthropic_api_key=os.environ.get("ANTHROPIC_API_KEY"),
+        supabase_url=os.environ.get("SUPABASE_URL"),
+        supabase_service_key=os.environ.get("SUPABASE_SERVICE_KEY"),
+        resend_api_key=os.environ.get("RESEND_API_KEY"),
+        allowed_origins=tuple(o.strip() for o in origins.split(",") if o.strip()),
+    )
+
+
+def load_env():
+    """Loads backend/.env into os.environ (once) so direct os.environ reads see it."""
+    get_settings()
@@ -1,40 +1,88 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from datetime import date, timedelta
 
+from services.config import load_env
+
 scheduler = AsyncIOScheduler()
 
 
+async def run_feed_scrape():
+    """Daily 5:30am — refresh scraped_articles.json from the RSS/Atom feeds."""
+    from services.feed_scraper import refresh_scraped_articles
+
+    result = await refresh_scraped_articles()
+    if not result["success"]:
+        print(f"Feed scrape failed: {result['error']}")
+
+
+async def run_daily_preselect():
+    """Daily 5:45am — shortlist yesterday's articles (Sundays: search Companies to Watch too)."""
+    from services.daily_shortlist import run_daily
+
+    result = await run_daily()
+    if not result["success"]:
+        print(f"Daily pre-selection failed: {result['error']}")
+
+
 async def run_weekly_digest():
-    """Monday 6am — generate and store digest."""
-    from services.digest_synthesizer import generate_digest
+    """Monday 6am — generate and store a digest for every audience."""
+    from services.digest_synthesizer import generate_digests_for_audiences
 
     today = date.today()
     week_start = today - timedelta(days=today.weekday())
 
-    print(f"Generating digest for week of {week_start}")
-    result = await generate_digest(week_start)
+    print(f"Generating digests for week of {week_start}")
+    result = await generate_digests_for_audiences(week_start)
 
-    if result["success"]:
-        print(f"Digest ready — Week {result['week_number']}")
-    else:
+    if "digests" not in result:
         print(f"Digest failed: {result['error']}")
+        return
+
+    for digest in result["digests"]:
+        if digest["success"]:
+            print(f"Digest ready — Week {digest['week_number']} ({digest['audience']})")
+        else:
+            print(f"Digest failed ({digest['audience']}): {digest['error']}")
 
 
 async def run_weekly_email():
-    """Monday 8am — send latest digest by email."""
+    """Monday 8am — send each audience its latest digest by email."""
+    from services.digest_synthesizer import load_audiences, get_supabase
     from services.email_sender import send_digest_email
 
     print("Sending weekly digest email")
-    result = await send_digest_email()
+    for audience in [None] + await load_audiences(get_supabase()):
+        result = await send_digest_email(audience)
 
-    if result["success"]:
-        print(f"Email sent to {result['sent_to']}")
-    else:
-        print(f"Email failed: {result['error']}")
+        if result["success"]:
+            print(f"Email sent to {result['sent_to']}")
+        else:
+            print(f"Email failed: {result['error']}")
 
 
 def start_cron_jobs():
     """Start all scheduled jobs."""
+    load_env()
+
+    # Feed scrape — daily 5:30am
+    scheduler.add_job(
+        run_feed_scrape,
+        'cron',
+        hour=5,
+        minute=30,
+        id='feed_scrape',
+        replace_existing=True
+    )
+
+    # Daily pre-selection — 5:45am, once the scrape has landed
+    scheduler.add_job(
+        run_daily_preselect,
+        'cron',
+        hour=5,
+        minute=45,
+        id='daily_preselect',
+        replace_existing=True
+    )
 
     # Weekly digest — Monday 6am
     scheduler.add_job(
@@ -59,4 +107,4 @@ def start_cron_jobs():
     )
 
     scheduler.start()
-    print("Cron jobs started: digest at 6am, email at 8am")
+    print("Cron jobs started: feeds at 5:30am and shortlist at 5:45am daily, digest at 6am, email at 8am")
@@ -0,0 +1,329 @@
+import asyncio
+import json
+import sqlite3
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import anthropic
+
+from services import news_fetcher
+from services.db import run
+from services.local_store import connect
+from services.model_router import model_for
+from services.news_fetcher import (
+    _parse_json_response, _resolve_companies, condense_articles, fetch_companies_from_web,
+)
+from services.rate_limiter import create_message
+from services.scrape_cache import article_window, cache_key, published_at
+from services.search_memory import WeekSearches
+from services.story_memory import StoryMemory, normalize_url
+from services.telemetry import span
+
+# ── Daily shortlists ─────────────────────────────────────────────────────────
+# Each morning the previous day's scraped articles are condensed and a fast
+# model pre-selects the best of them into a persisted shortlist. Monday's
+# digest then merges the seven shortlists instead of selecting from the
+# whole week's scrape, and Companies to Watch is searched on Sunday, so the
+# critical path is the synthesis call alone. Days the daily job missed are
+# pre-selected during the roll-up; a week with no shortlists at all uses
+# the weekly selection in news_fetcher unchanged.
+
+SHORTLIST_PATH = Path(__file__).resolve().parents[1] / "data" / "daily_shortlist.db"
+
+SHORTLIST_SIZE = 8     # candidates kept per day
+MIN_DEVELOPMENTS = 3   # fewer across the week → fall back to the weekly selection
+COMPANIES_PREFETCH_WEEKDAY = 6  # Sunday
+
+DAILY_PRESELECT_PROMPT = """
+You are pre-selecting one day of AI news for a weekly digest read by
+Joanna Patterson, COO of Pursuit — a NYC nonprofit that trains adults
+from underrepresented backgrounds for tech careers. Pursuit partners
+directly with Anthropic and is training builders as AI-native developers
+with Claude Code.
+
+Score each article below from 1-10 for that reader. Favour: Anthropic and
+Claude news; AI coding agents and developer tools; AI's effect on jobs,
+skills and economic mobility; AI for nonprofits, education and workforce
+programs. Skip anything not genuinely about AI or too niche to matter.
+
+ARTICLES (published {day}):
+{articles}
+
+Keep at most {limit} articles. For each, give its index and one kind:
+"development" (launches, research, policy, major company moves),
+"jobs" (adoption, role shifts, in-demand skills) or "resource" (a piece
+worth reading in full for its leadership or economic framing).
+
+Return as JSON only. No markdown. No preamble.
+
+{{
+  "candidates": [
+    {{
+      "article": 0,
+      "kind": "development",
+      "score": 8,
+      "headline": "Specific headline",
+      "what_happened": "2-3 sentences from the article",
+      "why_it_matters": "1-2 sentences. Real-world significance.",
+      "insight": "For jobs: the specific observation",
+      "why_read": "For resource: 1 sentence, specific to workforce development"
+    }}
+  ]
+}}
+"""
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return connect(path, """
+        CREATE TABLE IF NOT EXISTS daily_shortlist (
+            day          TEXT PRIMARY KEY,
+            articles_key TEXT NOT NULL,     -- the day's articles and model; unchanged → not re-selected
+            articles     INTEGER NOT NULL,
+            candidates   TEXT NOT NULL,     -- JSON, best first
+            created_at   REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS week_companies (
+            week_start TEXT PRIMARY KEY,
+            companies  TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+    """)
+
+
+def digest_week(day: date) -> date:
+    """The Monday whose digest covers day."""
+    return day + timedelta(days=7 - day.weekday())
+
+
+def window_days(week_start: date) -> list:
+    start, end = article_window(week_start)
+    return [(start + timedelta(days=i)).date() for i in range((end - start).days)]
+
+
+def day_articles(articles: list, day: date) -> list:
+    """Articles published on day (UTC). Undated articles count on the day they were scraped."""
+    def article_day(a):
+        published = published_at(a)
+        if published:
+            return published.astimezone(timezone.utc).date()
+        return date.fromisoformat(a["scraped_at"][:10]) if a.get("scraped_at") else None
+    return [a for a in articles if article_day(a) == day]
+
+
+def load_shortlists(days: list, path: Path | None = None) -> dict:
+    """{day: candidates} for the days that have been pre-selected."""
+    with _connect(path or SHORTLIST_PATH) as conn:
+        rows = conn.execute(
+            f"SELECT day, candidates FROM daily_shortlist WHERE day IN ({','.join('?' * len(days))})",
+            [str(d) for d in days],
+        ).fetchall()
+    return {date.fromisoformat(day): json.loads(candidates) for day, candidates in rows}
+
+
+def _candidates(result_text: str, condensed: list) -> list:
+    """Model picks joined to their articles — titles, URLs and sources are never the model's."""
+    picks = _parse_json_response(result_text).get("candidates", [])
+    candidates = []
+    for pick in picks:
+        index = pick.get("article")
+        if not isinstance(index, int) or not 0 <= index < len(condensed) \
+                or pick.get("kind") not in ("development", "jobs", "resource"):
+            continue
+        article = condensed[index]
+        candidates.append({
+            **{k: v for k, v in pick.items() if k != "article"},
+            "score": float(pick.get("score") or 0),
+            "title": article["title"],
+            "url": article["url"],
+            "source": article["source"],
+            "published_date": article["published_date"],
+        })
+    candidates.sort(key=lambda c: -c["score"])
+    return candidates[:SHORTLIST_SIZE]
+
+
+async def preselect_day(day: date, json_path: Path | None = None, path: Path | None = None,
+                        refresh: bool = False) -> dict:
+    """
+    Pre-selects one day's scraped articles into its shortlist. A day whose
+    articles haven't changed since its last run costs nothing.
+    """
+    json_path = json_path or news_fetcher.scraped_data_path()
+    path = path or SHORTLIST_PATH
+    if not json_path.exists():
+        return {"success": False, "error": "No scraped data found"}
+
+    with span("daily_preselect", day=str(day)) as preselect_span:
+        articles = day_articles(json.loads(json_path.read_text()).get("articles", []), day)
+        fresh = (await run(StoryMemory.load, digest_week(day))).new_stories(articles)
+        articles_key = cache_key(model_for("news_preselect"), *sorted(normalize_url(a.get("url")) for a in fresh))
+        preselect_span.add(articles=len(articles), fresh=len(fresh))
+
+        with _connect(path) as conn:
+            row = conn.execute("SELECT articles_key, candidates FROM daily_shortlist WHERE day = ?",
+                               (str(day),)).fetchone()
+        if row and row[0] == articles_key and not refresh:
+            return {"success": True, "day": str(day), "articles": len(fresh),
+                    "candidates": len(json.loads(row[1])), "cached": True}
+
+        candidates = []
+        if fresh:
+            condensed = await condense_articles(fresh)
+            try:
+                response = await create_message(
+                    news_fetcher.client,
+                    stage="news_preselect",
+                    max_tokens=2000,
+                    messages=[{"role": "user", "content": DAILY_PRESELECT_PROMPT.format(
+                        day=day, limit=SHORTLIST_SIZE,
+                        articles=json.dumps([{"index": i, **a} for i, a in enumerate(condensed)], indent=2),
+                    )}],
+                )
+            except anthropic.APIError as e:
+                # Not stored — the roll-up retries the day
+                return {"success": False, "error": f"Anthropic API error: {e}", "day": str(day)}
+            result_text = "".join(
+                block.text for block in response.content if isinstance(getattr(block, "text", None), str)
+            )
+            try:
+                candidates = _candidates(result_text, condensed)
+            except (json.JSONDecodeError, AttributeError) as e:
+                # Not stored — the roll-up retries the day
+                return {"success": False, "error": f"JSON parse failed: {e}", "day": str(day)}
+        preselect_span.add(candidates=len(candidates))
+
+        with _connect(path) as conn:
+            conn.execute("INSERT OR REPLACE INTO daily_shortlist VALUES (?, ?, ?, ?, ?)",
+                         (str(day), articles_key, len(fresh), json.dumps(candidates), time.time()))
+
+    print(f"Shortlisted {len(candidates)} of {len(fresh)} new articles from {day}")
+    return {"success": True, "day": str(day), "articles": len(fresh), "candidates": len(candidates)}
+
+
+# ── Companies ahead of Monday ────────────────────────────────────────────────
+
+async def prefetch_companies(week_start: date, path: Path | None = None) -> list:
+    """Runs the Companies to Watch web search for next Monday's digest and keeps the result."""
+    companies = await fetch_companies_from_web(WeekSearches.load(week_start))
+    if companies:
+        with _connect(path or SHORTLIST_PATH) as conn:
+            conn.execute("INSERT OR REPLACE INTO week_companies VALUES (?, ?, ?)",
+                         (str(week_start), json.dumps(companies), time.time()))
+    return companies
+
+
+def stored_companies(week_start: date, path: Path | None = None) -> list | None:
+    with _connect(path or SHORTLIST_PATH) as conn:
+        row = conn.execute("SELECT companies FROM week_companies WHERE week_start = ?",
+                           (str(week_start),)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+# ── Weekly roll-up ───────────────────────────────────────────────────────────
+
+def _merge(shortlists: dict, memory: StoryMemory) -> list:
+    """Every day's candidates, one per URL (its best score), best first."""
+    best = {}
+    for candidates in shortlists.values():
+        for candidate in memory.new_stories(candidates):
+            key = normalize_url(candidate["url"]) or candidate["title"]
+            if key not in best or candidate["score"] > best[key]["score"]:
+                best[key] = candidate
+    return sorted(best.values(), key=lambda c: -c["score"])
+
+
+def _news_data(merged: list) -> dict:
+    developments = [c for c in merged if c["kind"] == "development"][:5]
+    jobs = [c for c in merged if c["kind"] == "jobs"][:3]
+    resources = [c for c in merged if c["kind"] == "resource"]
+    return {
+        "developments": [
+            {"headline": c.get("headline") or c["title"], "what_happened": c.get("what_happened", ""),
+             "why_it_matters": c.get("why_it_matters", ""), "source": c["source"], "url": c["url"]}
+            for c in developments
+        ],
+        "jobs_and_hiring": [
+            {"insight": c.get("insight") or c.get("what_happened", ""), "source": c["source"], "url": c["url"]}
+            for c in jobs
+        ],
+        "featured_resource": {
+            "title": resources[0]["title"], "publication": resources[0]["source"], "url": resources[0]["url"],
+            "what_its_about": resources[0].get("what_happened", ""), "why_read": resources[0].get("why_read", ""),
+            # Nothing in a shortlisted article says how it reads or how long it takes
+            "format": "", "estimated_time": "",
+        } if resources else {},
+    }
+
+
+async def roll_up(week_start: date, memory: StoryMemory, searches: WeekSearches | None = None,
+                  path: Path | None = None, search_companies: bool = True) -> dict | None:
+    """
+    The week's news from its daily shortlists, in fetch_from_scraped's
+    result shape. None when the daily job hasn't run for this week.
+    search_companies=False never runs a new companies search; only the
+    week's own Sunday search or the shortlisted articles are used.
+    """
+    path = path or SHORTLIST_PATH
+    days = window_days(week_start)
+    shortlists = load_shortlists(days, path)
+    if not shortlists:
+        return None
+
+    with span("shortlist_rollup") as rollup_span:
+        missing = [day for day in days if day not in shortlists]
+        if missing:
+            print(f"Pre-selecting {len(missing)} days the daily job missed")
+            caught_up = await asyncio.gather(*[preselect_day(day, path=path) for day in missing],
+                                             return_exceptions=True)
+            for day, result in zip(missing, caught_up):
+                if isinstance(result, Exception) or not result["success"]:
+                    print(f"Pre-selection for {day} failed: {result if isinstance(result, Exception) else result['error']}")
+            shortlists = load_shortlists(days, path)
+            still_missing = [day for day in days if day not in shortlists]
+            if still_missing:
+                # A roll-up without those days would silently drop their stories
+                return {"success": False, "error": f"{len(still_missing)} days could not be pre-selected",
+                        "fallback": True}
+
+        merged = _merge(shortlists, memory)
+        news_data = _news_data(merged)
+        rollup_span.add(days=len(shortlists), missing=len(missing), candidates=len(merged))
+        if len(news_data["developments"]) < MIN_DEVELOPMENTS:
+            return {"success": False, "error": f"Only {len(news_data['developments'])} developments shortlisted",
+                    "fallback": True}
+
+        web_companies = stored_companies(week_start, path)
+        if web_companies is None:
+            web_companies = await fetch_companies_from_web(searches) if search_companies else []
+        backup_articles = [{"title": c["title"], "url": c["url"], "summary": c.get("what_happened", ""),
+                            "source": c["source"]} for c in merged]
+        news_data["companies_to_watch"] = await _resolve_companies(web_companies, backup_articles, memory)
+
+    print(f"Rolled up {len(merged)} shortlisted stories from {len(shortlists)} days")
+    return {
+        "success": True,
+        "data": news_data,
+        "source": "daily_shortlists",
+        "source_count": (
+            len(news_data["developments"]) +
+            len(news_data["companies_to_watch"]) +
+            len(news_data["jobs_and_hiring"])
+        ),
+    }
+
+
+async def run_daily(today: date | None = None) -> dict:
+    """Pre-selects yesterday; on Sundays also searches Companies to Watch for Monday's digest."""
+    today = today or datetime.now().date()
+    result = await preselect_day(today - timedelta(days=1))
+    if today.weekday() == COMPANIES_PREFETCH_WEEKDAY:
+        result["companies"] = len(await prefetch_companies(digest_week(today)))
+    return result
+
+
+if __name__ == "__main__":
+    from services.config import load_env
+
+    load_env()
+    print(asyncio.run(run_daily()))
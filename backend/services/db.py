@@ -0,0 +1,39 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+
+# ── Supabase calls off the event loop ────────────────────────────────────────
+# supabase-py's client is synchronous, so every execute() is a blocking HTTP
+# round-trip. Async code awaits execute(query) instead: the call runs on a
+# dedicated thread pool, so one request waiting on Postgres never stalls the
+# others, and the pool's size (SUPABASE_MAX_CONCURRENCY) caps how many
+# queries are in flight at once.
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+def max_concurrency() -> int:
+    return int(os.environ.get("SUPABASE_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+
+
+@lru_cache(maxsize=1)
+def _executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=max_concurrency(), thread_name_prefix="supabase")
+
+
+async def run(fn, *args, **kwargs):
+    """Runs a blocking function (a Supabase call or a local SQLite read) on the database pool."""
+    return await asyncio.get_running_loop().run_in_executor(_executor(), partial(fn, *args, **kwargs))
+
+
+async def execute(query):
+    """Awaitable query.execute()."""
+    return await run(query.execute)
+
+
+def shutdown():
+    """Stops the pool's threads; the next call starts a fresh pool."""
+    if _executor.cache_info().currsize:
+        _executor().shutdown(wait=False)
+        _executor.cache_clear()
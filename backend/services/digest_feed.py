@@ -0,0 +1,212 @@
+import hashlib
+import html
+import json
+import os
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+
+from services.local_store import connect, mark_seeded
+
+# ── Digest feeds ─────────────────────────────────────────────────────────────
+# /digest/feed.xml (Atom) and /digest/feed.json (JSON Feed 1.1) for feed
+# readers. Both are rendered when a digest is stored and kept here with a
+# strong ETag and Last-Modified, so a poll is one small SQLite read and an
+# unchanged feed is answered with a bodiless 304.
+
+DIGEST_FEED_PATH = Path(__file__).resolve().parents[1] / "data" / "digest_feed.db"
+
+FEED_ITEMS = 20
+FORMATS = {"xml": "application/atom+xml; charset=utf-8", "json": "application/feed+json; charset=utf-8"}
+CACHE_CONTROL = "public, max-age=300"
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return connect(path, """
+        CREATE TABLE IF NOT EXISTS feed_items (
+            audience_id  TEXT NOT NULL DEFAULT '',
+            week_start   TEXT NOT NULL,
+            digest       TEXT NOT NULL,     -- JSON of the fields a feed entry shows
+            generated_at TEXT NOT NULL,
+            PRIMARY KEY (audience_id, week_start)
+        );
+        CREATE TABLE IF NOT EXISTS feed_cache (
+            audience_id   TEXT NOT NULL DEFAULT '',
+            format        TEXT NOT NULL,    -- xml | json
+            body          BLOB NOT NULL,
+            etag          TEXT NOT NULL,
+            last_modified TEXT NOT NULL,    -- HTTP date of the newest entry
+            built_at      REAL NOT NULL,
+            PRIMARY KEY (audience_id, format)
+        );
+    """)
+
+
+def _urls() -> tuple[str, str]:
+    app = os.environ.get("NEXT_PUBLIC_APP_URL", "https://connectionos.app").rstrip("/")
+    api = os.environ.get("BACKEND_URL", "http://localhost:8000").rstrip("/")
+    return app, api
+
+
+def _title(digest: dict) -> str:
+    return f"Connection OS · Week {digest.get('week_number')} · {digest['week_start']} to {digest.get('week_end', '')}"
+
+
+def _content_html(digest: dict) -> str:
+    parts = [f"<p>{html.escape(digest.get('week_summary') or '')}</p>", "<ul>"]
+    for dev in digest.get("ai_developments") or []:
+        headline = html.escape(dev.get("headline") or "")
+        if dev.get("url"):
+            headline = f'<a href="{html.escape(dev["url"])}">{headline}</a>'
+        parts.append(f"<li><strong>{headline}</strong> {html.escape(dev.get('why_it_matters') or '')}</li>")
+    parts.append("</ul>")
+    return "".join(parts)
+
+
+def render_atom(digests: list, audience_id: str = "") -> bytes:
+    app, api = _urls()
+    ET.register_namespace("", ATOM_NS)
+    feed = ET.Element(f"{{{ATOM_NS}}}feed")
+
+    def add(parent, tag, text=None, **attrs):
+        element = ET.SubElement(parent, f"{{{ATOM_NS}}}{tag}", attrs)
+        element.text = text
+        return element
+
+    add(feed, "id", f"{app}/digest/feed{f'/{audience_id}' if audience_id else ''}")
+    add(feed, "title", "Connection OS · Weekly AI digest")
+    add(feed, "updated", digests[0]["generated_at"] if digests else datetime.now(timezone.utc).isoformat())
+    add(feed, "link", href=f"{api}/digest/feed.xml", rel="self")
+    add(feed, "link", href=app)
+    for digest in digests:
+        entry = add(feed, "entry")
+        add(entry, "id", f"{app}/digest/{digest['id']}")
+        add(entry, "title", _title(digest))
+        add(entry, "updated", digest["generated_at"])
+        add(entry, "link", href=f"{app}/digest/{digest['id']}")
+        add(entry, "summary", digest.get("week_summary") or "")
+        add(entry, "content", _content_html(digest), type="html")
+    return ET.tostring(feed, encoding="utf-8", xml_declaration=True)
+
+
+def render_json_feed(digests: list, audience_id: str = "") -> bytes:
+    app, api = _urls()
+    document = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": "Connection OS · Weekly AI digest",
+        "home_page_url": app,
+        "feed_url": f"{api}/digest/feed.json",
+        "items": [
+            {
+                "id": str(digest["id"]),
+                "url": f"{app}/digest/{digest['id']}",
+                "title": _title(digest),
+                "summary": digest.get("week_summary") or "",
+                "content_html": _content_html(digest),
+                "date_published": digest["generated_at"],
+            }
+            for digest in digests
+        ],
+    }
+    return json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _http_date(timestamp: str | None) -> str:
+    try:
+        parsed = datetime.fromisoformat((timestamp or "").replace("Z", "+00:00"))
+    except ValueError:
+        parsed = datetime.now(timezone.utc)
+    parsed = parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return format_datetime(parsed.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def _rebuild(conn: sqlite3.Connection, audience_id: str):
+    digests = [json.loads(d) for (d,) in conn.execute(
+        "SELECT digest FROM feed_items WHERE audience_id = ? ORDER BY week_start DESC, generated_at DESC LIMIT ?",
+        (audience_id, FEED_ITEMS),
+    )]
+    last_modified = _http_date(digests[0]["generated_at"] if digests else None)
+    for fmt, render in (("xml", render_atom), ("json", render_json_feed)):
+        body = render(digests, audience_id)
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        conn.execute("INSERT OR REPLACE INTO feed_cache VALUES (?, ?, ?, ?, ?, ?)",
+                     (audience_id, fmt, body, etag, last_modified, time.time()))
+
+
+def record_digests(digests: list, path: Path | None = None) -> int:
+    """Adds stored digest rows (a regenerated week replaces its entry) and re-renders the affected feeds."""
+    now = datetime.now(timezone.utc).isoformat()
+    rows = []
+    for digest in digests:
+        generated_at = digest.get("generated_at") or now
+        entry = {
+            "id": digest["id"], "week_number": digest.get("week_number"), "week_start": str(digest["week_start"]),
+            "week_end": str(digest.get("week_end") or ""), "week_summary": digest.get("week_summary"),
+            "ai_developments": digest.get("ai_developments") or [], "generated_at": generated_at,
+        }
+        rows.append((digest.get("audience_id") or "", entry["week_start"], json.dumps(entry), generated_at))
+    with _connect(path or DIGEST_FEED_PATH) as conn:
+        conn.executemany("""
+            INSERT INTO feed_items VALUES (?, ?, ?, ?)
+            ON CONFLICT (audience_id, week_start) DO UPDATE SET digest = excluded.digest,
+                generated_at = excluded.generated_at
+            WHERE excluded.generated_at >= feed_items.generated_at
+        """, rows)
+        for audience_id in {row[0] for row in rows}:
+            _rebuild(conn, audience_id)
+    return len(rows)
+
+
+def rebuild_from_digests(supabase, path: Path | None = None) -> int:
+    """Seeds the feeds from every digest already in Supabase."""
+    result = supabase.table("digests") \
+        .select("id, audience_id, week_number, week_start, week_end, week_summary, ai_developments, generated_at") \
+        .execute()
+    recorded = record_digests(result.data or [], path)
+    with _connect(path or DIGEST_FEED_PATH) as conn:
+        _rebuild(conn, "")  # the primary feed exists even before the first digest
+        mark_seeded(conn)
+    return recorded
+
+
+def feed_headers(fmt: str, audience_id: str | None = None, path: Path | None = None) -> dict | None:
+    """ETag and Last-Modified of a rendered feed, without reading its body. None until one is built."""
+    with _connect(path or DIGEST_FEED_PATH) as conn:
+        row = conn.execute("SELECT etag, last_modified FROM feed_cache WHERE audience_id = ? AND format = ?",
+                           (audience_id or "", fmt)).fetchone()
+    if not row:
+        return None
+    return {"ETag": row[0], "Last-Modified": row[1], "Cache-Control": CACHE_CONTROL}
+
+
+def feed_body(fmt: str, audience_id: str | None = None, path: Path | None = None) -> bytes | None:
+    with _connect(path or DIGEST_FEED_PATH) as conn:
+        row = conn.execute("SELECT body FROM feed_cache WHERE audience_id = ? AND format = ?",
+                           (audience_id or "", fmt)).fetchone()
+    return row[0] if row else None
+
+
+def not_modified(headers: dict, if_none_match: str | None, if_modified_since: str | None) -> bool:
+    """RFC 9110 conditional GET: If-None-Match wins; If-Modified-Since only applies without it."""
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or headers["ETag"] in tags
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(headers["Last-Modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+if __name__ == "__main__":
+    from services.clients import get_supabase
+    from services.config import load_env
+
+    load_env()
+    print(f"Recorded {rebuild_from_digests(get_supabase())} digests in the feeds")
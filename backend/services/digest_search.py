@@ -0,0 +1,162 @@
+import html
+import os
+import re
+import sqlite3
+from pathlib import Path
+
+from services.local_store import connect
+from services.telemetry import span
+
+# ── Archive search ───────────────────────────────────────────────────────────
+# In production the digests table carries a trigger-maintained tsvector with
+# a GIN index and a search_digests() function (see docs/data_schema.md).
+# Locally, set DIGEST_SEARCH_BACKEND=sqlite to use an FTS5 index with the
+# same weighting, kept up to date as digests are stored.
+
+DIGEST_SEARCH_PATH = Path(__file__).resolve().parents[1] / "data" / "digest_search.db"
+
+# bm25 column weights — mirror the A/B/B/C weights of the Postgres tsvector
+FTS_WEIGHTS = (4.0, 2.0, 2.0, 1.0)
+SNIPPET_TOKENS = 16
+# Both engines return the matched text unescaped, and it comes from the
+# model, scraped articles and Slack. They mark matches with these control
+# characters; highlight() escapes the text and only then adds <mark> tags.
+HIGHLIGHT_START, HIGHLIGHT_END = "\x02", "\x03"
+
+
+def _backend() -> str:
+    return os.environ.get("DIGEST_SEARCH_BACKEND", "postgres")
+
+
+def search_fields(digest: dict) -> dict:
+    """The searchable text of a digest row, one entry per weighted field."""
+    fields = {
+        "summary": digest.get("week_summary") or "",
+        "headlines": " · ".join(
+            d.get("headline") or "" for d in digest.get("ai_developments") or [] if isinstance(d, dict)
+        ),
+        "companies": " · ".join(
+            c.get("name") or "" for c in digest.get("companies_to_watch") or [] if isinstance(c, dict)
+        ),
+        "implications": " · ".join(
+            i.get("implication") or "" for i in digest.get("pursuit_implications") or [] if isinstance(i, dict)
+        ),
+    }
+    return {name: _clean(text) for name, text in fields.items()}
+
+
+def highlight(snippet: str | None) -> str:
+    """Snippet as safe HTML: the text escaped, matches wrapped in <mark>."""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+
+
+def _clean(text: str) -> str:
+    return text.replace(HIGHLIGHT_START, "").replace(HIGHLIGHT_END, "")
+
+
+def fts_query(q: str) -> str:
+    """
+    Turns free text into a safe FTS5 query: every word must match,
+    and the last word also matches as a prefix (search-as-you-type).
+    """
+    words = re.findall(r"\w+", q.lower())
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+# ── Local FTS5 index ─────────────────────────────────────────────────────────
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return connect(path, """
+        CREATE VIRTUAL TABLE IF NOT EXISTS digest_fts USING fts5(
+            digest_id UNINDEXED, week_number UNINDEXED, week_start UNINDEXED, audience_id UNINDEXED,
+            summary, headlines, companies, implications,
+            tokenize = 'porter unicode61'
+        );
+    """)
+
+
+def index_digests(digests: list, path: Path | None = None) -> int:
+    """Adds or replaces digest rows (each needs its id) in the local index."""
+    rows = [d for d in digests if d.get("id")]
+    with _connect(path or DIGEST_SEARCH_PATH) as conn:
+        conn.executemany("DELETE FROM digest_fts WHERE digest_id = ?", [(d["id"],) for d in rows])
+        conn.executemany(
+            "INSERT INTO digest_fts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (d["id"], d.get("week_number"), str(d.get("week_start")), d.get("audience_id") or "",
+                 *search_fields(d).values())
+                for d in rows
+            ],
+        )
+    return len(rows)
+
+
+def maintain_local_index(digests: list):
+    """Called as digests are stored — Postgres keeps its own index via trigger."""
+    if _backend() == "sqlite":
+        index_digests(digests)
+
+
+def search_local(q: str, limit: int = 20, audience_id: str | None = None, path: Path | None = None) -> list:
+    query = fts_query(q)
+    if not query:
+        return []
+    with _connect(path or DIGEST_SEARCH_PATH) as conn:
+        rows = conn.execute(
+            f"""
+            SELECT digest_id, week_number, week_start, bm25(digest_fts, 0, 0, 0, 0, {', '.join(map(str, FTS_WEIGHTS))}),
+                   snippet(digest_fts, -1, ?, ?, '…', {SNIPPET_TOKENS})
+            FROM digest_fts
+            WHERE digest_fts MATCH ? AND audience_id = ?
+            ORDER BY 4
+            LIMIT ?
+            """,
+            (HIGHLIGHT_START, HIGHLIGHT_END, query, audience_id or "", limit),
+        ).fetchall()
+    # bm25 is lower-is-better; flip it so rank reads like ts_rank
+    return [
+        {"id": digest_id, "week_number": week_number, "week_start": week_start,
+         "rank": -score, "snippet": highlight(snippet)}
+        for digest_id, week_number, week_start, score, snippet in rows
+    ]
+
+
+# ── Search ───────────────────────────────────────────────────────────────────
+
+def search_digests(supabase, q: str, limit: int = 20, audience_id: str | None = None) -> list:
+    """Ranked matches with a highlighted snippet, best first."""
+    with span("digest_search", backend=_backend()) as search_span:
+        if _backend() == "sqlite":
+            results = search_local(q, limit, audience_id)
+        else:
+            results = supabase.rpc("search_digests", {
+                "q": q,
+                "max_results": limit,
+                "for_audience": audience_id,
+            }).execute().data or []
+            results = [{**r, "snippet": highlight(r.get("snippet"))} for r in results]
+        search_span.add(results=len(results))
+    return results
+
+
+def rebuild_local_index(supabase, path: Path | None = None) -> int:
+    """Re-indexes the whole archive into the local FTS5 stand-in."""
+    result = supabase.table("digests") \
+        .select("id, week_number, week_start, audience_id, week_summary, ai_developments, companies_to_watch, pursuit_implications") \
+        .execute()
+    path = path or DIGEST_SEARCH_PATH
+    path.unlink(missing_ok=True)
+    return index_digests(result.data or [], path)
+
+
+if __name__ == "__main__":
+    from services.config import load_env
+    from services.digest_synthesizer import get_supabase
+
+    load_env()
+    print(f"Indexed {rebuild_local_index(get_supabase())} digests into {DIGEST_SEARCH_PATH}")
@@ -1,23 +1,34 @@
-print("Digest synthesizer pipeline started")
-from pathlib import Path
-from dotenv import load_dotenv
-load_dotenv(Path(__file__).resolve().parents[1] / ".env")
 import anthropic
+import asyncio
 import json
 import os
 from datetime import date, timedelta
-from supabase import create_client
+from pathlib import Path
+from services import clients
+from services.clients import LazyProxy, get_anthropic, get_async_anthropic
+from services.db import execute
+from services.digest_feed import record_digests as record_feed
+from services.digest_search import maintain_local_index
+from services.news_fetcher import fetch_ai_news
+from services.story_memory import remember_digests
+from services.summarizer import CHARS_PER_TOKEN, summarize
+from services.url_verifier import verify_digest_links
+from services.telemetry import pipeline_run, span
+from services.trends import record_digests as record_trends
+from services.rate_limiter import create_message, stream_message
+
+# Clients are built on first use (see services/clients.py), never at import
+client = LazyProxy(get_anthropic)
+
+# Used only by stream_digest — streaming must not block the event loop
+async_client = LazyProxy(get_async_anthropic)
 
-client = anthropic.Anthropic(
-    api_key=os.environ.get("ANTHROPIC_API_KEY")
-)
 
 def get_supabase():
-    supabase_url = os.environ.get("SUPABASE_URL")
-    supabase_key = os.environ.get("SUPABASE_SERVICE_KEY")
-    if not supabase_url or not supabase_key:
-        raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY in backend/.env")
-    return create_client(supabase_url, supabase_key)
+    return clients.get_supabase()
+
+
+supabase = LazyProxy(lambda: get_supabase())
 
 DIGEST_PROMPT = """
 You are generating a weekly AI digest for
@@ -51,9 +62,7 @@ keeps Joanna current without overwhelming her.
 She reads fast. She thinks strategically.
 Surface only what genuinely matters.
 
-NOTE ON SLACK:
-Slack integration is not yet connected.
-For now, return an empty array [] for slack_highlights.
+{slack_section}
 
 EXTERNAL AI NEWS THIS WEEK:
 {external_news}
@@ -74,7 +83,7 @@ Return JSON only. No markdown. No preamble.
     }}
   ],
 
-  "slack_highlights": [],
+  "slack_highlights": ["One sentence per highlight — or [] if no Slack messages were provided"],
 
   "pursuit_implications": [
     {{
@@ -126,37 +135,92 @@ QUALITY RULES — follow these exactly:
 → Priority HIGH means act on return, MEDIUM means be aware, WATCH means monitor over time
 → Minimum 3 developments, maximum 5
 → Minimum 2 Pursuit implications, maximum 5
-→ slack_highlights must be [] until Slack integration is live
+→ slack_highlights must be [] when no Slack messages are provided above
 → Featured resource must be genuinely worth Joanna's time — prefer Ezra Klein-style economic framing, YC founder analysis of AI agents, or Anthropic deep-dives
 """
 
+AUDIENCE_NOTE = """THIS EDITION IS FOR {name}, NOT JOANNA.
+Wherever the instructions below mention Joanna, write for {name}
+instead, using the reader context provided.
+
+"""
+
+SLACK_NOT_CONNECTED = """NOTE ON SLACK:
+No Slack messages are available this week.
+Return an empty array [] for slack_highlights."""
+
+SLACK_SECTION = """SLACK #ai CHANNEL THIS WEEK ({count} messages, ↳ marks thread replies):
+{messages}
+
+Pick the 3-5 most useful threads for Joanna as slack_highlights —
+one sentence each, naming the tool, link or idea that was shared."""
+
+SLACK_HIGHLIGHTS_SECTION = """SLACK #ai CHANNEL THIS WEEK — condensed from {count} messages:
+{highlights}
 
-async def generate_digest(week_start: date) -> dict:
+Pick the 3-5 most useful of these as slack_highlights — one sentence each."""
+
+# Above this many characters of raw Slack text, summarize before synthesis
+SLACK_RAW_CHAR_BUDGET = 12000
+
+
+def compress_news(data: dict) -> dict:
     """
-    Generates complete weekly digest.
-    Calls news_fetcher, runs synthesis,
-    stores result in Supabase.
-    Returns digest_id and stats.
+    Compresses fetched news to stay within token limits.
+    Caps each section and cuts long free-text fields to their most
+    informative sentences.
     """
+    def trim(text, limit=180):
+        return summarize(text, max_tokens=limit // CHARS_PER_TOKEN)
 
-    supabase = get_supabase()
-
-    # Step 1: Fetch external news
-    from services.news_fetcher import fetch_ai_news
-    news_result = await fetch_ai_news()
+    return {
+        "developments": [
+            {
+                "headline": d.get("headline", ""),
+                "what_happened": trim(d.get("what_happened", ""), 200),
+                "why_it_matters": trim(d.get("why_it_matters", ""), 150),
+                "source": d.get("source", ""),
+                "url": d.get("url"),
+            }
+            for d in data.get("developments", [])[:5]
+        ],
+        "companies_to_watch": [
+            {
+                "name": c.get("name", ""),
+                "industry": c.get("industry", ""),
+                "what_they_do": c.get("what_they_do", ""),
+                "why_watch_now": trim(c.get("why_watch_now", ""), 150),
+                "relevance": trim(c.get("relevance", ""), 150),
+                "url": c.get("url"),
+            }
+            for c in data.get("companies_to_watch", [])[:4]
+        ],
+        "jobs_and_hiring": [
+            {
+                "insight": trim(j.get("insight", ""), 200),
+                "source": j.get("source", ""),
+                "url": j.get("url"),
+            }
+            for j in data.get("jobs_and_hiring", [])[:3]
+        ],
+        "featured_resource": {
+            "title": data.get("featured_resource", {}).get("title", ""),
+            "publication": data.get("featured_resource", {}).get("publication", ""),
+            "url": data.get("featured_resource", {}).get("url"),
+            "why_read": trim(data.get("featured_resource", {}).get("why_read", ""), 150),
+            "format": data.get("featured_resource", {}).get("format", ""),
+            "estimated_time": data.get("featured_resource", {}).get("estimated_time", ""),
+        },
+    }
 
-    if not news_result["success"]:
-        return {
-            "success": False,
-            "error": "News fetch failed",
-            "details": news_result.get("error")
-        }
 
-    # Step 2: Get Pursuit context from settings
-    settings_result = supabase.table("settings") \
-        .select("pursuit_context") \
-        .limit(1) \
-        .execute()
+async def _load_pursuit_context(supabase) -> str:
+    """Reads pursuit_context from settings, falling back to the env var."""
+    settings_result = await execute(
+        supabase.table("settings")
+        .select("pursuit_context")
+        .limit(1)
+    )
 
     pursuit_context = ""
     if settings_result.data:
@@ -165,116 +229,79 @@ async def generate_digest(week_start: date) -> dict:
     if not pursuit_context:
         pursuit_context = os.environ.get("PURSUIT_CONTEXT", "")
 
-    # Step 3: Compress news data to stay within token limits
-    def compress_news(data: dict) -> dict:
-        def trim(text, limit=180):
-            if not text:
-                return text
-            return text[:limit] + "..." if len(text) > limit else text
+    return pursuit_context
 
-        return {
-            "developments": [
-                {
-                    "headline": d.get("headline", ""),
-                    "what_happened": trim(d.get("what_happened", ""), 200),
-                    "why_it_matters": trim(d.get("why_it_matters", ""), 150),
-                    "source": d.get("source", ""),
-                    "url": d.get("url"),
-                }
-                for d in data.get("developments", [])[:5]
-            ],
-            "companies_to_watch": [
-                {
-                    "name": c.get("name", ""),
-                    "industry": c.get("industry", ""),
-                    "what_they_do": c.get("what_they_do", ""),
-                    "why_watch_now": trim(c.get("why_watch_now", ""), 150),
-                    "relevance": trim(c.get("relevance", ""), 150),
-                    "url": c.get("url"),
-                }
-                for c in data.get("companies_to_watch", [])[:4]
-            ],
-            "jobs_and_hiring": [
-                {
-                    "insight": trim(j.get("insight", ""), 200),
-                    "source": j.get("source", ""),
-                    "url": j.get("url"),
-                }
-                for j in data.get("jobs_and_hiring", [])[:3]
-            ],
-            "featured_resource": {
-                "title": data.get("featured_resource", {}).get("title", ""),
-                "publication": data.get("featured_resource", {}).get("publication", ""),
-                "url": data.get("featured_resource", {}).get("url"),
-                "why_read": trim(data.get("featured_resource", {}).get("why_read", ""), 150),
-                "format": data.get("featured_resource", {}).get("format", ""),
-                "estimated_time": data.get("featured_resource", {}).get("estimated_time", ""),
-            },
-        }
 
-    compressed = compress_news(news_result["data"])
-    filled_prompt = DIGEST_PROMPT.format(
-        pursuit_context=pursuit_context,
-        external_news=json.dumps(compressed, indent=2)
-    )
-
-    # Step 4: Run synthesis — retry spaced past the 60s rate limit window
-    import time
-    max_retries = 3
-    retry_delay = 65  # seconds — beyond the 1-min token window
-    for attempt in range(max_retries):
-      try:
-        response = client.messages.create(
-          model="claude-sonnet-4-6",
-          max_tokens=4096,
-          messages=[
-            {
-              "role": "user",
-              "content": filled_prompt
-            }
-          ]
+def _build_prompt(news_data: dict, pursuit_context: str, slack_section: str = SLACK_NOT_CONNECTED) -> str:
+    with span("news_compress"):
+        compressed = compress_news(news_data)
+        return DIGEST_PROMPT.format(
+            pursuit_context=pursuit_context,
+            slack_section=slack_section,
+            external_news=json.dumps(compressed, indent=2)
         )
-        result_text = next(  # type: ignore[union-attr]
-            block.text for block in response.content if block.type == "text"
-        )
-        break
-      except anthropic.RateLimitError as e:
-        print(f"Anthropic rate limit hit (attempt {attempt+1}/{max_retries}): {e}. Waiting {retry_delay}s...")
-        time.sleep(retry_delay)
-      except Exception as e:
-        print(f"Anthropic API error: {e}")
-        return {
-          "success": False,
-          "error": f"Anthropic API error: {e}"
-        }
-    else:
-      return {
-        "success": False,
-        "error": "Anthropic rate limit exceeded after retries"
-      }
 
-    # Step 5: Parse response
-    try:
+
+async def _gather_slack(supabase, week_start: date, sync: bool = True) -> tuple[str, int]:
+    """
+    Incrementally syncs the Slack channel (unless the caller already
+    has), then returns the prompt section for the week's stored messages
+    and how many there were.
+    """
+    from services.scrape_cache import article_window
+    from services.slack_ingest import load_messages, sync_from_settings
+
+    with span("slack_sync") as sync_span:
+        synced = await sync_from_settings(supabase, since=article_window(week_start)[0], fetch=sync)
+        sync_span.add(new_messages=synced.get("new_messages", 0))
+    if not synced.get("channel"):
+        return SLACK_NOT_CONNECTED, 0
+
+    messages = load_messages(synced["channel"], *article_window(week_start))
+    if not messages:
+        return SLACK_NOT_CONNECTED, 0
+
+    lines = [
+        f"- {'↳ ' if m['thread_ts'] and m['thread_ts'] != m['ts'] else ''}{m['user']}: {m['text'] or ''}"
+        for m in messages
+    ]
+    if sum(len(line) for line in lines) <= SLACK_RAW_CHAR_BUDGET:
+        return SLACK_SECTION.format(count=len(messages), messages="\n".join(lines)), len(messages)
+
+    # Too much for one prompt — map-reduce the week down to highlights
+    from services.slack_summarizer import summarize_messages
+
+    with span("slack_summarize") as summarize_span:
+        highlights = await summarize_messages(client, messages)
+        summarize_span.add(messages=len(messages), highlights=len(highlights))
+    return SLACK_HIGHLIGHTS_SECTION.format(
+        count=len(messages),
+        highlights="\n".join(f"- {h}" for h in highlights),
+    ), len(messages)
+
+
+def _parse_digest_text(result_text: str) -> dict:
+    """Strips optional markdown fences and parses the digest JSON."""
+    with span("synthesis_parse"):
         clean = result_text.strip()
         if "```json" in clean:
             clean = clean.split("```json")[1].split("```")[0]
         elif "```" in clean:
             clean = clean.split("```")[1].split("```")[0]
-        digest_data = json.loads(clean.strip())
+        return json.loads(clean.strip())
 
-    except json.JSONDecodeError as e:
-        return {
-            "success": False,
-            "error": "JSON parse failed",
-            "raw": result_text[:500]
-        }
 
-    # Step 6: Calculate week number
+def _week_number(week_start: date) -> int:
     leave_start_str = os.environ.get("LEAVE_START_DATE", "2025-03-01")
     leave_start = date.fromisoformat(leave_start_str)
-    week_number = max(1, ((week_start - leave_start).days // 7) + 1)
+    return max(1, ((week_start - leave_start).days // 7) + 1)
+
+
+def _digest_record(week_start: date, digest_data: dict, source_count: int,
+                   slack_message_count: int = 0, audience_id: str | None = None) -> dict:
+    """Maps parsed digest JSON onto a digests row."""
+    week_number = _week_number(week_start)
 
-    # Step 7: Store digest in Supabase
     raw_slack_highlights = digest_data.get("slack_highlights")
     if isinstance(raw_slack_highlights, list):
         slack_highlights = [
@@ -297,28 +324,361 @@ async def generate_digest(week_start: date) -> dict:
         "jobs_and_hiring":      digest_data.get("jobs_and_hiring"),
         "featured_resource":    digest_data.get("featured_resource"),
         "full_digest_json":     digest_data,
-        "external_source_count": news_result["source_count"],
-        "slack_message_count":  0
+        "external_source_count": source_count,
+        "slack_message_count":  slack_message_count
     }
+    if audience_id:
+        digest_record["audience_id"] = audience_id
+    return digest_record
 
-    insert_result = supabase.table("digests") \
-        .insert(digest_record) \
-        .execute()
+
+def _remembered(news_result: dict, week_start: date) -> bool:
+    """
+    Whether a digest's stories count as covered in the story memory. A
+    past week built from live news (not its archive) would hide this
+    week's stories from the next live digest.
+    """
+    return bool(news_result.get("archived")) or week_start >= date.today() - timedelta(days=date.today().weekday())
+
+
+def _index_stored(rows: list, remember: list | None = None):
+    """
+    Feeds freshly stored digest rows to the local story, search and trend
+    indexes and the feeds. `remember` limits which rows enter the story
+    memory (all of them by default). The rows are already in Supabase and
+    every index can be rebuilt from there, so a failure is only logged —
+    raising would make the caller retry and store the digest twice.
+    """
+    for name, index, index_rows in (
+        ("story memory", remember_digests, rows if remember is None else remember),
+        ("search index", maintain_local_index, rows),
+        ("trends", record_trends, rows),
+        ("feeds", record_feed, rows),
+    ):
+        try:
+            index(index_rows)
+        except Exception as e:
+            print(f"Could not update the {name} for stored digests: {e}")
+
+
+async def _store_digest(supabase, week_start: date, digest_data: dict, source_count: int,
+                        slack_message_count: int = 0, audience_id: str | None = None,
+                        remember: bool = True) -> dict:
+    """Inserts the digest row and returns the success payload."""
+    digest_record = _digest_record(week_start, digest_data, source_count, slack_message_count, audience_id)
+    week_number = digest_record["week_number"]
+
+    with span("digest_insert"):
+        insert_result = await execute(supabase.table("digests").insert(digest_record))
 
     digest_id = insert_result.data[0]["id"]
+    rows = [{**digest_record, "id": digest_id}]
+    _index_stored(rows, rows if remember else [])
 
     return {
         "success":      True,
         "digest_id":    digest_id,
         "week_number":  week_number,
         "week_start":   str(week_start),
-        "source_count": news_result["source_count"]
+        "source_count": source_count
     }
+
+
+async def generate_digest(week_start: date, audience: dict | None = None, refresh_news: bool = False,
+                          sync_slack: bool = True, archived_only: bool = False) -> dict:
+    """
+    Generates complete weekly digest.
+    Calls news_fetcher, runs synthesis,
+    stores result in Supabase.
+    Returns digest_id and stats.
+    sync_slack=False uses the Slack messages already stored locally.
+    archived_only=True fails a week with no archived news instead of
+    searching the web (see fetch_ai_news).
+    """
+    with pipeline_run(), span("pipeline") as run_span:
+        # Step 1: Fetch external news (once per week, shared by every audience)
+        news_result = await fetch_week_news(week_start, refresh=refresh_news, archived_only=archived_only)
+
+        if not news_result["success"]:
+            return {
+                "success": False,
+                "error": "News fetch failed",
+                "details": news_result.get("error")
+            }
+
+        # Step 2: Pull new Slack messages since the last sync
+        slack_section, slack_count = await _gather_slack(supabase, week_start, sync=sync_slack)
+
+        result = await _synthesize(supabase, week_start, news_result, slack_section, slack_count, audience)
+        run_span.add(success=result["success"])
+        return result
+
+
+async def generate_digests_for_audiences(week_start: date, audiences: list | None = None) -> dict:
+    """
+    Multi-audience mode: one news fetch and Slack sync for the week,
+    then one synthesis per audience, run concurrently under the shared
+    rate limiter. Defaults to the primary reader plus every active
+    row in the audiences table.
+    """
+    with pipeline_run(), span("pipeline_multi") as run_span:
+        news_result = await fetch_week_news(week_start)
+        if not news_result["success"]:
+            return {
+                "success": False,
+                "error": "News fetch failed",
+                "details": news_result.get("error")
+            }
+
+        slack_section, slack_count = await _gather_slack(supabase, week_start)
+
+        if audiences is None:
+            audiences = [None] + await load_audiences(supabase)
+
+        results = await asyncio.gather(*[
+            _synthesize(supabase, week_start, news_result, slack_section, slack_count, audience)
+            for audience in audiences
+        ])
+        run_span.add(audiences=len(audiences))
+
+    return {
+        "success": all(r["success"] for r in results),
+        "week_start": str(week_start),
+        "digests": [
+            {"audience": (audience or {}).get("name", "primary"), **result}
+            for audience, result in zip(audiences, results)
+        ],
+    }
+
+
+# ── Shared weekly news ───────────────────────────────────────────────────────
+
+NEWS_CACHE_DIR = Path(__file__).resolve().parents[1] / "data" / "news_cache"
+
+
+async def fetch_week_news(week_start: date, refresh: bool = False, archived_only: bool = False) -> dict:
+    """
+    Runs fetch_ai_news at most once per week. A successful result is
+    kept on disk so later audiences and manual regenerations reuse it
+    instead of repeating the selection and web-search round.
+    With archived_only, a cached result counts only if it was archived.
+    """
+    cache_path = NEWS_CACHE_DIR / f"{week_start}.json"
+    if not refresh and cache_path.exists():
+        cached = json.loads(cache_path.read_text())
+        if not archived_only or cached.get("archived"):
+            print(f"Reusing news fetched for week of {week_start}")
+            return cached
+
+    news_result = await fetch_ai_news(week_start, archived_only=archived_only)
+
+    if news_result["success"]:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(news_result))
+    return news_result
+
+
+async def load_audiences(supabase) -> list:
+    """Active extra readers. [] when the audiences table can't be read, so the primary reader still gets a digest."""
+    try:
+        result = await execute(
+            supabase.table("audiences")
+            .select("id, name, pursuit_context, email_to")
+            .eq("active", True)
+        )
+    except Exception as e:
+        print(f"Could not load audiences, continuing with the primary reader only: {e}")
+        return []
+    return result.data or []
+
+
+async def _audience_prompt(supabase, news_result: dict, slack_section: str, audience: dict | None = None) -> str:
+    """Synthesis prompt for one audience — its own pursuit_context first, then settings."""
+    pursuit_context = (audience or {}).get("pursuit_context") or await _load_pursuit_context(supabase)
+    filled_prompt = _build_prompt(news_result["data"], pursuit_context, slack_section)
+    if audience:
+        filled_prompt = AUDIENCE_NOTE.format(name=audience["name"]) + filled_prompt
+    return filled_prompt
+
+
+async def _synthesize(supabase, week_start: date, news_result: dict, slack_section: str,
+                      slack_count: int, audience: dict | None = None) -> dict:
+    """Runs synthesis for one audience and stores the digest."""
+
+    # Steps 3-4: Reader context and compressed news
+    filled_prompt = await _audience_prompt(supabase, news_result, slack_section, audience)
+
+    # Step 5: Run synthesis — the shared limiter paces calls and waits
+    # out any 429 using the server's retry-after
+    try:
+        response = await create_message(
+            client,
+            stage="synthesis",
+            max_tokens=4096,
+            messages=[
+                {
+                    "role": "user",
+                    "content": filled_prompt
+                }
+            ]
+        )
+        result_text = "".join(
+            block.text for block in response.content if isinstance(getattr(block, "text", None), str)
+        )
+    except anthropic.RateLimitError:
+        return {
+            "success": False,
+            "error": "Anthropic rate limit exceeded after retries"
+        }
+    except Exception as e:
+        print(f"Anthropic API error: {e}")
+        return {
+            "success": False,
+            "error": f"Anthropic API error: {e}"
+        }
+
+    # Step 6: Parse response
+    try:
+        digest_data = _parse_digest_text(result_text)
+    except json.JSONDecodeError as e:
+        return {
+            "success": False,
+            "error": "JSON parse failed",
+            "raw": result_text[:500]
+        }
+
+    # Step 7: Canonicalize links and drop dead ones
+    await verify_digest_links(digest_data)
+
+    # Step 8: Store digest in Supabase
+    return await _store_digest(
+        supabase, week_start, digest_data, news_result["source_count"], slack_count,
+        audience_id=(audience or {}).get("id"), remember=_remembered(news_result, week_start),
+    )
+
+
+# ── Streaming synthesis ──────────────────────────────────────────────────────
+
+class SectionStreamParser:
+    """
+    Incrementally parses the digest JSON as text deltas arrive.
+    feed() returns each top-level (key, value) pair as soon as its
+    value is complete, so week_summary surfaces before the rest.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._entry_start = None
+
+    def feed(self, chunk: str) -> list:
+        self._buf += chunk
+        sections = []
+
+        while self._pos < len(self._buf):
+            ch = self._buf[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                # Skip any preamble or ```json fence before the root object
+                if ch == "{":
+                    self._depth = 1
+                    self._entry_start = self._pos + 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    sections.extend(self._emit(self._pos))
+            elif ch == "," and self._depth == 1:
+                sections.extend(self._emit(self._pos))
+                self._entry_start = self._pos + 1
+
+            self._pos += 1
+
+        return sections
+
+    def _emit(self, end: int) -> list:
+        entry = self._buf[self._entry_start:end].strip()
+        if not entry:
+            return []
+        try:
+            return list(json.loads("{" + entry + "}").items())
+        except json.JSONDecodeError:
+            return []
+
+
+async def stream_digest(week_start: date):
+    """
+    Streaming variant of generate_digest.
+    Yields (event, payload) tuples: "status" while fetching,
+    one "section" per top-level digest key as it completes,
+    then "done" with the stored digest_id — or "error".
+    """
+    yield "status", {"stage": "fetching_news"}
+
+    news_result = await fetch_week_news(week_start)
+
+    if not news_result["success"]:
+        yield "error", {"error": "News fetch failed", "details": news_result.get("error")}
+        return
+
+    pursuit_context = await _load_pursuit_context(supabase)
+    slack_section, slack_count = await _gather_slack(supabase, week_start)
+    filled_prompt = _build_prompt(news_result["data"], pursuit_context, slack_section)
+
+    yield "status", {"stage": "synthesizing"}
+
+    parser = SectionStreamParser()
+    result_text = ""
+    try:
+        async with stream_message(
+            async_client,
+            stage="synthesis",
+            max_tokens=4096,
+            messages=[{"role": "user", "content": filled_prompt}],
+        ) as stream:
+            async for text in stream.text_stream:
+                result_text += text
+                for key, value in parser.feed(text):
+                    yield "section", {"key": key, "value": value}
+    except Exception as e:
+        print(f"Anthropic streaming error: {e}")
+        yield "error", {"error": f"Anthropic API error: {e}"}
+        return
+
+    try:
+        digest_data = _parse_digest_text(result_text)
+    except json.JSONDecodeError:
+        yield "error", {"error": "JSON parse failed", "raw": result_text[:500]}
+        return
+
+    await verify_digest_links(digest_data)
+
+    yield "done", await _store_digest(supabase, week_start, digest_data, news_result["source_count"], slack_count,
+                                      remember=_remembered(news_result, week_start))
+
+
 if __name__ == "__main__":
     from datetime import date
     import asyncio
+    from services.config import load_env
 
+    load_env()
     print("Digest synthesizer pipeline main entry")
-    week_start = date.today()
+    # For a date range use: python -m services.backfill --start YYYY-MM-DD
+    today = date.today()
+    week_start = today - timedelta(days=today.weekday())
     result = asyncio.run(generate_digest(week_start))
     print("Pipeline result:", result)
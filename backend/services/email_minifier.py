@@ -0,0 +1,39 @@
+import re
+
+# ── Email HTML minification ──────────────────────────────────────────────────
+# Gmail clips messages over ~102KB and every byte is paid again on the
+# Resend send. Styles stay inline (Gmail apps and Outlook ignore <style>
+# blocks in places), so the pass only does what every client tolerates:
+# normalizes each style attribute, drops comments and collapses the
+# whitespace the f-string templates indent with.
+
+BLOCK_TAGS = "html|head|body|meta|title|table|tr|td|div|!DOCTYPE"
+
+COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)  # keeps Outlook conditionals
+STYLE_ATTR = re.compile(r'style="([^"]*)"')
+WHITESPACE = re.compile(r"\s+")
+AROUND_BLOCK = re.compile(rf"\s*(</?(?:{BLOCK_TAGS})\b[^>]*>)\s*", re.IGNORECASE)
+HEX_COLOR = re.compile(r"#[0-9a-fA-F]{6}\b")
+LONG_HEX = re.compile(r"#([0-9a-f])\1([0-9a-f])\2([0-9a-f])\3\b")
+LEADING_ZERO = re.compile(r"(?<![\d.])0\.(\d)")
+
+
+def minify_style(style: str) -> str:
+    """One style attribute → its shortest equivalent. A repeated property keeps its last value."""
+    declarations = {}
+    for declaration in style.split(";"):
+        prop, sep, value = declaration.partition(":")
+        if not sep or not prop.strip():
+            continue
+        value = WHITESPACE.sub(" ", value.strip())
+        value = LONG_HEX.sub(r"#\1\2\3", HEX_COLOR.sub(lambda m: m.group(0).lower(), value))
+        declarations.pop(prop.strip().lower(), None)
+        declarations[prop.strip().lower()] = LEADING_ZERO.sub(r".\1", value)
+    return ";".join(f"{prop}:{value}" for prop, value in declarations.items())
+
+
+def minify_html(html: str) -> str:
+    html = COMMENT.sub("", html)
+    html = STYLE_ATTR.sub(lambda m: f'style="{minify_style(m.group(1))}"', html)
+    html = WHITESPACE.sub(" ", html)
+    return AROUND_BLOCK.sub(r"\1", html).strip()
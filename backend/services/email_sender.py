@@ -1,18 +1,23 @@
+import asyncio
 import resend
 import os
-from pathlib import Path
-from dotenv import load_dotenv
-from supabase import create_client
+from services import clients
+from services.clients import LazyProxy
+from services.config import get_settings
+from services.db import execute
+from services.email_minifier import minify_html
+from services.summarizer import summarize
+from services.telemetry import span
 
-load_dotenv(Path(__file__).resolve().parents[1] / ".env")
-resend.api_key = os.environ.get("RESEND_API_KEY")
 
 def get_supabase():
-    supabase_url = os.environ.get("SUPABASE_URL")
-    supabase_key = os.environ.get("SUPABASE_SERVICE_KEY")
-    if not supabase_url or not supabase_key:
-        raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY in backend/.env")
-    return create_client(supabase_url, supabase_key)
+    return clients.get_supabase()
+
+
+supabase = LazyProxy(lambda: get_supabase())
+
+# Gmail clips anything over ~102KB behind "View entire message"
+EMAIL_SIZE_BUDGET = 100_000
 
 
 def build_email_html(digest: dict) -> str:
@@ -167,20 +172,94 @@ def build_email_html(digest: dict) -> str:
     return html
 
 
-async def send_digest_email() -> dict:
+# ── Size budget ──────────────────────────────────────────────────────────────
+# Optional content, dropped in this order until the minified email fits.
+# The week summary and the top developments are always sent.
+
+def _drop_featured(digest):
+    digest["featured_resource"] = {}
+
+
+def _drop_companies(digest):
+    digest["companies_to_watch"] = []
+
+
+def _drop_reasoning(digest):
+    digest["pursuit_implications"] = [{**imp, "reasoning": ""} for imp in digest.get("pursuit_implications") or []]
+
+
+def _shorten_developments(digest):
+    digest["ai_developments"] = [
+        {**dev, "synthesis": summarize(dev.get("synthesis"), 60), "why_it_matters": summarize(dev.get("why_it_matters"), 40)}
+        for dev in digest.get("ai_developments") or []
+    ]
+
+
+def _top_developments(digest):
+    digest["ai_developments"] = (digest.get("ai_developments") or [])[:3]
+
+
+OPTIONAL_CONTENT = [
+    ("featured_resource", _drop_featured),
+    ("companies_to_watch", _drop_companies),
+    ("implication_reasoning", _drop_reasoning),
+    ("development_detail", _shorten_developments),
+    ("developments_after_3", _top_developments),
+]
+
+
+def email_size_budget() -> int:
+    return int(os.environ.get("EMAIL_SIZE_BUDGET", EMAIL_SIZE_BUDGET))
+
+
+def render_email(digest: dict, budget: int | None = None) -> dict:
+    """
+    Minified email HTML within budget bytes.
+    Returns {"html", "size_bytes", "raw_bytes", "trimmed"} — trimmed lists
+    the optional content dropped to fit.
+    """
+    budget = budget or email_size_budget()
+    raw = build_email_html(digest)
+    html, trimmed = minify_html(raw), []
+    digest = dict(digest)
+    for name, trim in OPTIONAL_CONTENT:
+        if len(html.encode("utf-8")) <= budget:
+            break
+        trim(digest)
+        trimmed.append(name)
+        html = minify_html(build_email_html(digest))
+
+    size = len(html.encode("utf-8"))
+    if size > budget:
+        print(f"Email is {size} bytes after trimming, over the {budget} byte budget")
+    elif trimmed:
+        print(f"Email trimmed to {size} bytes: dropped {', '.join(trimmed)}")
+    return {"html": html, "size_bytes": size, "raw_bytes": len(raw.encode("utf-8")), "trimmed": trimmed}
+
+
+async def send_digest_email(audience: dict | None = None) -> dict:
     """
     Fetches latest digest from Supabase
     and sends as HTML email via Resend.
+    With an audience row, sends that audience's
+    latest digest to its email_to instead.
     """
 
-    supabase = get_supabase()
+    resend.api_key = get_settings().resend_api_key
+    sent_to = (audience or {}).get("email_to") or os.environ.get("EMAIL_TO", "joanna@pursuit.org")
 
-    # Get latest digest
-    result = supabase.table("digests") \
-        .select("*") \
-        .order("generated_at", desc=True) \
-        .limit(1) \
-        .execute()
+    # Get latest digest for this audience (primary reader when None)
+    query = supabase.table("digests").select("*")
+    if audience:
+        query = query.eq("audience_id", audience["id"])
+    else:
+        query = query.is_("audience_id", "null")
+
+    result = await execute(
+        query
+        .order("generated_at", desc=True)
+        .limit(1)
+    )
 
     if not result.data:
         return {
@@ -199,43 +278,51 @@ async def send_digest_email() -> dict:
     subject = f"Connection OS · Week {digest['week_number']} · {top_headline}"
 
     # Build HTML
-    html_content = build_email_html(digest)
+    with span("email_render") as render_span:
+        rendered = render_email(digest)
+        html_content = rendered["html"]
+        render_span.add(size_bytes=rendered["size_bytes"], raw_bytes=rendered["raw_bytes"],
+                        trimmed=len(rendered["trimmed"]))
 
     # Send via Resend
     try:
-        response = resend.Emails.send({
-            "from": os.environ.get("EMAIL_FROM", "digest@connectionos.app"),
-            "to": os.environ.get("EMAIL_TO", "joanna@pursuit.org"),
-            "subject": subject,
-            "html": html_content
-        })
+        with span("email_send"):
+            response = await asyncio.to_thread(resend.Emails.send, {
+                "from": os.environ.get("EMAIL_FROM", "digest@connectionos.app"),
+                "to": sent_to,
+                "subject": subject,
+                "html": html_content
+            })
 
         # Log to Supabase
-        supabase.table("email_log").insert({
+        await execute(supabase.table("email_log").insert({
             "digest_id":   digest["id"],
             "week_number": digest["week_number"],
             "subject":     subject,
-            "sent_to":     os.environ.get("EMAIL_TO"),
-            "status":      "sent"
-        }).execute()
+            "sent_to":     sent_to,
+            "status":      "sent",
+            "size_bytes":  rendered["size_bytes"]
+        }))
 
         return {
             "success":     True,
             "email_id":    response.get("id"),
-            "sent_to":     os.environ.get("EMAIL_TO"),
+            "sent_to":     sent_to,
             "subject":     subject,
-            "week_number": digest["week_number"]
+            "week_number": digest["week_number"],
+            "size_bytes":  rendered["size_bytes"]
         }
 
     except Exception as e:
         # Log failure
-        supabase.table("email_log").insert({
+        await execute(supabase.table("email_log").insert({
             "digest_id":   digest["id"],
             "week_number": digest["week_number"],
             "subject":     subject,
-            "sent_to":     os.environ.get("EMAIL_TO"),
-            "status":      "failed"
-        }).execute()
+            "sent_to":     sent_to,
+            "status":      "failed",
+            "size_bytes":  rendered["size_bytes"]
+        }))
 
         return {
             "success": False,
@@ -0,0 +1,129 @@
+import re
+from collections import deque
+from functools import lru_cache
+
+# ── Entity resolution ────────────────────────────────────────────────────────
+# Known company names and their corporate aliases map to one parent, so
+# "Google DeepMind", "Alphabet Inc." and "AWS" resolve alike and the Big
+# Tech filter, dedupe, story memory and trends agree on identity. A name
+# must *be* the alias (legal suffixes aside): "Meta Health Labs" is its own
+# startup, not Meta. PhraseMatcher scans free text, e.g. for trend topics.
+
+# canonical key → display name, Big Tech flag and company aliases (no product names)
+KNOWN_ENTITIES = {
+    "google":     ("Google", True, ["google", "alphabet", "deepmind", "google deepmind", "google cloud", "waymo"]),
+    "apple":      ("Apple", True, ["apple"]),
+    "microsoft":  ("Microsoft", True, ["microsoft", "msft"]),
+    "meta":       ("Meta", True, ["meta", "meta platforms", "facebook"]),
+    "amazon":     ("Amazon", True, ["amazon", "aws", "amazon web services"]),
+    "openai":     ("OpenAI", True, ["openai", "open ai"]),
+    "anthropic":  ("Anthropic", True, ["anthropic"]),
+    "salesforce": ("Salesforce", True, ["salesforce", "slack technologies"]),
+}
+
+COMPANY_SUFFIXES = {"inc", "incorporated", "corp", "corporation", "co", "llc", "ltd", "plc", "pbc", "ai", "labs"}
+
+
+def normalize_text(text: str | None) -> str:
+    """Lowercase words separated by single spaces, padded so matches fall on word boundaries."""
+    return f" {' '.join(re.findall(r'[a-z0-9]+', (text or '').lower()))} "
+
+
+def company_key(name: str | None) -> str:
+    """Fallback identity for companies the automaton doesn't know: words minus legal suffixes."""
+    words = normalize_text(name).split()
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton mapping whole-word phrases to values."""
+
+    def __init__(self, phrases: dict):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for phrase, value in phrases.items():
+            self._add(normalize_text(phrase), value)
+        self._link()
+
+    def _add(self, pattern: str, value):
+        node = 0
+        for ch in pattern:
+            if ch not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+                self.goto[node][ch] = len(self.goto) - 1
+            node = self.goto[node][ch]
+        self.out[node].append((len(pattern), value))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, text: str | None) -> list:
+        """(start, length, value) for every phrase in text, in one pass."""
+        normalized = normalize_text(text)
+        matches, node = [], 0
+        for i, ch in enumerate(normalized):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, value in self.out[node]:
+                matches.append((i + 1 - length, length, value))
+        return matches
+
+    def values(self, text: str | None) -> set:
+        return {value for _, _, value in self.find(text)}
+
+
+class EntityResolver:
+    def __init__(self, entities: dict = KNOWN_ENTITIES):
+        self.entities = entities
+        self.aliases = {
+            company_key(alias): key for key, (_, _, aliases) in entities.items() for alias in aliases
+        }
+
+    def resolve(self, name: str | None) -> tuple[str, str]:
+        """(canonical key, display name). Only a name that is a known alias, plus legal suffixes, resolves to it."""
+        fallback = company_key(name)
+        key = self.aliases.get(normalize_text(name).strip()) or self.aliases.get(fallback)
+        if key:
+            return key, self.entities[key][0]
+        return fallback, (name or "").strip()
+
+    def key(self, name: str | None) -> str:
+        return self.resolve(name)[0]
+
+    def is_big_tech(self, name: str | None) -> bool:
+        key = self.key(name)
+        return key in self.entities and self.entities[key][1]
+
+    def filter_big_tech(self, companies: list) -> list:
+        return [c for c in companies if not self.is_big_tech(c.get("name"))]
+
+    def dedupe(self, companies: list) -> list:
+        """Keeps the first company for each canonical identity."""
+        seen, out = set(), []
+        for c in companies:
+            key = self.key(c.get("name"))
+            if key and key not in seen:
+                seen.add(key)
+                out.append(c)
+        return out
+
+
+@lru_cache(maxsize=1)
+def get_resolver() -> EntityResolver:
+    """Built once per process — the automaton is reused for every lookup."""
+    return EntityResolver()
@@ -0,0 +1,299 @@
+import asyncio
+import html
+import json
+import os
+import re
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+
+from services.clients import http_client
+from services.local_store import connect
+from services.story_memory import normalize_url
+from services.telemetry import span
+
+# ── Feed scraper ─────────────────────────────────────────────────────────────
+# Pulls the RSS/Atom sources below concurrently through one pooled client
+# (at most PER_HOST_LIMIT requests per host) and writes the `articles` JSON
+# that news_fetcher.fetch_from_scraped reads. Each feed's ETag and
+# Last-Modified are kept, so an unchanged feed costs a 304 and its last
+# parsed articles are reused. Override the sources with FEED_SOURCES_PATH
+# (a JSON list of {name, url, tier, tags}).
+
+FEED_STATE_PATH = Path(__file__).resolve().parents[1] / "data" / "feed_state.db"
+
+FEED_SOURCES = [
+    {"name": "TechCrunch AI", "url": "https://techcrunch.com/category/artificial-intelligence/feed/",
+     "tier": "TIER2_NEWS", "tags": ["ai-companies"]},
+    {"name": "The Verge AI", "url": "https://www.theverge.com/rss/ai-artificial-intelligence/index.xml",
+     "tier": "TIER2_NEWS", "tags": ["ai-companies"]},
+    {"name": "MIT Technology Review", "url": "https://www.technologyreview.com/topic/artificial-intelligence/feed",
+     "tier": "TIER2_NEWS", "tags": ["ai-companies"]},
+    {"name": "TensorFlow Blog", "url": "https://blog.tensorflow.org/feeds/posts/default",
+     "tier": "TIER1_NEWSLETTER", "tags": ["ai-companies"]},
+    {"name": "Anthropic News", "url": "https://www.anthropic.com/news/rss.xml",
+     "tier": "TIER1_NEWSLETTER", "tags": ["ai-companies"]},
+]
+
+# Extra tags when a title or summary mentions the topic
+TAG_KEYWORDS = {
+    "education": ("education", "student", "school", "teacher", "university", "bootcamp", "learning"),
+    "jobs":      ("jobs", "hiring", "layoff", "workforce", "workers", "careers", "skills"),
+}
+
+PER_HOST_LIMIT = 2
+MAX_CONNECTIONS = 10
+MAX_AGE_DAYS = 14
+SUMMARY_CHARS = 600
+
+USER_AGENT = "Mozilla/5.0 (compatible; ReturnReadyFeedScraper/1.0)"
+
+EPOCH = datetime.min.replace(tzinfo=timezone.utc)  # sorts undated entries last
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+
+
+def load_sources(path: Path | None = None) -> list:
+    path = path or os.environ.get("FEED_SOURCES_PATH")
+    if path:
+        return json.loads(Path(path).read_text())
+    return FEED_SOURCES
+
+
+# ── Parsing ──────────────────────────────────────────────────────────────────
+
+def _text(element: ET.Element | None) -> str:
+    return (element.text or "").strip() if element is not None else ""
+
+
+def _plain(markup: str) -> str:
+    """HTML fragment → one line of text, cut at SUMMARY_CHARS."""
+    text = html.unescape(re.sub(r"<[^>]+>", " ", html.unescape(markup or "")))
+    text = re.sub(r"\s+", " ", text).strip()
+    return text[:SUMMARY_CHARS]
+
+
+def _parse_date(value: str) -> datetime | None:
+    """RSS (RFC 822) or Atom (ISO 8601) timestamp, always timezone-aware."""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _atom_link(entry: ET.Element) -> str:
+    for link in entry.findall(f"{ATOM}link"):
+        if link.get("rel", "alternate") == "alternate" and link.get("href"):
+            return link.get("href")
+    return ""
+
+
+def parse_feed(body: bytes) -> list:
+    """Entries of an RSS 2.0 or Atom document as {title, url, summary, published}."""
+    root = ET.fromstring(body)
+    entries = []
+    if root.tag == f"{ATOM}feed":
+        for entry in root.findall(f"{ATOM}entry"):
+            entries.append({
+                "title": _plain(_text(entry.find(f"{ATOM}title"))),
+                "url": _atom_link(entry),
+                "summary": _plain(_text(entry.find(f"{ATOM}summary")) or _text(entry.find(f"{ATOM}content"))),
+                "published": _parse_date(_text(entry.find(f"{ATOM}published")) or _text(entry.find(f"{ATOM}updated"))),
+            })
+    else:
+        for item in root.iter("item"):
+            entries.append({
+                "title": _plain(_text(item.find("title"))),
+                "url": _text(item.find("link")),
+                "summary": _plain(_text(item.find("description")) or _text(item.find(f"{CONTENT}encoded"))),
+                "published": _parse_date(_text(item.find("pubDate"))),
+            })
+    return [e for e in entries if e["title"] and e["url"]]
+
+
+def _tags(source: dict, entry: dict) -> list:
+    text = f" {entry['title']} {entry['summary']} ".lower()
+    tags = list(source.get("tags", []))
+    tags += [tag for tag, words in TAG_KEYWORDS.items() if tag not in tags and any(w in text for w in words)]
+    return tags
+
+
+def _to_articles(source: dict, entries: list, scraped_at: str) -> list:
+    return [
+        {
+            "title": entry["title"],
+            "url": entry["url"],
+            "summary": entry["summary"],
+            "published_date": entry["published"].isoformat() if entry["published"] else "",
+            "source": source["name"],
+            "tier": source.get("tier", "TIER2_NEWS"),
+            "scraped_at": scraped_at,
+            "tags": _tags(source, entry),
+        }
+        for entry in entries
+    ]
+
+
+# ── Conditional GET state ────────────────────────────────────────────────────
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return connect(path, """
+        CREATE TABLE IF NOT EXISTS feed_state (
+            url           TEXT PRIMARY KEY,
+            etag          TEXT,
+            last_modified TEXT,
+            articles      TEXT NOT NULL,   -- JSON of the last 200 response's articles
+            fetched_at    REAL NOT NULL
+        );
+    """)
+
+
+def _load_state(path: Path) -> dict:
+    with _connect(path) as conn:
+        rows = conn.execute("SELECT url, etag, last_modified, articles FROM feed_state").fetchall()
+    return {url: {"etag": etag, "last_modified": modified, "articles": json.loads(articles)}
+            for url, etag, modified, articles in rows}
+
+
+def _save_state(updates: dict, path: Path):
+    now = time.time()
+    with _connect(path) as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO feed_state VALUES (?, ?, ?, ?, ?)",
+            [(url, s["etag"], s["last_modified"], json.dumps(s["articles"]), now) for url, s in updates.items()],
+        )
+
+
+# ── Fetching ─────────────────────────────────────────────────────────────────
+
+async def _fetch_source(client: httpx.AsyncClient, source: dict, state: dict | None,
+                        host_limits: dict, scraped_at: str) -> dict:
+    """{"status", "articles", "state"} for one feed; state is None when nothing changed."""
+    headers = {}
+    if state and state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state and state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+
+    async with host_limits[urlsplit(source["url"]).netloc.lower()]:
+        try:
+            resp = await client.get(source["url"], headers=headers)
+        except httpx.HTTPError as e:
+            print(f"Feed fetch failed for {source['name']}: {e}")
+            return {"status": "error", "articles": (state or {}).get("articles", []), "state": None}
+
+    if resp.status_code == 304 and state:
+        return {"status": "not_modified", "articles": state["articles"], "state": None}
+    if resp.status_code != 200:
+        print(f"Feed {source['name']} returned {resp.status_code}")
+        return {"status": "error", "articles": (state or {}).get("articles", []), "state": None}
+
+    try:
+        articles = _to_articles(source, parse_feed(resp.content), scraped_at)
+    except ET.ParseError as e:
+        print(f"Feed {source['name']} is not valid XML: {e}")
+        return {"status": "error", "articles": (state or {}).get("articles", []), "state": None}
+    return {
+        "status": "fetched",
+        "articles": articles,
+        "state": {
+            "etag": resp.headers.get("etag"),
+            "last_modified": resp.headers.get("last-modified"),
+            "articles": articles,
+        },
+    }
+
+
+async def scrape_feeds(sources: list | None = None, client: httpx.AsyncClient | None = None,
+                       state_path: Path | None = None, max_age_days: int = MAX_AGE_DAYS) -> dict:
+    """
+    Fetches every source concurrently and returns the scraped_articles
+    document: recent articles, newest first, one per URL.
+    """
+    sources = sources if sources is not None else load_sources()
+    state_path = state_path or FEED_STATE_PATH
+    state = _load_state(state_path)
+    scraped_at = datetime.now(timezone.utc).isoformat()
+    host_limits = defaultdict(lambda: asyncio.Semaphore(PER_HOST_LIMIT))
+
+    with span("feed_scrape") as scrape_span:
+        owns_client = client is None
+        client = client or http_client(USER_AGENT, 15.0, MAX_CONNECTIONS)
+        try:
+            results = await asyncio.gather(*[
+                _fetch_source(client, source, state.get(source["url"]), host_limits, scraped_at)
+                for source in sources
+            ], return_exceptions=True)
+        finally:
+            if owns_client:
+                await client.aclose()
+        for i, (source, result) in enumerate(zip(sources, results)):
+            if isinstance(result, Exception):
+                # One broken feed keeps its last articles; the rest of the scrape still lands
+                print(f"Feed {source['name']} failed: {result}")
+                previous = state.get(source["url"]) or {}
+                results[i] = {"status": "error", "articles": previous.get("articles", []), "state": None}
+
+        _save_state({s["url"]: r["state"] for s, r in zip(sources, results) if r["state"]}, state_path)
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+        fetched = [a for r in results for a in r["articles"]]
+        dated = [(_parse_date(a["published_date"]) or EPOCH, a) for a in fetched]
+        seen, articles = set(), []
+        for published, article in sorted(dated, key=lambda d: d[0], reverse=True):
+            key = normalize_url(article["url"])
+            if key in seen or EPOCH < published < cutoff:
+                continue
+            seen.add(key)
+            articles.append(article)
+
+        statuses = [r["status"] for r in results]
+        stats = {s: statuses.count(s) for s in ("fetched", "not_modified", "error")}
+        scrape_span.add(feeds=len(sources), articles=len(articles), **stats)
+
+    print(f"Scraped {len(sources)} feeds ({stats['fetched']} changed, {stats['not_modified']} unchanged, "
+          f"{stats['error']} failed) — {len(articles)} articles")
+    return {"scraped_at": scraped_at, "total_articles": len(fetched), "articles": articles, "feeds": stats}
+
+
+def write_scraped(document: dict, path: Path | None = None) -> Path:
+    """Atomically replaces the feed scrape fetch_from_scraped reads."""
+    from services.news_fetcher import FEED_SCRAPE_PATH
+
+    path = path or FEED_SCRAPE_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(document, indent=2, ensure_ascii=False))
+    tmp.replace(path)
+    return path
+
+
+async def refresh_scraped_articles(path: Path | None = None) -> dict:
+    """Scrapes every configured feed and writes the result for the news fetcher."""
+    document = await scrape_feeds()
+    if not document["articles"]:
+        # Keep the previous file rather than replacing it with nothing
+        return {"success": False, "error": "No articles scraped", "feeds": document["feeds"]}
+    written = write_scraped(document, path)
+    return {"success": True, "path": str(written), "articles": len(document["articles"]), "feeds": document["feeds"]}
+
+
+if __name__ == "__main__":
+    from services.config import load_env
+
+    load_env()
+    print(asyncio.run(refresh_scraped_articles()))
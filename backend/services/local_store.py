@@ -0,0 +1,31 @@
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+# ── Local SQLite stores ──────────────────────────────────────────────────────
+# Caches and indexes live in SQLite files under backend/data. Heroku wipes
+# that disk on every dyno restart and deploy, so the stores that mirror the
+# digests table (story memory, trends, the feeds) mark when they were seeded
+# from the whole archive and are re-seeded from Supabase when the marker is
+# missing. Everything else there is a cache that simply refills.
+
+META_SCHEMA = "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT);"
+
+
+def connect(path: Path, schema: str = "") -> sqlite3.Connection:
+    """Opens a store, creating its directory and tables (and the seed marker table) on first use."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(schema + META_SCHEMA)
+    return conn
+
+
+def is_seeded(path: Path) -> bool:
+    """Whether the store was built from the whole archive, not just digests stored since the disk came up."""
+    with connect(path) as conn:
+        return conn.execute("SELECT 1 FROM store_meta WHERE key = 'seeded_at'").fetchone() is not None
+
+
+def mark_seeded(conn: sqlite3.Connection):
+    conn.execute("INSERT OR REPLACE INTO store_meta VALUES ('seeded_at', ?)",
+                 (datetime.now(timezone.utc).isoformat(),))
@@ -0,0 +1,115 @@
+import os
+import threading
+
+# ── Model tiers ──────────────────────────────────────────────────────────────
+# Selection, extraction and filtering run on the fast tier; only the final
+# digest synthesis needs the large model. Override a tier with
+# MODEL_TIER_FAST / MODEL_TIER_LARGE, or one stage with MODEL_<STAGE>
+# (e.g. MODEL_NEWS_SELECTION=claude-sonnet-4-6).
+
+MODEL_TIERS = {
+    "fast":  "claude-haiku-4-5",
+    "large": "claude-sonnet-4-6",
+}
+
+STAGE_TIERS = {
+    "news_preselect":   "fast",   # shortlist one day's scraped articles
+    "news_selection":   "fast",   # pick developments/jobs/resource from scraped articles
+    "news_search":      "fast",   # web-search fallback when no scrape exists
+    "companies_search": "fast",   # web search for Companies to Watch
+    "companies_backup": "fast",   # extract companies from scraped articles
+    "slack_map":        "fast",   # summarize one day/thread chunk of Slack
+    "slack_reduce":     "fast",   # merge chunk summaries into weekly highlights
+    "synthesis":        "large",  # final weekly digest
+}
+
+# USD per million tokens (input, output)
+MODEL_PRICING = {
+    "claude-haiku-4-5":  (1.00, 5.00),
+    "claude-sonnet-4-6": (3.00, 15.00),
+    "claude-opus-4-1":   (15.00, 75.00),
+}
+
+WEB_SEARCH_COST = 10.00 / 1000  # USD per search
+
+BATCH_DISCOUNT = 0.5  # Message Batches API bills tokens at half price
+
+
+def model_for(stage: str) -> str:
+    """Resolves the model for a pipeline stage."""
+    override = os.environ.get(f"MODEL_{stage.upper()}")
+    if override:
+        return override
+    tier = STAGE_TIERS.get(stage, "large")
+    return os.environ.get(f"MODEL_TIER_{tier.upper()}", MODEL_TIERS[tier])
+
+
+def routing_table() -> dict:
+    return {stage: model_for(stage) for stage in STAGE_TIERS}
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int, web_searches: int = 0,
+                  batch: bool = False) -> float:
+    # Unknown models are priced as the large tier so cost is never under-reported
+    input_price, output_price = MODEL_PRICING.get(model, MODEL_PRICING[MODEL_TIERS["large"]])
+    token_cost = input_tokens * input_price / 1_000_000 + output_tokens * output_price / 1_000_000
+    if batch:
+        token_cost *= BATCH_DISCOUNT
+    return token_cost + web_searches * WEB_SEARCH_COST
+
+
+# ── Per-stage stats ──────────────────────────────────────────────────────────
+
+_stage_stats: dict = {}
+_stats_lock = threading.Lock()
+
+
+def _usage_count(usage, field: str) -> int:
+    value = getattr(usage, field, None)
+    return value if isinstance(value, int) else 0
+
+
+def record_stage(stage: str, model: str, latency: float, usage, web_searches: int = 0,
+                 batch: bool = False) -> dict:
+    """
+    Adds one call's latency, tokens and cost to the running totals
+    for its stage. Returns the per-call figures.
+    """
+    server_tool_use = getattr(usage, "server_tool_use", None)
+    call = {
+        "input_tokens": _usage_count(usage, "input_tokens"),
+        "output_tokens": _usage_count(usage, "output_tokens"),
+        "cached_tokens": _usage_count(usage, "cache_read_input_tokens"),
+        "web_searches": _usage_count(server_tool_use, "web_search_requests") or web_searches,
+    }
+    call["cost_usd"] = estimate_cost(
+        model, call["input_tokens"], call["output_tokens"], call["web_searches"], batch=batch
+    )
+
+    with _stats_lock:
+        stats = _stage_stats.setdefault((stage, model), {
+            "calls": 0, "latency_s": 0.0, "input_tokens": 0,
+            "output_tokens": 0, "cached_tokens": 0, "web_searches": 0, "cost_usd": 0.0,
+        })
+        stats["calls"] += 1
+        stats["latency_s"] += latency
+        for key in ("input_tokens", "output_tokens", "cached_tokens", "web_searches", "cost_usd"):
+            stats[key] += call[key]
+
+    print(f"[{stage}] {model} {latency:.1f}s "
+          f"in={call['input_tokens']} out={call['output_tokens']} ${call['cost_usd']:.4f}")
+    return call
+
+
+def stage_report() -> list:
+    """Per stage+model totals with average latency — for tuning the routing table."""
+    with _stats_lock:
+        return [
+            {
+                "stage": stage,
+                "model": model,
+                **stats,
+                "avg_latency_s": stats["latency_s"] / stats["calls"],
+            }
+            for (stage, model), stats in sorted(_stage_stats.items())
+        ]
@@ -1,17 +1,27 @@
-import anthropic
 import json
-import os
+from datetime import date, timedelta
 from pathlib import Path
-from dotenv import load_dotenv
 
-load_dotenv(Path(__file__).resolve().parents[1] / ".env")
-
-client = anthropic.Anthropic(
-    api_key=os.environ.get("ANTHROPIC_API_KEY")
-)
-
-# Path where the scraper drops its output
+from services.article_extractor import PROMPT_CHARS, extract_articles, extraction_enabled
+from services.clients import LazyProxy, get_anthropic
+from services.db import run
+from services.entity_resolver import get_resolver
+from services.model_router import model_for
+from services.rate_limiter import create_message
+from services.scrape_cache import ScrapeWatermark, article_window, cache_key, get_cached, in_window, put_cached
+from services.search_memory import WeekSearches, search_tool
+from services.story_memory import StoryMemory
+from services.summarizer import CHARS_PER_TOKEN, summarize
+from services.telemetry import span
+
+client = LazyProxy(get_anthropic)
+
+# The committed scrape, and the untracked file the feed scraper writes; the latter wins when present
 SCRAPED_DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "scraped_articles.json"
+FEED_SCRAPE_PATH = Path(__file__).resolve().parents[1] / "data" / "feed_articles.json"
+
+# Each scraped summary is cut to its best sentences within this many tokens
+SUMMARY_TOKENS = 75
 
 # ── Scraper selection: developments, jobs, featured resource only ────────────
 # Companies to Watch is always fetched via web search (see COMPANIES_FETCH_PROMPT).
@@ -45,6 +55,8 @@ Below is a list of articles scraped this week from AI news sources.
 Select only the most relevant and impactful items for a workforce
 development leader. Skip anything that is not genuinely AI-related
 or that is too technical/niche to matter to this audience.
+Where an article has a "content" excerpt of its full text, rely on
+it over the short summary.
 
 SCRAPED ARTICLES:
 {articles}
@@ -329,36 +341,48 @@ def _parse_json_response(text: str) -> dict:
     return json.loads(clean.strip())
 
 
-BIG_TECH = {"google", "apple", "microsoft", "meta", "amazon", "openai", "anthropic", "salesforce"}
-
-
 def _filter_big_tech(companies: list) -> list:
-    return [c for c in companies if c.get("name", "").lower() not in BIG_TECH]
+    """Drops Big Tech by alias too — "Google DeepMind", "AWS", "Meta Platforms"."""
+    return get_resolver().filter_big_tech(companies)
 
 
 def _dedupe_companies(companies: list) -> list:
-    seen, out = set(), []
-    for c in companies:
-        key = c.get("name", "").lower()
-        if key not in seen:
-            seen.add(key)
-            out.append(c)
-    return out
+    return get_resolver().dedupe(companies)
+
+
+async def _web_search(stage: str, prompt: str, max_tokens: int, searches: WeekSearches | None = None):
+    """
+    One web_search call under the stage's budget and domain filters. With
+    this week's searches, earlier sources are passed in as context and a
+    stage that already searched this week answers from them instead.
+    """
+    tools = [search_tool(stage)]
+    if searches is not None:
+        prompt += searches.context()
+        tools = searches.tools(stage)
+        if not tools:
+            print(f"Reusing {len(searches)} web-search sources for {stage} — no new searches")
+
+    response = await create_message(
+        client,
+        stage=stage,
+        max_tokens=max_tokens,
+        messages=[{"role": "user", "content": prompt}],
+        **({"tools": tools} if tools else {}),
+    )
+    if searches is not None and tools:
+        searches.record(stage, response)
+    return response
 
 
-async def fetch_companies_from_web() -> list:
+async def fetch_companies_from_web(searches: WeekSearches | None = None) -> list:
     """
     Fetches 3-4 Companies to Watch via Claude web search.
     Cross-industry focus: Education, Health, Civic, Fintech, Climate, etc.
     Never includes Big Tech.
     """
     print("Fetching Companies to Watch via web search...")
-    response = client.messages.create(
-        model="claude-sonnet-4-6",
-        max_tokens=2500,
-        tools=[{"type": "web_search_20250305", "name": "web_search"}],
-        messages=[{"role": "user", "content": COMPANIES_FETCH_PROMPT}]
-    )
+    response = await _web_search("companies_search", COMPANIES_FETCH_PROMPT, 2500, searches)
 
     result_text = ""
     for block in response.content:
@@ -382,8 +406,9 @@ async def fetch_companies_from_scraper_backup(condensed: list) -> list:
     prompt = COMPANIES_SCRAPER_BACKUP_PROMPT.format(
         articles=json.dumps(condensed, indent=2)
     )
-    response = client.messages.create(
-        model="claude-sonnet-4-6",
+    response = await create_message(
+        client,
+        stage="companies_backup",
         max_tokens=1500,
         messages=[{"role": "user", "content": prompt}]
     )
@@ -399,65 +424,149 @@ async def fetch_companies_from_scraper_backup(condensed: list) -> list:
         return []
 
 
-async def _resolve_companies(web_companies: list, condensed_scraper: list | None = None) -> list:
+async def _resolve_companies(web_companies: list, condensed_scraper: list | None = None,
+                             memory: StoryMemory | None = None) -> list:
     """
     Ensures at least 2 companies, max 4. Web search is primary;
     scraper articles are the backup if web returns < 2.
+    Companies featured in an earlier week are dropped first.
     """
-    companies = web_companies
+    memory = memory or StoryMemory()
+    companies = memory.new_companies(web_companies)
     if len(companies) < 2 and condensed_scraper:
         backup = await fetch_companies_from_scraper_backup(condensed_scraper)
-        companies = _dedupe_companies(companies + backup)
+        companies = _dedupe_companies(companies + memory.new_companies(backup))
     return _filter_big_tech(companies)[:4]
 
 
-async def fetch_from_scraped(json_path: Path = SCRAPED_DATA_PATH) -> dict:
-    """
-    Reads scraped articles JSON and uses Claude (no web search)
-    to select developments, jobs/skills, and featured resource.
-    Companies to Watch always comes from web search; scraper is the backup.
-    """
-    with open(json_path) as f:
-        scraped = json.load(f)
+def _stale_scrape(window: tuple, newest) -> dict:
+    start, end = window
+    return {
+        "success": False,
+        "error": f"No scraped articles published {start:%Y-%m-%d} to {end:%Y-%m-%d}"
+                 + (f" (newest is {newest:%Y-%m-%d})" if newest else ""),
+        "fallback": True,
+    }
+
+
+def _drop_covered(news_data: dict, memory: StoryMemory) -> dict:
+    """Removes web-search items whose URL or headline an earlier digest already used."""
+    news_data["developments"] = memory.new_stories(news_data.get("developments", []), title_key="headline")
+    news_data["jobs_and_hiring"] = memory.new_stories(news_data.get("jobs_and_hiring", []))
+    return news_data
 
-    articles = scraped.get("articles", [])
 
+async def condense_articles(articles: list) -> list:
+    """
+    Scraped articles as the selection prompts see them: best-sentence
+    summaries, plus a full-text excerpt when extraction is on.
+    """
     condensed = [
         {
             "title": a.get("title", ""),
             "url": a.get("url", ""),
-            "summary": (a.get("summary", "") or "")[:300],
+            "summary": summarize(a.get("summary", "") or "", SUMMARY_TOKENS),
             "source": a.get("source", ""),
             "published_date": a.get("published_date", "")[:10],
             "tags": a.get("tags", []),
         }
         for a in articles
     ]
+    if extraction_enabled():
+        # Full text so the model doesn't need a web search to understand the story
+        texts = await extract_articles([a["url"] for a in condensed])
+        for a in condensed:
+            if texts.get(a["url"]):
+                a["content"] = summarize(texts[a["url"]], PROMPT_CHARS // CHARS_PER_TOKEN)
+    return condensed
+
+
+def scraped_data_path() -> Path:
+    """The feed scraper's latest output, else the committed scrape."""
+    return FEED_SCRAPE_PATH if FEED_SCRAPE_PATH.exists() else SCRAPED_DATA_PATH
+
+
+async def fetch_from_scraped(json_path: Path | None = None, memory: StoryMemory | None = None,
+                             searches: WeekSearches | None = None, week_start: date | None = None,
+                             search_companies: bool = True) -> dict:
+    """
+    Reads scraped articles JSON and uses Claude (no web search)
+    to select developments, jobs/skills, and featured resource.
+    Companies to Watch always comes from web search; scraper is the backup.
+    Articles already covered by an earlier digest never reach the prompt.
+    With week_start, only articles published in the week the digest covers
+    are used — when there are none the result asks for the web fallback.
+    An unchanged file reuses its cached condensed list and selection.
+    search_companies=False takes companies from the articles only.
+    """
+    json_path = json_path or scraped_data_path()
+    memory = memory or StoryMemory()
+    window = article_window(week_start) if week_start else None
+    watermark = ScrapeWatermark(json_path)
+
+    # The file hasn't changed since a run that found nothing this recent
+    if window and watermark.unchanged and watermark.newest and watermark.newest < window[0]:
+        return _stale_scrape(window, watermark.newest)
+
+    with span("scrape_read") as read_span:
+        changed = not watermark.unchanged
+        body = watermark.read() if changed else None
+        condensed_key = cache_key(watermark.sha256, *(window or ()), memory.fingerprint(), extraction_enabled(),
+                                  SUMMARY_TOKENS)
+        condensed = get_cached("condensed", condensed_key)
+        read_span.add(changed=changed, cached=condensed is not None)
+
+        if condensed is None:
+            scraped = json.loads(body if body is not None else watermark.read())
+            articles = scraped.get("articles", [])
+            if changed:
+                watermark.save(articles)
+            read_span.add(articles=len(articles))
+
+    if condensed is None:
+        with span("scrape_condense") as condense_span:
+            windowed = in_window(articles, *window) if window else articles
+            fresh = memory.new_stories(windowed)
+            condense_span.add(outside_window=len(articles) - len(windowed),
+                              already_covered=len(windowed) - len(fresh))
+            condensed = await condense_articles(fresh)
+            condense_span.add(extracted=sum(1 for a in condensed if "content" in a))
+            put_cached("condensed", condensed_key, condensed)
+
+    if window and not condensed:
+        return _stale_scrape(window, watermark.newest)
 
     prompt = SCRAPER_SELECTION_PROMPT.format(
         articles=json.dumps(condensed, indent=2)
     )
 
-    response = client.messages.create(
-        model="claude-sonnet-4-6",
-        max_tokens=3000,
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    result_text = next(  # type: ignore[union-attr]
-        block.text for block in response.content if block.type == "text"
-    )
+    # Same articles, prompt and model → the selection is reused, no tokens spent
+    selection_key = cache_key(model_for("news_selection"), prompt)
+    result_text = get_cached("selection", selection_key)
+    if result_text is None:
+        response = await create_message(
+            client,
+            stage="news_selection",
+            max_tokens=3000,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        result_text = "".join(
+            block.text for block in response.content if isinstance(getattr(block, "text", None), str)
+        )
+    else:
+        print("Scraped articles unchanged — reusing cached news selection")
 
     try:
         news_data = _parse_json_response(result_text)
+        put_cached("selection", selection_key, result_text)
 
-        web_companies = await fetch_companies_from_web()
-        news_data["companies_to_watch"] = await _resolve_companies(web_companies, condensed)
+        web_companies = await fetch_companies_from_web(searches) if search_companies else []
+        news_data["companies_to_watch"] = await _resolve_companies(web_companies, condensed, memory)
 
         return {
             "success": True,
             "data": news_data,
-            "source": "scraper+web",
+            "source": "scraper+web" if search_companies else "scraper",
             "source_count": (
                 len(news_data.get("developments", [])) +
                 len(news_data.get("companies_to_watch", [])) +
@@ -472,25 +581,53 @@ async def fetch_from_scraped(json_path: Path = SCRAPED_DATA_PATH) -> dict:
         }
 
 
-async def fetch_ai_news() -> dict:
+async def fetch_ai_news(week_start: date | None = None, archived_only: bool = False) -> dict:
     """
     Primary entry point. Uses scraped JSON if available (with web-searched
     companies always merged in), falls back to full Claude web search.
     In the web-search-only path, also runs the dedicated companies fetch
     so the section is always cross-industry, never Big Tech dominated.
+    Stories and companies published before week_start are filtered out.
+    When the daily job has shortlisted the week's articles, those are
+    merged instead of selecting from the whole scrape.
+
+    archived_only (backfills of past weeks) uses only what was scraped or
+    searched during the week itself. Web search would return today's
+    news, so without an archive the result is a failure, and the result
+    is marked "archived" otherwise.
     """
-    if SCRAPED_DATA_PATH.exists():
-        print(f"Using scraped data: {SCRAPED_DATA_PATH}")
-        return await fetch_from_scraped(SCRAPED_DATA_PATH)
-
-    print("No scraped data found — using web search fallback")
-
-    response = client.messages.create(
-        model="claude-sonnet-4-6",
-        max_tokens=4000,
-        tools=[{"type": "web_search_20250305", "name": "web_search"}],
-        messages=[{"role": "user", "content": NEWS_FETCH_PROMPT}]
-    )
+    if week_start is None:
+        today = date.today()
+        week_start = today - timedelta(days=today.weekday())
+    memory = await run(StoryMemory.load, week_start)
+    print(f"Story memory: {len(memory)} keys published before {week_start}")
+    searches = WeekSearches.load(week_start)
+
+    scraped_path = scraped_data_path()
+    if scraped_path.exists():
+        from services.daily_shortlist import roll_up
+
+        # The daily job has already pre-selected this week's articles
+        result = await roll_up(week_start, memory, searches, search_companies=not archived_only)
+        if result and result["success"]:
+            return {**result, "archived": True} if archived_only else result
+        if result:
+            print(f"{result['error']} — selecting from the whole week's scrape")
+
+        print(f"Using scraped data: {scraped_path}")
+        result = await fetch_from_scraped(scraped_path, memory, searches, week_start,
+                                          search_companies=not archived_only)
+        if not result.get("fallback"):
+            return {**result, "archived": True} if archived_only and result["success"] else result
+        reason = result["error"]
+    else:
+        reason = "No scraped data found"
+
+    if archived_only:
+        return {"success": False, "error": f"No archived news for week of {week_start}: {reason}"}
+    print(f"{reason} — using web search fallback")
+
+    response = await _web_search("news_search", NEWS_FETCH_PROMPT, 4000, searches)
 
     result_text = ""
     for block in response.content:
@@ -498,13 +635,13 @@ async def fetch_ai_news() -> dict:
             result_text += block.text
 
     try:
-        news_data = _parse_json_response(result_text)
+        news_data = _drop_covered(_parse_json_response(result_text), memory)
 
         # Always run the dedicated companies search — the main web prompt
         # tends to pick well-known names; the dedicated prompt surfaces
         # cross-industry companies Joanna doesn't already track.
-        web_companies = await fetch_companies_from_web()
-        resolved = await _resolve_companies(web_companies)
+        web_companies = await fetch_companies_from_web(searches)
+        resolved = await _resolve_companies(web_companies, memory=memory)
         if resolved:
             news_data["companies_to_watch"] = resolved
 
@@ -0,0 +1,313 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import anthropic
+import httpx
+
+# Org limits per model. Defaults match Anthropic's tier-1 Sonnet limits —
+# override per deployment in backend/.env; response headers then correct
+# each model's limiter to what the API actually allows it.
+DEFAULT_RPM = 50
+DEFAULT_ITPM = 30000
+DEFAULT_OTPM = 8000
+
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+class TokenBucket:
+    """
+    Continuous-refill bucket: `capacity` units per 60 seconds.
+    Balance may go negative when a call used more than it reserved;
+    later callers then wait for the debt to refill.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / 60.0
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self.refill(now)
+        # A single request larger than the bucket only needs a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def sync(self, limit: int | None, remaining: int | None, now: float):
+        """Trusts the server's view whenever it is stricter than ours."""
+        if limit:
+            self.capacity = limit
+        self.refill(now)
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+
+
+class AnthropicRateLimiter:
+    """
+    One model's limits on requests, input tokens and output tokens
+    per minute. Every Anthropic call reserves its estimated usage before
+    it is sent; response headers keep the buckets in step with the API.
+    """
+
+    def __init__(self, rpm: int, itpm: int, otpm: int):
+        self.buckets = {
+            "requests": TokenBucket(rpm),
+            "input-tokens": TokenBucket(itpm),
+            "output-tokens": TokenBucket(otpm),
+        }
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _try_reserve(self, amounts: dict) -> float:
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self.blocked_until - now, 0.0)
+            for name, amount in amounts.items():
+                wait = max(wait, self.buckets[name].wait_time(amount, now))
+            if wait == 0.0:
+                for name, amount in amounts.items():
+                    self.buckets[name].tokens -= amount
+            return wait
+
+    async def acquire(self, input_tokens: int, output_tokens: int):
+        """Waits until the call fits within every per-minute budget."""
+        amounts = {"requests": 1, "input-tokens": input_tokens, "output-tokens": output_tokens}
+        while True:
+            wait = self._try_reserve(amounts)
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
+
+    def settle(self, reserved: dict, used: dict):
+        """Refunds (or charges) the difference between estimate and actual usage."""
+        with self._lock:
+            for name, amount in used.items():
+                if isinstance(amount, int) and name in reserved:
+                    self.buckets[name].tokens += reserved[name] - amount
+
+    def backoff(self, seconds: float):
+        """Blocks all calls for at least `seconds` — used when a 429 carries no hints."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        """
+        Reads anthropic-ratelimit-* headers (and retry-after on 429s)
+        from any Anthropic response.
+        """
+        with self._lock:
+            now = time.monotonic()
+            for name, bucket in self.buckets.items():
+                limit = _int_header(headers, f"anthropic-ratelimit-{name}-limit")
+                remaining = _int_header(headers, f"anthropic-ratelimit-{name}-remaining")
+                if limit is None and remaining is None:
+                    continue
+                bucket.sync(limit, remaining, now)
+
+                if remaining == 0:
+                    reset = _reset_delay(headers.get(f"anthropic-ratelimit-{name}-reset"))
+                    if reset is not None:
+                        self.blocked_until = max(self.blocked_until, now + reset)
+
+            retry_after = headers.get("retry-after")
+            if retry_after:
+                try:
+                    self.blocked_until = max(self.blocked_until, now + float(retry_after))
+                except ValueError:
+                    pass
+
+
+def _int_header(headers, key: str) -> int | None:
+    value = headers.get(key)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _reset_delay(value: str | None) -> float | None:
+    """Converts an RFC 3339 reset timestamp into seconds from now."""
+    if not value:
+        return None
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max((reset_at - datetime.now(reset_at.tzinfo)).total_seconds(), 0.0)
+
+
+# Anthropic enforces its limits per model, so each model gets its own
+# limiter and only that model's responses update it.
+_limiters: dict = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(model: str) -> AnthropicRateLimiter:
+    """Returns the shared limiter for model, built from env limits on first use."""
+    with _limiters_lock:
+        if model not in _limiters:
+            _limiters[model] = AnthropicRateLimiter(
+                rpm=int(os.environ.get("ANTHROPIC_RPM", DEFAULT_RPM)),
+                itpm=int(os.environ.get("ANTHROPIC_ITPM", DEFAULT_ITPM)),
+                otpm=int(os.environ.get("ANTHROPIC_OTPM", DEFAULT_OTPM)),
+            )
+        return _limiters[model]
+
+
+def _request_model(request: httpx.Request) -> str | None:
+    """The model a Messages API request was sent for; None for batches and other endpoints."""
+    try:
+        return json.loads(request.content).get("model")
+    except (httpx.RequestNotRead, ValueError, AttributeError):
+        return None
+
+
+def _record_response(response):
+    model = _request_model(response.request)
+    if model:
+        get_limiter(model).update_from_headers(response.headers)
+
+
+async def _arecord_response(response):
+    _record_response(response)
+
+
+def limited_http_client() -> anthropic.DefaultHttpxClient:
+    """HTTP client for anthropic.Anthropic that feeds every response's headers to the limiter."""
+    return anthropic.DefaultHttpxClient(event_hooks={"response": [_record_response]})
+
+
+def limited_async_http_client() -> anthropic.DefaultAsyncHttpxClient:
+    """Async counterpart of limited_http_client for anthropic.AsyncAnthropic."""
+    return anthropic.DefaultAsyncHttpxClient(event_hooks={"response": [_arecord_response]})
+
+
+def estimate_input_tokens(messages: list, tools: list | None = None) -> int:
+    """
+    Rough pre-flight estimate (~4 chars per token). Web search adds
+    retrieved pages to the input server-side, so budget extra for it.
+    """
+    chars = 0
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, str):
+            chars += len(content)
+        else:
+            chars += sum(len(str(part)) for part in content)
+    estimate = chars // 4 + 50
+    if tools:
+        estimate += 10000
+    return estimate
+
+
+def _reservation(kwargs: dict) -> dict:
+    return {
+        "input-tokens": estimate_input_tokens(kwargs.get("messages", []), kwargs.get("tools")),
+        "output-tokens": kwargs.get("max_tokens", 1024),
+    }
+
+
+# The limited clients are built with max_retries=0, so these are the only retries
+RETRYABLE_ERRORS = (anthropic.RateLimitError, anthropic.InternalServerError, anthropic.APIConnectionError)
+
+
+def _retry_after(limiter: AnthropicRateLimiter, reserved: dict, error: anthropic.APIError, attempt: int, stage_span):
+    """Refunds a rejected call's tokens and backs off; re-raises once the retries are spent."""
+    limiter.settle(reserved, {"input-tokens": 0, "output-tokens": 0})
+    if isinstance(error, anthropic.RateLimitError):
+        limiter.update_from_headers(error.response.headers)
+        stage_span.add(rate_limited=attempt + 1)
+    limiter.backoff(5 * 2 ** attempt)
+    print(f"Anthropic call failed (attempt {attempt+1}/{MAX_RATE_LIMIT_RETRIES}): {error}")
+    if attempt == MAX_RATE_LIMIT_RETRIES - 1:
+        raise error
+
+
+def _settle_usage(limiter: AnthropicRateLimiter, reserved: dict, usage):
+    limiter.settle(reserved, {
+        "input-tokens": getattr(usage, "input_tokens", None),
+        "output-tokens": getattr(usage, "output_tokens", None),
+    })
+
+
+async def create_message(client, stage: str, **kwargs):
+    """
+    Rate-limited client.messages.create. Reserves capacity first, runs
+    the blocking SDK call off the event loop, and on a 429, 5xx or
+    connection error refunds the reservation and waits out the server's
+    retry-after (or a backoff) before trying again. The model comes from
+    the stage routing table unless passed explicitly.
+    """
+    from services.model_router import model_for, record_stage
+    from services.telemetry import span
+
+    kwargs.setdefault("model", model_for(stage))
+    limiter = get_limiter(kwargs["model"])
+    reserved = _reservation(kwargs)
+
+    with span(stage, model=kwargs["model"]) as stage_span:
+        for attempt in range(MAX_RATE_LIMIT_RETRIES):
+            await limiter.acquire(reserved["input-tokens"], reserved["output-tokens"])
+            started = time.monotonic()
+            try:
+                response = await asyncio.to_thread(client.messages.create, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                _retry_after(limiter, reserved, e, attempt, stage_span)
+                continue
+
+            usage = getattr(response, "usage", None)
+            _settle_usage(limiter, reserved, usage)
+            searches = sum(1 for block in response.content if getattr(block, "type", None) == "server_tool_use")
+            stage_span.add(**record_stage(stage, kwargs["model"], time.monotonic() - started, usage, searches))
+            return response
+
+
+@asynccontextmanager
+async def stream_message(client, stage: str, **kwargs):
+    """
+    Rate-limited client.messages.stream for an async client. A 429 comes
+    back before any text, so the stream is reopened after the same
+    backoff as create_message; once the caller has read it, the final
+    message's usage settles the reservation and is recorded for the stage.
+    """
+    from services.model_router import model_for, record_stage
+    from services.telemetry import span
+
+    kwargs.setdefault("model", model_for(stage))
+    limiter = get_limiter(kwargs["model"])
+    reserved = _reservation(kwargs)
+
+    with span(stage, model=kwargs["model"]) as stage_span:
+        for attempt in range(MAX_RATE_LIMIT_RETRIES):
+            await limiter.acquire(reserved["input-tokens"], reserved["output-tokens"])
+            started = time.monotonic()
+            opened = False
+            try:
+                async with client.messages.stream(**kwargs) as stream:
+                    opened = True
+                    yield stream
+                    final_message = await stream.get_final_message()
+            except RETRYABLE_ERRORS as e:
+                if opened:
+                    raise
+                _retry_after(limiter, reserved, e, attempt, stage_span)
+                continue
+
+            usage = getattr(final_message, "usage", None)
+            _settle_usage(limiter, reserved, usage)
+            stage_span.add(**record_stage(stage, kwargs["model"], time.monotonic() - started, usage))
+            return
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from services.local_store import connect
+
+# ── Scrape watermark and cache ───────────────────────────────────────────────
+# fetch_from_scraped only keeps articles published in the week a digest
+# covers. The scraped file's stat, content hash and newest article are kept
+# as a watermark, so an unchanged file is never re-read or re-hashed; its
+# condensed article list and the model's selection are cached by content,
+# so an unchanged scrape costs no parsing and no tokens.
+
+SCRAPE_CACHE_PATH = Path(__file__).resolve().parents[1] / "data" / "scrape_cache.db"
+
+CACHE_TTL_DAYS = 30  # cached condensed lists and selections older than this are dropped
+
+
+def window_days() -> int:
+    return int(os.environ.get("SCRAPE_WINDOW_DAYS", 7))
+
+
+def article_window(week_start: date) -> tuple[datetime, datetime]:
+    """The digest for week_start covers the days before it (SCRAPE_WINDOW_DAYS, default 7)."""
+    end = datetime.combine(week_start, datetime.min.time(), timezone.utc)
+    return end - timedelta(days=window_days()), end
+
+
+def published_at(article: dict) -> datetime | None:
+    value = (article.get("published_date") or "").strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def in_window(articles: list, start: datetime, end: datetime) -> list:
+    """Articles published in [start, end). Undated articles are kept."""
+    return [a for a in articles if (p := published_at(a)) is None or start <= p < end]
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return connect(path, """
+        CREATE TABLE IF NOT EXISTS scrape_watermark (
+            path           TEXT PRIMARY KEY,
+            mtime_ns       INTEGER NOT NULL,
+            size           INTEGER NOT NULL,
+            sha256         TEXT NOT NULL,
+            newest         TEXT,            -- latest published_date in the file
+            processed_at   REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS scrape_cache (
+            kind       TEXT NOT NULL,       -- condensed | selection
+            key        TEXT NOT NULL,
+            value      TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (kind, key)
+        );
+    """)
+
+
+class ScrapeWatermark:
+    """What the last run saw of one scraped file."""
+
+    def __init__(self, path: Path, cache_path: Path | None = None):
+        self.path = Path(path)
+        self.cache_path = cache_path or SCRAPE_CACHE_PATH
+        stat = self.path.stat()
+        self.mtime_ns, self.size = stat.st_mtime_ns, stat.st_size
+        self.sha256, self.newest = None, None
+        with _connect(self.cache_path) as conn:
+            row = conn.execute(
+                "SELECT sha256, newest FROM scrape_watermark WHERE path = ? AND mtime_ns = ? AND size = ?",
+                (str(self.path), self.mtime_ns, self.size),
+            ).fetchone()
+        if row:
+            self.sha256, newest = row
+            self.newest = datetime.fromisoformat(newest) if newest else None
+
+    @property
+    def unchanged(self) -> bool:
+        """True when the file's stat matches the last run — its hash and newest date are known."""
+        return self.sha256 is not None
+
+    def read(self) -> bytes:
+        """Reads and hashes the file; save() then records it as the watermark."""
+        body = self.path.read_bytes()
+        self.sha256 = hashlib.sha256(body).hexdigest()
+        return body
+
+    def save(self, articles: list):
+        dates = [p for p in (published_at(a) for a in articles) if p]
+        self.newest = max(dates) if dates else None
+        with _connect(self.cache_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scrape_watermark VALUES (?, ?, ?, ?, ?, ?)",
+                (str(self.path), self.mtime_ns, self.size, self.sha256,
+                 self.newest.isoformat() if self.newest else None, time.time()),
+            )
+
+
+def cache_key(*parts) -> str:
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def get_cached(kind: str, key: str, cache_path: Path | None = None):
+    with _connect(cache_path or SCRAPE_CACHE_PATH) as conn:
+        row = conn.execute(
+            "SELECT value FROM scrape_cache WHERE kind = ? AND key = ? AND created_at > ?",
+            (kind, key, time.time() - CACHE_TTL_DAYS * 86400),
+        ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def put_cached(kind: str, key: str, value, cache_path: Path | None = None):
+    with _connect(cache_path or SCRAPE_CACHE_PATH) as conn:
+        conn.execute("DELETE FROM scrape_cache WHERE created_at <= ?", (time.time() - CACHE_TTL_DAYS * 86400,))
+        conn.execute(
+            "INSERT OR REPLACE INTO scrape_cache VALUES (?, ?, ?, ?)",
+            (kind, key, json.dumps(value), time.time()),
+        )
@@ -0,0 +1,192 @@
+import os
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+from services.local_store import connect
+from services.story_memory import normalize_url
+
+# ── Web-search reuse ─────────────────────────────────────────────────────────
+# Every web_search call's results, citations and queries are stored per week.
+# Later calls in the same week get them as prompt context, so "AI news this
+# week" is not searched twice, and a stage that already searched this week
+# answers from what it found instead of searching again. Each stage has its
+# own max_uses and allowed/blocked domains:
+#   WEB_SEARCH_MAX_USES_<STAGE>, WEB_SEARCH_ALLOWED_DOMAINS[_<STAGE>],
+#   WEB_SEARCH_BLOCKED_DOMAINS[_<STAGE>]  (comma-separated)
+
+SEARCH_MEMORY_PATH = Path(__file__).resolve().parents[1] / "data" / "search_memory.db"
+
+DEFAULT_MAX_USES = {
+    "news_search":      5,
+    "companies_search": 3,
+}
+
+# A stage that already found at least this many sources this week skips the tool
+MIN_REUSE_RESULTS = 5
+
+CONTEXT_RESULTS = 25  # most sources passed back into a prompt
+
+
+def _stage_env(name: str, stage: str) -> str:
+    return os.environ.get(f"{name}_{stage.upper()}") or os.environ.get(name, "")
+
+
+def _domains(name: str, stage: str) -> list:
+    return [d.strip().lower() for d in _stage_env(name, stage).split(",") if d.strip()]
+
+
+def search_tool(stage: str) -> dict:
+    """web_search tool definition with the stage's budget and domain filters."""
+    tool = {
+        "type": "web_search_20250305",
+        "name": "web_search",
+        "max_uses": int(_stage_env("WEB_SEARCH_MAX_USES", stage) or DEFAULT_MAX_USES.get(stage, 3)),
+    }
+    # The API accepts one list or the other, never both
+    allowed, blocked = _domains("WEB_SEARCH_ALLOWED_DOMAINS", stage), _domains("WEB_SEARCH_BLOCKED_DOMAINS", stage)
+    if allowed:
+        tool["allowed_domains"] = allowed
+    elif blocked:
+        tool["blocked_domains"] = blocked
+    return tool
+
+
+def _field(obj, name: str):
+    """Reads a field from an SDK block or a plain dict."""
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def capture(response) -> tuple[list, list]:
+    """(queries, results) from a response's server_tool_use, web_search_tool_result and citations."""
+    queries, results = [], {}
+
+    def add(url, title, page_age=None, cited_text=None):
+        key = normalize_url(url if isinstance(url, str) else None)
+        if not key:
+            return
+        found = results.setdefault(key, {"url": url, "title": "", "page_age": "", "cited_text": ""})
+        found["title"] = found["title"] or (title if isinstance(title, str) else "")
+        found["page_age"] = found["page_age"] or (page_age if isinstance(page_age, str) else "")
+        if isinstance(cited_text, str) and cited_text not in found["cited_text"]:
+            found["cited_text"] = f"{found['cited_text']} {cited_text}".strip()
+
+    for block in getattr(response, "content", None) or []:
+        kind = _field(block, "type")
+        if kind == "server_tool_use":
+            tool_input = _field(block, "input")
+            query = tool_input.get("query") if isinstance(tool_input, dict) else None
+            if isinstance(query, str) and query:
+                queries.append(query)
+        elif kind == "web_search_tool_result":
+            content = _field(block, "content")
+            for item in content if isinstance(content, list) else []:
+                add(_field(item, "url"), _field(item, "title"), _field(item, "page_age"))
+        elif kind == "text":
+            citations = _field(block, "citations")
+            for citation in citations if isinstance(citations, list) else []:
+                add(_field(citation, "url"), _field(citation, "title"), cited_text=_field(citation, "cited_text"))
+    return queries, list(results.values())
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return connect(path, """
+        CREATE TABLE IF NOT EXISTS search_results (
+            week_start TEXT NOT NULL,
+            stage      TEXT NOT NULL,
+            url        TEXT NOT NULL,
+            title      TEXT NOT NULL DEFAULT '',
+            page_age   TEXT NOT NULL DEFAULT '',
+            cited_text TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (week_start, stage, url)
+        );
+        CREATE TABLE IF NOT EXISTS search_queries (
+            week_start TEXT NOT NULL,
+            stage      TEXT NOT NULL,
+            query      TEXT NOT NULL,
+            PRIMARY KEY (week_start, stage, query)
+        );
+    """)
+
+
+class WeekSearches:
+    """Everything web search found for one week, shared by every search stage."""
+
+    def __init__(self, week_start: date, path: Path | None = None):
+        self.week_start = str(week_start)
+        self.path = path or SEARCH_MEMORY_PATH
+        self.results: list = []   # (stage, url, title, page_age, cited_text)
+        self.queries: list = []   # (stage, query)
+
+    @classmethod
+    def load(cls, week_start: date, path: Path | None = None) -> "WeekSearches":
+        searches = cls(week_start, path)
+        if searches.path.exists():
+            with _connect(searches.path) as conn:
+                searches.results = conn.execute(
+                    "SELECT stage, url, title, page_age, cited_text FROM search_results "
+                    "WHERE week_start = ? ORDER BY rowid", (searches.week_start,)
+                ).fetchall()
+                searches.queries = conn.execute(
+                    "SELECT stage, query FROM search_queries WHERE week_start = ? ORDER BY rowid",
+                    (searches.week_start,)
+                ).fetchall()
+        return searches
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def reusable(self, stage: str) -> bool:
+        """True once this stage has searched this week and found enough to answer from."""
+        return sum(1 for row in self.results if row[0] == stage) >= MIN_REUSE_RESULTS
+
+    def tools(self, stage: str) -> list:
+        return [] if self.reusable(stage) else [search_tool(stage)]
+
+    def context(self) -> str:
+        """Prompt block listing this week's sources and queries, or "" before any search."""
+        if not self.results:
+            return ""
+        seen, lines = set(), []
+        for _, url, title, page_age, cited_text in self.results:
+            if normalize_url(url) in seen or len(lines) >= CONTEXT_RESULTS:
+                continue
+            seen.add(normalize_url(url))
+            line = f"- {title or url} — {url}"
+            if page_age:
+                line += f" ({page_age})"
+            if cited_text:
+                line += f": {cited_text[:240]}"
+            lines.append(line)
+        queries = sorted({query for _, query in self.queries})
+        block = (
+            "\n\nSOURCES ALREADY FOUND THIS WEEK — earlier searches returned these. "
+            "Use them before searching again and keep their URLs exactly as written:\n"
+            + "\n".join(lines)
+        )
+        if queries:
+            block += "\nQueries already run (do not repeat them): " + "; ".join(queries)
+        return block
+
+    def record(self, stage: str, response) -> int:
+        """Stores a response's queries and results for the week. Returns new results."""
+        queries, results = capture(response)
+        known = {(row[0], normalize_url(row[1])) for row in self.results}
+        fresh = [r for r in results if (stage, normalize_url(r["url"])) not in known]
+        if not queries and not fresh:
+            return 0
+        rows = [(stage, r["url"], r["title"], r["page_age"], r["cited_text"]) for r in fresh]
+        with _connect(self.path) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO search_results VALUES (?, ?, ?, ?, ?, ?)",
+                [(self.week_start, *row) for row in rows],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO search_queries VALUES (?, ?, ?)",
+                [(self.week_start, stage, query) for query in queries],
+            )
+        self.results += rows
+        self.queries += [(stage, query) for query in queries]
+        return len(fresh)
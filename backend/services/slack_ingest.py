@@ -0,0 +1,266 @@
+import asyncio
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+from services.db import execute
+from services.local_store import connect
+
+SLACK_API_URL = "https://slack.com/api"
+
+# Messages pulled from Slack are kept locally so each weekly run only
+# fetches what is new since the last sync. The store records which span
+# of the channel it holds; when the disk is fresh or a run needs older
+# messages than it has, the sync starts from what the run needs rather
+# than from settings.slack_last_synced, which is only shown in Settings.
+SLACK_STORE_PATH = Path(__file__).resolve().parents[1] / "data" / "slack_messages.db"
+
+PAGE_SIZE = 200
+MAX_THROTTLE_RETRIES = 5
+THREAD_LOOKBACK_DAYS = 7  # parents this old are re-scanned for new replies
+
+
+class SlackAPIError(Exception):
+    pass
+
+
+# ── Timestamps ───────────────────────────────────────────────────────────────
+# Slack ts values ("1712345678.123456") are converted by string, not float,
+# so the watermark round-trips exactly through slack_last_synced.
+
+def ts_to_datetime(ts: str) -> datetime:
+    seconds, _, micros = ts.partition(".")
+    return datetime.fromtimestamp(int(seconds), timezone.utc).replace(
+        microsecond=int((micros or "0").ljust(6, "0")[:6])
+    )
+
+
+def datetime_to_ts(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return f"{int(dt.timestamp())}.{dt.microsecond:06d}"
+
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared pooled client — keeps connections to Slack alive across pages and runs."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            base_url=SLACK_API_URL,
+            timeout=httpx.Timeout(15.0),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+    return _http_client
+
+
+async def _slack_get(client: httpx.AsyncClient, method: str, token: str, params: dict) -> dict:
+    """Calls a Slack Web API method, sleeping out any 429 for its Retry-After."""
+    for attempt in range(MAX_THROTTLE_RETRIES):
+        resp = await client.get(
+            f"/{method}",
+            headers={"Authorization": f"Bearer {token}"},
+            params=params,
+        )
+        if resp.status_code == 429:
+            retry_after = float(resp.headers.get("Retry-After", 1))
+            print(f"Slack {method} throttled (attempt {attempt+1}/{MAX_THROTTLE_RETRIES}), waiting {retry_after}s")
+            await asyncio.sleep(retry_after)
+            continue
+
+        try:
+            data = resp.json()
+        except ValueError:
+            # A 5xx or proxy error page instead of a Web API response
+            raise SlackAPIError(f"http_{resp.status_code}")
+        if not data.get("ok"):
+            raise SlackAPIError(data.get("error", "unknown_error"))
+        return data
+
+    raise SlackAPIError("ratelimited")
+
+
+async def _paginate(client, method: str, token: str, params: dict, key: str = "messages") -> list:
+    items, cursor = [], None
+    while True:
+        page_params = {**params, "limit": PAGE_SIZE}
+        if cursor:
+            page_params["cursor"] = cursor
+        data = await _slack_get(client, method, token, page_params)
+        items.extend(data.get(key, []))
+        cursor = (data.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            return items
+
+
+async def fetch_new_messages(client, token: str, channel: str, oldest: str | None) -> list:
+    """
+    Pulls channel history newer than `oldest`, plus any thread replies
+    posted after it — including replies to parents posted up to
+    THREAD_LOOKBACK_DAYS before it.
+    """
+    params = {"channel": channel}
+    if oldest:
+        lookback = ts_to_datetime(oldest) - timedelta(days=THREAD_LOOKBACK_DAYS)
+        params["oldest"] = datetime_to_ts(lookback)
+    history = await _paginate(client, "conversations.history", token, params)
+
+    threads = [
+        m["ts"] for m in history
+        if m.get("reply_count") and (not oldest or m.get("latest_reply", "0") > oldest)
+    ]
+    replies = await asyncio.gather(*[
+        _paginate(client, "conversations.replies", token, {"channel": channel, "ts": thread_ts})
+        for thread_ts in threads
+    ])
+    messages = list(history)
+    for thread in replies:
+        # conversations.replies repeats the parent as its first item
+        messages.extend(m for m in thread if m.get("ts") != m.get("thread_ts"))
+
+    return [m for m in messages if not oldest or m.get("ts", "0") > oldest]
+
+
+# ── Local store ──────────────────────────────────────────────────────────────
+
+def connect_store(path: Path = SLACK_STORE_PATH) -> sqlite3.Connection:
+    return connect(path, """
+        CREATE TABLE IF NOT EXISTS slack_messages (
+            channel   TEXT NOT NULL,
+            ts        TEXT NOT NULL,
+            thread_ts TEXT,
+            user      TEXT,
+            text      TEXT,
+            posted_at TEXT NOT NULL,
+            raw       TEXT,
+            PRIMARY KEY (channel, ts)
+        );
+        CREATE INDEX IF NOT EXISTS slack_messages_posted ON slack_messages (channel, posted_at);
+        CREATE TABLE IF NOT EXISTS slack_sync (
+            channel     TEXT PRIMARY KEY,
+            synced_from TEXT,           -- earliest time the store is complete from; NULL = channel start
+            last_synced TEXT            -- newest message stored (ts)
+        );
+    """)
+
+
+def stored_span(channel: str, path: Path = SLACK_STORE_PATH) -> tuple | None:
+    """(synced_from, last_synced) for the channel, or None when nothing has been synced here."""
+    with connect_store(path) as conn:
+        return conn.execute("SELECT synced_from, last_synced FROM slack_sync WHERE channel = ?",
+                            (channel,)).fetchone()
+
+
+def store_messages(channel: str, messages: list, path: Path = SLACK_STORE_PATH) -> int:
+    rows = [
+        (
+            channel,
+            m["ts"],
+            m.get("thread_ts"),
+            m.get("user") or m.get("bot_id"),
+            m.get("text", ""),
+            ts_to_datetime(m["ts"]).isoformat(),
+            json.dumps(m),
+        )
+        for m in messages
+        if m.get("ts") and m.get("subtype") not in ("channel_join", "channel_leave")
+    ]
+    with connect_store(path) as conn:
+        conn.executemany("INSERT OR REPLACE INTO slack_messages VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def load_messages(channel: str, since: datetime, until: datetime, path: Path = SLACK_STORE_PATH) -> list:
+    """Stored messages posted in [since, until), oldest first."""
+    with connect_store(path) as conn:
+        rows = conn.execute(
+            "SELECT ts, thread_ts, user, text FROM slack_messages "
+            "WHERE channel = ? AND posted_at >= ? AND posted_at < ? ORDER BY ts",
+            (channel, since.isoformat(), until.isoformat()),
+        ).fetchall()
+    return [{"ts": ts, "thread_ts": thread_ts, "user": user, "text": text} for ts, thread_ts, user, text in rows]
+
+
+# ── Sync ─────────────────────────────────────────────────────────────────────
+
+async def sync_slack_channel(
+    token: str,
+    channel: str,
+    since: datetime | None = None,
+    client: httpx.AsyncClient | None = None,
+    store_path: Path = SLACK_STORE_PATH,
+) -> dict:
+    """
+    Fetches messages newer than the local store's watermark, or from
+    `since` when the store doesn't reach back that far, stores them and
+    returns the new watermark (newest message time).
+    """
+    held = stored_span(channel, store_path)
+    covered = held and (held[0] is None or (since is not None and held[0] <= datetime_to_ts(since)))
+    if covered:
+        synced_from, oldest = held
+    else:
+        synced_from = oldest = datetime_to_ts(since) if since else None
+
+    try:
+        messages = await fetch_new_messages(client or get_http_client(), token, channel, oldest)
+    except (SlackAPIError, httpx.HTTPError) as e:
+        print(f"Slack sync failed: {e}")
+        return {"success": False, "error": str(e)}
+
+    stored = store_messages(channel, messages, store_path)
+    stamps = [m["ts"] for m in messages if m.get("ts")] + [ts for ts in (oldest, held and held[1]) if ts]
+    newest = max(stamps, default=None)
+    with connect_store(store_path) as conn:
+        conn.execute("INSERT OR REPLACE INTO slack_sync VALUES (?, ?, ?)", (channel, synced_from, newest))
+
+    print(f"Slack sync: {stored} new messages from {channel}")
+    return {"success": True, "new_messages": stored,
+            "last_synced": ts_to_datetime(newest).isoformat() if newest else None}
+
+
+async def sync_from_settings(supabase, since: datetime | None = None, store_path: Path = SLACK_STORE_PATH,
+                             fetch: bool = True, record: bool = True) -> dict:
+    """
+    Runs an incremental sync using the credentials in the settings row,
+    making sure the store holds everything from `since` on, then records
+    the newest message in settings.slack_last_synced. fetch=False only
+    resolves the channel (the caller already synced); record=False
+    leaves settings untouched.
+    """
+    result = await execute(
+        supabase.table("settings")
+        .select("id, slack_connected, slack_token, slack_channel, slack_last_synced")
+        .limit(1)
+    )
+
+    settings = result.data[0] if result.data else {}
+    token = settings.get("slack_token") or os.environ.get("SLACK_BOT_TOKEN")
+    channel = settings.get("slack_channel") or os.environ.get("SLACK_AI_CHANNEL_ID")
+
+    if not settings.get("slack_connected") or not token or not channel:
+        return {"success": False, "error": "Slack not connected"}
+
+    if not fetch:
+        return {"success": True, "new_messages": 0, "channel": channel}
+
+    sync = await sync_slack_channel(token, channel, since, store_path=store_path)
+    previous = settings.get("slack_last_synced")
+    if record and sync["success"] and sync["last_synced"] and (
+        not previous or datetime.fromisoformat(sync["last_synced"]) > datetime.fromisoformat(previous)
+    ):
+        await execute(
+            supabase.table("settings")
+            .update({"slack_last_synced": sync["last_synced"], "updated_at": "now()"})
+            .eq("id", settings["id"])
+        )
+
+    return {**sync, "channel": channel}
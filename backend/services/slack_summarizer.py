@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import anthropic
+
+from services.rate_limiter import create_message
+from services.slack_ingest import SLACK_STORE_PATH, connect_store, ts_to_datetime
+from services.summarizer import summarize
+
+# ── Map-reduce over a busy channel ───────────────────────────────────────────
+# Messages are grouped by thread, threads are packed into per-day chunks,
+# each chunk is summarized on the fast tier (cached by content hash so an
+# unchanged day is never re-summarized), and only the reduced highlights
+# reach the synthesis prompt.
+
+CHUNK_CHAR_BUDGET = 8000
+REDUCE_THRESHOLD = 20        # reduce again when the map step yields more highlights than this
+FINAL_HIGHLIGHT_COUNT = 10
+FALLBACK_TOKENS = 60         # a chunk whose summary call fails is cut to its best sentences
+
+SLACK_MAP_PROMPT = """
+Below are messages from one day of Pursuit's #ai Slack channel,
+grouped by thread (↳ marks replies).
+
+{messages}
+
+List the useful highlights for a COO catching up after leave: tools,
+links, ideas or decisions people shared. Skip greetings, jokes and
+logistics. One sentence each, naming who shared what.
+
+Return JSON only: {{"highlights": ["..."]}}
+"""
+
+SLACK_REDUCE_PROMPT = """
+These are highlights from a week of Pursuit's #ai Slack channel:
+
+{highlights}
+
+Merge duplicates and keep the {count} most useful for a COO thinking
+about AI and workforce development. One sentence each.
+
+Return JSON only: {{"highlights": ["..."]}}
+"""
+
+
+def _concurrency() -> int:
+    return int(os.environ.get("SLACK_SUMMARY_CONCURRENCY", 4))
+
+
+def build_chunks(messages: list, budget: int = CHUNK_CHAR_BUDGET) -> list[dict]:
+    """
+    Groups messages into threads (keyed by root ts), assigns each thread
+    to the day its root was posted, and packs a day's threads into
+    chunks of at most `budget` characters. A thread is never split
+    unless it alone exceeds the budget.
+    """
+    threads = defaultdict(list)
+    for m in messages:
+        threads[m.get("thread_ts") or m["ts"]].append(m)
+
+    days = defaultdict(list)
+    for root_ts in sorted(threads):
+        lines = [
+            f"{'↳ ' if m['ts'] != root_ts else ''}{m.get('user')}: {m.get('text') or ''}"
+            for m in sorted(threads[root_ts], key=lambda m: m["ts"])
+        ]
+        days[ts_to_datetime(root_ts).date().isoformat()].append("\n".join(lines))
+
+    chunks = []
+    for day, day_threads in sorted(days.items()):
+        current = []
+        for thread in day_threads:
+            if current and sum(len(t) for t in current) + len(thread) > budget:
+                chunks.append({"day": day, "text": "\n\n".join(current)})
+                current = []
+            current.append(thread[:budget])
+        if current:
+            chunks.append({"day": day, "text": "\n\n".join(current)})
+    return chunks
+
+
+def _chunk_key(chunk: dict) -> str:
+    return hashlib.sha256(chunk["text"].encode("utf-8")).hexdigest()
+
+
+def _load_cached(keys: list, path: Path) -> dict:
+    with connect_store(path) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS slack_chunk_summaries (
+                chunk_key  TEXT PRIMARY KEY,
+                day        TEXT,
+                highlights TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """)
+        rows = conn.execute(
+            f"SELECT chunk_key, highlights FROM slack_chunk_summaries WHERE chunk_key IN ({','.join('?' * len(keys))})",
+            keys,
+        ).fetchall() if keys else []
+    return {key: json.loads(highlights) for key, highlights in rows}
+
+
+def _save_cached(entries: list, path: Path):
+    now = datetime.now(timezone.utc).isoformat()
+    with connect_store(path) as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO slack_chunk_summaries VALUES (?, ?, ?, ?)",
+            [(key, day, json.dumps(highlights), now) for key, day, highlights in entries],
+        )
+
+
+def _highlights_from(response) -> list:
+    from services.news_fetcher import _parse_json_response
+
+    text = "".join(block.text for block in response.content if block.type == "text")
+    try:
+        return [h for h in _parse_json_response(text).get("highlights", []) if isinstance(h, str)]
+    except (json.JSONDecodeError, AttributeError) as e:
+        print(f"Slack summary parse failed: {e}")
+        return []
+
+
+async def _summarize_chunk(client, chunk: dict, semaphore: asyncio.Semaphore) -> tuple[list, bool]:
+    """(highlights, ok). A failed call falls back to the chunk's own text, which is never cached."""
+    async with semaphore:
+        try:
+            response = await create_message(
+                client,
+                stage="slack_map",
+                max_tokens=800,
+                messages=[{"role": "user", "content": SLACK_MAP_PROMPT.format(messages=chunk["text"])}]
+            )
+        except anthropic.APIError as e:
+            print(f"Slack summary for {chunk['day']} failed, using its raw text: {e}")
+            return [summarize(" ".join(chunk["text"].split()), max_tokens=FALLBACK_TOKENS)], False
+    return _highlights_from(response), True
+
+
+async def summarize_messages(client, messages: list, store_path: Path = SLACK_STORE_PATH) -> list:
+    """
+    Map-reduce summary of a week of Slack messages. Returns at most
+    FINAL_HIGHLIGHT_COUNT one-sentence highlights.
+    """
+    chunks = build_chunks(messages)
+    keys = [_chunk_key(c) for c in chunks]
+    cached = _load_cached(keys, store_path)
+
+    pending = [(key, chunk) for key, chunk in zip(keys, chunks) if key not in cached]
+    print(f"Slack map step: {len(chunks)} chunks, {len(chunks) - len(pending)} cached")
+
+    semaphore = asyncio.Semaphore(_concurrency())
+    fresh = await asyncio.gather(*[_summarize_chunk(client, chunk, semaphore) for _, chunk in pending])
+    _save_cached(
+        [(key, chunk["day"], highlights) for (key, chunk), (highlights, ok) in zip(pending, fresh)
+         if ok and highlights],
+        store_path,
+    )
+    cached.update({key: highlights for (key, _), (highlights, _) in zip(pending, fresh)})
+
+    highlights = [h for key in keys for h in cached.get(key, [])]
+    if len(highlights) <= REDUCE_THRESHOLD:
+        return highlights
+
+    try:
+        response = await create_message(
+            client,
+            stage="slack_reduce",
+            max_tokens=1200,
+            messages=[{"role": "user", "content": SLACK_REDUCE_PROMPT.format(
+                highlights="\n".join(f"- {h}" for h in highlights),
+                count=FINAL_HIGHLIGHT_COUNT,
+            )}]
+        )
+    except anthropic.APIError as e:
+        print(f"Slack reduce step failed, keeping the first highlights: {e}")
+        return highlights[:FINAL_HIGHLIGHT_COUNT]
+    return _highlights_from(response)[:FINAL_HIGHLIGHT_COUNT] or highlights[:FINAL_HIGHLIGHT_COUNT]
@@ -0,0 +1,169 @@
+import hashlib
+import re
+import sqlite3
+from datetime import date
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+from services.entity_resolver import get_resolver
+from services.local_store import connect, is_seeded, mark_seeded
+from services.url_verifier import strip_tracking
+
+# ── Cross-week story memory ──────────────────────────────────────────────────
+# Every URL, headline and company a stored digest published is indexed
+# with the first week it appeared. Before a week's news reaches the prompt,
+# anything an earlier week already covered is dropped via set lookups.
+# The first load on a fresh disk re-seeds the index from the digests table.
+
+STORY_MEMORY_PATH = Path(__file__).resolve().parents[1] / "data" / "story_memory.db"
+
+
+def normalize_url(url: str | None) -> str:
+    """Lowercased host without www, no fragment, tracking params or trailing slash."""
+    if not url or not url.startswith(("http://", "https://")):
+        return ""
+    parts = urlsplit(strip_tracking(url))
+    host = parts.netloc.lower().removeprefix("www.")
+    return urlunsplit(("https", host, parts.path.rstrip("/") or "/", parts.query, ""))
+
+
+def headline_key(title: str | None) -> str:
+    """Hash of the headline's words, ignoring case and punctuation."""
+    words = re.findall(r"[a-z0-9]+", (title or "").lower())
+    if len(words) < 3:
+        return ""
+    return hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return connect(path, """
+        CREATE TABLE IF NOT EXISTS published_stories (
+            kind       TEXT NOT NULL,   -- url | headline | company
+            key        TEXT NOT NULL,
+            week_start TEXT NOT NULL,   -- first week it was published
+            PRIMARY KEY (kind, key)
+        );
+    """)
+
+
+def _supabase():
+    from services.clients import get_supabase
+
+    return get_supabase()
+
+
+def ensure_seeded(path: Path | None = None) -> bool:
+    """
+    Seeds the index from every stored digest the first time this disk
+    sees it. On failure the memory covers only what this process stored,
+    and the next load tries again.
+    """
+    path = path or STORY_MEMORY_PATH
+    if is_seeded(path):
+        return True
+    try:
+        count = rebuild_from_digests(_supabase(), path)
+    except Exception as e:
+        print(f"Story memory seed failed: {e}")
+        return False
+    print(f"Seeded story memory with {count} published stories")
+    return True
+
+
+class StoryMemory:
+    """In-memory view of everything published before one week."""
+
+    def __init__(self, urls: set | None = None, headlines: set | None = None, companies: set | None = None):
+        self.urls = urls or set()
+        self.headlines = headlines or set()
+        self.companies = companies or set()
+
+    @classmethod
+    def load(cls, before: date, path: Path | None = None) -> "StoryMemory":
+        """Blocking on a fresh disk (see ensure_seeded) — async callers run it via db.run."""
+        path = path or STORY_MEMORY_PATH
+        memory = cls()
+        ensure_seeded(path)
+        buckets = {"url": memory.urls, "headline": memory.headlines, "company": memory.companies}
+        with _connect(path) as conn:
+            for kind, key in conn.execute(
+                "SELECT kind, key FROM published_stories WHERE week_start < ?", (str(before),)
+            ):
+                buckets[kind].add(key)
+        return memory
+
+    def __len__(self) -> int:
+        return len(self.urls) + len(self.headlines) + len(self.companies)
+
+    def fingerprint(self) -> str:
+        """Changes whenever the remembered keys do — used to key caches of filtered input."""
+        keys = sorted(self.urls) + sorted(self.headlines) + sorted(self.companies)
+        return hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()
+
+    def seen_story(self, url: str | None = None, title: str | None = None) -> bool:
+        return normalize_url(url) in self.urls or headline_key(title) in self.headlines
+
+    def seen_company(self, name: str | None) -> bool:
+        return get_resolver().key(name) in self.companies
+
+    def new_stories(self, items: list, title_key: str = "title") -> list:
+        return [i for i in items if not self.seen_story(i.get("url"), i.get(title_key))]
+
+    def new_companies(self, companies: list) -> list:
+        return [c for c in companies if not self.seen_company(c.get("name"))]
+
+
+def _dicts(value) -> list:
+    """The dict items of a model-written list section — it may be null, a string or mixed."""
+    return [item for item in value if isinstance(item, dict)] if isinstance(value, list) else []
+
+
+def digest_keys(digest: dict) -> list:
+    """(kind, key) pairs for everything a digest row published."""
+    keys = []
+    for item in _dicts(digest.get("ai_developments")):
+        keys += [("url", normalize_url(item.get("url"))), ("headline", headline_key(item.get("headline")))]
+    for company in _dicts(digest.get("companies_to_watch")):
+        keys += [("company", get_resolver().key(company.get("name"))), ("url", normalize_url(company.get("url")))]
+    jobs = digest.get("jobs_and_hiring")
+    for insight in _dicts(jobs.get("key_insights") if isinstance(jobs, dict) else None):
+        keys.append(("url", normalize_url(insight.get("url"))))
+    resource = digest.get("featured_resource")
+    if isinstance(resource, dict):
+        keys += [("url", normalize_url(resource.get("url"))), ("headline", headline_key(resource.get("title")))]
+    return [(kind, key) for kind, key in keys if key]
+
+
+def remember_digests(digests: list, path: Path | None = None) -> int:
+    """Indexes digest rows, keeping the earliest week each key appeared in."""
+    rows = [
+        (kind, key, str(digest["week_start"]))
+        for digest in digests
+        for kind, key in digest_keys(digest)
+    ]
+    with _connect(path or STORY_MEMORY_PATH) as conn:
+        conn.executemany("""
+            INSERT INTO published_stories VALUES (?, ?, ?)
+            ON CONFLICT (kind, key) DO UPDATE SET week_start = MIN(week_start, excluded.week_start)
+        """, rows)
+    return len(rows)
+
+
+def rebuild_from_digests(supabase, path: Path | None = None) -> int:
+    """Seeds the index from every digest already in Supabase."""
+    path = path or STORY_MEMORY_PATH
+    result = supabase.table("digests") \
+        .select("week_start, ai_developments, companies_to_watch, jobs_and_hiring, featured_resource") \
+        .execute()
+    count = remember_digests(result.data or [], path)
+    with _connect(path) as conn:
+        mark_seeded(conn)
+    return count
+
+
+if __name__ == "__main__":
+    from services.config import load_env
+    from services.digest_synthesizer import get_supabase
+
+    load_env()
+    print(f"Indexed {rebuild_from_digests(get_supabase())} published stories into {STORY_MEMORY_PATH}")
@@ -0,0 +1,95 @@
+import math
+import re
+from collections import Counter
+
+# ── Extractive summarizer ────────────────────────────────────────────────────
+# Replaces blind `text[:n]` truncation. Each sentence is scored by how much
+# of the article's own vocabulary it carries plus the priority topics
+# Joanna cares about; the best sentences that fit the token budget are kept
+# in their original order. Pure Python over precompiled tables — thousands
+# of articles per second, no model calls.
+
+CHARS_PER_TOKEN = 4  # same rough ratio as rate_limiter.estimate_input_tokens
+
+# Priority topics from the news selection prompt → weight
+PRIORITY_TERMS = {
+    "anthropic": 3.0, "claude": 3.0, "claude code": 3.0, "cowork": 2.0,
+    "agent": 2.0, "agents": 2.0, "agentic": 2.0, "coding": 1.5, "cursor": 1.5, "windsurf": 1.5,
+    "developer": 1.0, "developers": 1.0,
+    "jobs": 2.0, "workforce": 2.0, "workers": 1.5, "hiring": 1.5, "layoffs": 1.5, "roles": 1.0,
+    "skills": 1.5, "wages": 1.5, "earning": 1.5, "economic mobility": 2.5,
+    "nonprofit": 2.0, "nonprofits": 2.0, "education": 1.5, "students": 1.5, "training": 1.0,
+    "ai justice": 2.5, "grant": 1.0, "grants": 1.0, "credits": 1.0, "startup": 1.0, "startups": 1.0,
+}
+
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been being but by can could did do does for from had
+has have he her his how i if in into is it its just may more most new not of on or our out over said
+says she so some than that the their them then there these they this to up us was we were what when
+which who will with would you your
+""".split())
+
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"'”’)]*\s+(?=[\"“(]?[A-Z0-9$])")
+WORD = re.compile(r"[a-z0-9$%]+(?:['’][a-z]+)?")
+FACT = re.compile(r"\d|\$|%")
+
+LEAD_BONUS = 0.5  # news puts the key fact first
+
+
+def split_sentences(text: str) -> list:
+    return [s.strip() for s in SENTENCE_END.split(text.strip()) if s.strip()]
+
+
+def _sentence_scores(sentences: list) -> list:
+    words = [WORD.findall(s.lower()) for s in sentences]
+    frequency = Counter(w for ws in words for w in ws if w not in STOPWORDS and len(w) > 2)
+    peak = max(frequency.values(), default=1)
+
+    scores = []
+    for i, (sentence, ws) in enumerate(zip(sentences, words)):
+        content = [w for w in ws if w not in STOPWORDS and len(w) > 2]
+        if not content:
+            scores.append(0.0)
+            continue
+        salience = sum(frequency[w] for w in content) / peak
+        priority = sum(PRIORITY_TERMS.get(w, 0.0) for w in ws)
+        priority += sum(PRIORITY_TERMS.get(f"{a} {b}", 0.0) for a, b in zip(ws, ws[1:]))
+        score = (salience + priority) / math.sqrt(len(content))
+        if FACT.search(sentence):
+            score += 0.3
+        if i == 0:
+            score += LEAD_BONUS
+        scores.append(score)
+    return scores
+
+
+def _cut(text: str, max_chars: int) -> str:
+    """Last resort for one long sentence: stop at a word boundary."""
+    cut = text[:max_chars - 1].rsplit(" ", 1)[0].rstrip(",;:—-")
+    return f"{cut}…"
+
+
+def summarize(text: str | None, max_tokens: int = 75) -> str | None:
+    """
+    The most informative sentences of text that fit in max_tokens,
+    in their original order. Text already within budget is returned as-is.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if not text or len(text) <= max_chars:
+        return text
+
+    sentences = split_sentences(text)
+    if len(sentences) == 1:
+        return _cut(sentences[0], max_chars)
+
+    scores = _sentence_scores(sentences)
+    chosen, used = [], 0
+    for i in sorted(range(len(sentences)), key=lambda i: -scores[i]):
+        cost = len(sentences[i]) + (1 if chosen else 0)
+        if used + cost <= max_chars:
+            chosen.append(i)
+            used += cost
+    if not chosen:
+        best = max(range(len(sentences)), key=lambda i: scores[i])
+        return _cut(sentences[best], max_chars)
+    return " ".join(sentences[i] for i in sorted(chosen))
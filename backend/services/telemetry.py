@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+# ── Pipeline spans ───────────────────────────────────────────────────────────
+# Every digest stage runs inside span(name). Finished spans feed the
+# Prometheus counters served at GET /metrics and, when
+# TELEMETRY_EXPORT_PATH is set, are appended to that file as JSON lines
+# so a single run can be broken down stage by stage.
+
+SPAN_FIELDS = ("input_tokens", "output_tokens", "cached_tokens", "web_searches", "cost_usd")
+
+_run_id: ContextVar[str | None] = ContextVar("telemetry_run_id", default=None)
+
+_metrics: dict = {}
+_metrics_lock = threading.Lock()
+
+
+class Span:
+    def __init__(self, name: str):
+        self.name = name
+        self.run_id = _run_id.get()
+        self.attributes: dict = {field: 0 for field in SPAN_FIELDS}
+        self.started = time.monotonic()
+        self.duration = 0.0
+        self.status = "ok"
+
+    def add(self, **values):
+        """Adds numeric values (tokens, searches, cost) and sets anything else."""
+        for key, value in values.items():
+            if key in SPAN_FIELDS:
+                self.attributes[key] += value
+            else:
+                self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "span": self.name,
+            "status": self.status,
+            "duration_s": round(self.duration, 4),
+            "ended_at": datetime.now(timezone.utc).isoformat(),
+            **self.attributes,
+        }
+
+
+@contextmanager
+def pipeline_run():
+    """Groups every span opened inside it under one run_id."""
+    token = _run_id.set(uuid.uuid4().hex[:12])
+    try:
+        yield _run_id.get()
+    finally:
+        _run_id.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Times a pipeline stage and records it on exit, including on error."""
+    current = Span(name)
+    current.add(**attributes)
+    try:
+        yield current
+    except BaseException:
+        current.status = "error"
+        raise
+    finally:
+        current.duration = time.monotonic() - current.started
+        _record(current)
+
+
+def _record(finished: Span):
+    with _metrics_lock:
+        stats = _metrics.setdefault(finished.name, {
+            "count": 0, "errors": 0, "duration_sum": 0.0, "duration_last": 0.0,
+            **{field: 0 for field in SPAN_FIELDS},
+        })
+        stats["count"] += 1
+        stats["errors"] += finished.status == "error"
+        stats["duration_sum"] += finished.duration
+        stats["duration_last"] = finished.duration
+        for field in SPAN_FIELDS:
+            stats[field] += finished.attributes[field]
+
+    export_path = os.environ.get("TELEMETRY_EXPORT_PATH")
+    if export_path:
+        path = Path(export_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _metrics_lock, open(path, "a") as f:
+            f.write(json.dumps(finished.to_dict()) + "\n")
+
+
+def snapshot() -> dict:
+    with _metrics_lock:
+        return {name: dict(stats) for name, stats in _metrics.items()}
+
+
+# ── Prometheus exporter ──────────────────────────────────────────────────────
+
+_PROMETHEUS_METRICS = [
+    ("digest_stage_duration_seconds_total", "counter", "duration_sum", "Total wall time per pipeline stage"),
+    ("digest_stage_spans_total", "counter", "count", "Completed spans per pipeline stage"),
+    ("digest_stage_last_duration_seconds", "gauge", "duration_last", "Wall time of the most recent span"),
+    ("digest_stage_errors_total", "counter", "errors", "Spans that raised"),
+    ("digest_stage_input_tokens_total", "counter", "input_tokens", "Anthropic input tokens"),
+    ("digest_stage_output_tokens_total", "counter", "output_tokens", "Anthropic output tokens"),
+    ("digest_stage_cached_tokens_total", "counter", "cached_tokens", "Input tokens served from prompt cache"),
+    ("digest_stage_web_searches_total", "counter", "web_searches", "Web search tool calls"),
+    ("digest_stage_cost_usd_total", "counter", "cost_usd", "Estimated Anthropic spend"),
+]
+
+
+def render_prometheus() -> str:
+    """Renders all stage metrics in the Prometheus text exposition format."""
+    stats = snapshot()
+    lines = []
+    for metric, kind, field, help_text in _PROMETHEUS_METRICS:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for stage in sorted(stats):
+            lines.append(f'{metric}{{stage="{stage}"}} {stats[stage][field]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,177 @@
+import re
+import sqlite3
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from services.entity_resolver import PhraseMatcher, get_resolver
+from services.local_store import connect, mark_seeded
+
+# ── Cross-week trends ────────────────────────────────────────────────────────
+# When a digest is stored its companies, industries and topics are counted
+# into per-week rows, so /digest/trends reads small aggregates instead of
+# re-parsing every digest's JSON. Regenerating a week replaces its counts,
+# and /digest/trends recounts the archive when the disk is fresh.
+
+TRENDS_PATH = Path(__file__).resolve().parents[1] / "data" / "trends.db"
+
+KINDS = ("company", "industry", "topic")
+
+# Topic → phrases that signal it in a development's headline or synthesis
+TOPIC_KEYWORDS = {
+    "AI agents":           ["agent", "agents", "agentic", "autonomous"],
+    "Coding tools":        ["claude code", "cursor", "copilot", "windsurf", "coding", "developer tools"],
+    "Models":              ["model", "models", "llm", "gpt", "claude", "gemini", "llama"],
+    "Jobs & workforce":    ["jobs", "hiring", "layoffs", "workforce", "workers", "roles", "skills"],
+    "Education":           ["education", "students", "school", "tutor", "learning", "edtech"],
+    "Policy & regulation": ["regulation", "policy", "law", "bill", "executive order", "compliance"],
+    "Safety":              ["safety", "alignment", "risk", "misuse"],
+    "Funding":             ["raises", "funding", "valuation", "investment", "acquires", "acquisition"],
+    "Health":              ["health", "clinical", "medical", "patients", "hospital"],
+}
+
+
+def _normalize_industry(industry: str | None) -> str:
+    return re.sub(r"\s+", " ", (industry or "").strip()).lower()
+
+
+@lru_cache(maxsize=1)
+def _topic_matcher() -> PhraseMatcher:
+    return PhraseMatcher({phrase: topic for topic, phrases in TOPIC_KEYWORDS.items() for phrase in phrases})
+
+
+def _topics(text: str) -> set:
+    return _topic_matcher().values(text)
+
+
+def extract_entities(digest: dict) -> dict:
+    """{(kind, key): (label, count)} for one digest row."""
+    counts, labels = Counter(), {}
+
+    def add(kind: str, key: str, label: str):
+        counts[(kind, key)] += 1
+        labels.setdefault((kind, key), label)
+
+    for company in digest.get("companies_to_watch") or []:
+        if not isinstance(company, dict):
+            continue
+        key, label = get_resolver().resolve(company.get("name"))
+        if not key:
+            continue
+        add("company", key, label)
+        if _normalize_industry(company.get("industry")):
+            add("industry", _normalize_industry(company["industry"]), company["industry"].strip())
+    for item in digest.get("ai_developments") or []:
+        if not isinstance(item, dict):
+            continue
+        text = " ".join(str(item.get(f) or "") for f in ("headline", "synthesis", "why_it_matters"))
+        for topic in _topics(text):
+            add("topic", topic.lower(), topic)
+    return {entity: (labels[entity], count) for entity, count in counts.items()}
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return connect(path, """
+        CREATE TABLE IF NOT EXISTS entity_week_counts (
+            kind        TEXT NOT NULL,
+            key         TEXT NOT NULL,
+            label       TEXT NOT NULL,
+            week_start  TEXT NOT NULL,
+            audience_id TEXT NOT NULL DEFAULT '',
+            count       INTEGER NOT NULL,
+            PRIMARY KEY (kind, key, week_start, audience_id)
+        );
+        CREATE INDEX IF NOT EXISTS entity_week_counts_week ON entity_week_counts (kind, week_start);
+    """)
+
+
+def record_digests(digests: list, path: Path | None = None) -> int:
+    """Replaces the per-week counts for each digest's (week, audience)."""
+    rows = []
+    for digest in digests:
+        week, audience = str(digest["week_start"]), digest.get("audience_id") or ""
+        rows += [
+            (kind, key, label, week, audience, count)
+            for (kind, key), (label, count) in extract_entities(digest).items()
+        ]
+    with _connect(path or TRENDS_PATH) as conn:
+        conn.executemany(
+            "DELETE FROM entity_week_counts WHERE week_start = ? AND audience_id = ?",
+            {(str(d["week_start"]), d.get("audience_id") or "") for d in digests},
+        )
+        conn.executemany("INSERT OR REPLACE INTO entity_week_counts VALUES (?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def query_trends(kind: str, top: int = 10, since: str | None = None, until: str | None = None,
+                 audience_id: str | None = None, keys: list | None = None, path: Path | None = None) -> dict:
+    """
+    Weekly time series for the `top` most mentioned entities of one kind
+    (or the given keys). Every series has one count per week in `weeks`
+    and is labelled as the entity was most recently written.
+    """
+    where, params = ["kind = ?", "audience_id = ?"], [kind, audience_id or ""]
+    if since:
+        where.append("week_start >= ?")
+        params.append(since)
+    if until:
+        where.append("week_start <= ?")
+        params.append(until)
+    clause = " AND ".join(where)
+
+    with _connect(path or TRENDS_PATH) as conn:
+        weeks = [w for (w,) in conn.execute(
+            f"SELECT DISTINCT week_start FROM entity_week_counts WHERE {clause} ORDER BY week_start", params
+        )]
+        if keys:
+            leaders = conn.execute(
+                f"SELECT key, label, SUM(count), MAX(week_start) FROM entity_week_counts "
+                f"WHERE {clause} AND key IN ({','.join('?' * len(keys))}) GROUP BY key ORDER BY 3 DESC",
+                [*params, *keys],
+            ).fetchall()
+        else:
+            leaders = conn.execute(
+                f"SELECT key, label, SUM(count), MAX(week_start) FROM entity_week_counts "
+                f"WHERE {clause} GROUP BY key ORDER BY 3 DESC, key LIMIT ?",
+                [*params, top],
+            ).fetchall()
+        per_week = conn.execute(
+            f"SELECT key, week_start, SUM(count) FROM entity_week_counts "
+            f"WHERE {clause} AND key IN ({','.join('?' * len(leaders)) or 'NULL'}) GROUP BY key, week_start",
+            [*params, *(key for key, *_ in leaders)],
+        ).fetchall()
+
+    index = {week: i for i, week in enumerate(weeks)}
+    series = {key: {"key": key, "label": label, "total": total, "counts": [0] * len(weeks)}
+              for key, label, total, _ in leaders}
+    for key, week, count in per_week:
+        series[key]["counts"][index[week]] = count
+    return {"kind": kind, "weeks": weeks, "series": list(series.values())}
+
+
+def rebuild_from_digests(supabase, path: Path | None = None) -> int:
+    """Recomputes every week's counts from the digests table."""
+    result = supabase.table("digests") \
+        .select("week_start, audience_id, ai_developments, companies_to_watch, generated_at") \
+        .execute()
+    # A regenerated week keeps its earlier rows; like the live path, count only the latest
+    latest = {}
+    for digest in result.data or []:
+        slot = (str(digest["week_start"]), digest.get("audience_id") or "")
+        if slot not in latest or (digest.get("generated_at") or "") >= (latest[slot].get("generated_at") or ""):
+            latest[slot] = digest
+    path = path or TRENDS_PATH
+    with _connect(path) as conn:
+        conn.execute("DELETE FROM entity_week_counts")
+    count = record_digests(list(latest.values()), path)
+    with _connect(path) as conn:
+        mark_seeded(conn)
+    return count
+
+
+if __name__ == "__main__":
+    from services.config import load_env
+    from services.digest_synthesizer import get_supabase
+
+    load_env()
+    print(f"Recorded {rebuild_from_digests(get_supabase())} entity counts into {TRENDS_PATH}")
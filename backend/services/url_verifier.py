@@ -0,0 +1,194 @@
+import asyncio
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from services.clients import http_client
+from services.local_store import connect
+from services.telemetry import span
+
+# ── Link verification ────────────────────────────────────────────────────────
+# Every URL the model put in a digest is canonicalized (tracking params and
+# fragments stripped, same-site redirects followed) and HEAD-checked before
+# the digest is stored. Links that are definitely dead become null, which
+# the frontend and email already render as "no link".
+
+URL_CACHE_PATH = Path(__file__).resolve().parents[1] / "data" / "url_cache.db"
+
+TRACKING_PARAMS = {"ref", "fbclid", "gclid", "mc_cid", "mc_eid", "cmpid", "_hsenc", "_hsmi"}
+TRACKING_PREFIXES = ("utm_",)
+PER_HOST_LIMIT = 4
+MAX_CONNECTIONS = 20
+
+# Statuses that mean the page does not exist. Anything else — including
+# 401/403 paywalls, 429 and 5xx — keeps the link.
+DEAD_STATUSES = {404, 410}
+
+USER_AGENT = "Mozilla/5.0 (compatible; ReturnReadyLinkCheck/1.0)"
+
+
+def _timeout() -> float:
+    return float(os.environ.get("URL_VERIFY_TIMEOUT", 5))
+
+
+def _cache_ttl() -> float:
+    return float(os.environ.get("URL_CACHE_TTL_HOURS", 24)) * 3600
+
+
+def strip_tracking(url: str) -> str:
+    """Removes tracking query params and the fragment, keeping everything else as-is."""
+    parts = urlsplit(url.strip())
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ])
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+# ── Cache ────────────────────────────────────────────────────────────────────
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return connect(path, """
+        CREATE TABLE IF NOT EXISTS url_checks (
+            url        TEXT PRIMARY KEY,
+            final_url  TEXT,
+            status     INTEGER,
+            ok         INTEGER NOT NULL,
+            dead       INTEGER NOT NULL,
+            checked_at REAL NOT NULL
+        );
+    """)
+
+
+def _load_cached(urls: list, path: Path) -> dict:
+    if not urls:
+        return {}
+    with _connect(path) as conn:
+        rows = conn.execute(
+            f"SELECT url, final_url, status, ok, dead FROM url_checks "
+            f"WHERE checked_at > ? AND url IN ({','.join('?' * len(urls))})",
+            [time.time() - _cache_ttl(), *urls],
+        ).fetchall()
+    return {
+        url: {"url": url, "final_url": final_url, "status": status, "ok": bool(ok), "dead": bool(dead)}
+        for url, final_url, status, ok, dead in rows
+    }
+
+
+def _same_site(url: str, other: str) -> bool:
+    def host(u):
+        return urlsplit(u).netloc.lower().removeprefix("www.")
+    return host(url) == host(other)
+
+
+def _save_cached(results: list, path: Path):
+    """Inconclusive checks (no status) are not cached, so the next run tries again."""
+    results = [r for r in results if r["status"] is not None]
+    now = time.time()
+    with _connect(path) as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO url_checks VALUES (?, ?, ?, ?, ?, ?)",
+            [(r["url"], r["final_url"], r["status"], int(r["ok"]), int(r["dead"]), now) for r in results],
+        )
+
+
+# ── Checks ───────────────────────────────────────────────────────────────────
+
+async def _check(client: httpx.AsyncClient, url: str, host_limits: dict) -> dict:
+    result = {"url": url, "final_url": url, "status": None, "ok": False, "dead": False}
+    async with host_limits[urlsplit(url).netloc.lower()]:
+        try:
+            resp = await client.head(url)
+            if resp.status_code in (403, 405, 501):
+                # Some servers reject HEAD — retry with a GET but skip the body
+                async with client.stream("GET", url) as streamed:
+                    resp = streamed
+        except httpx.HTTPError as e:
+            # DNS blips and refused connections say nothing about the page — keep the link
+            print(f"Link check inconclusive for {url}: {e}")
+            return result
+
+    result["status"] = resp.status_code
+    final_url = strip_tracking(str(resp.url))
+    # Redirects to another host are login, consent or paywall pages, not the article
+    if _same_site(url, final_url):
+        result["final_url"] = final_url
+    result["ok"] = resp.status_code < 400
+    result["dead"] = resp.status_code in DEAD_STATUSES
+    return result
+
+
+async def verify_urls(urls: list, client: httpx.AsyncClient | None = None,
+                      cache_path: Path | None = None) -> dict:
+    """
+    Checks every URL concurrently — at most PER_HOST_LIMIT in flight per
+    host — and returns results keyed by the original URL. Results are
+    cached for URL_CACHE_TTL_HOURS.
+    """
+    cache_path = cache_path or URL_CACHE_PATH
+    unique = list(dict.fromkeys(u for u in urls if u and u.startswith(("http://", "https://"))))
+    results = _load_cached(unique, cache_path)
+    pending = [u for u in unique if u not in results]
+
+    if pending:
+        host_limits = defaultdict(lambda: asyncio.Semaphore(PER_HOST_LIMIT))
+        owns_client = client is None
+        client = client or http_client(USER_AGENT, _timeout(), MAX_CONNECTIONS)
+        try:
+            checked = await asyncio.gather(*[_check(client, strip_tracking(u), host_limits) for u in pending])
+        finally:
+            if owns_client:
+                await client.aclose()
+        for url, result in zip(pending, checked):
+            results[url] = {**result, "url": url}
+        _save_cached([results[u] for u in pending], cache_path)
+
+    return results
+
+
+def _link_holders(digest: dict) -> list:
+    """Every dict in a digest that carries a `url` field."""
+    jobs = digest.get("jobs_and_hiring")
+    holders = []
+    for section in (digest.get("ai_developments"), digest.get("companies_to_watch"),
+                    jobs.get("key_insights") if isinstance(jobs, dict) else None):
+        if isinstance(section, list):
+            holders += section
+    if isinstance(digest.get("featured_resource"), dict):
+        holders.append(digest["featured_resource"])
+    return [h for h in holders if isinstance(h, dict) and isinstance(h.get("url"), str)]
+
+
+async def verify_digest_links(*digests: dict, client: httpx.AsyncClient | None = None) -> dict:
+    """
+    Canonicalizes the links in one or more parsed digests in place:
+    working links are replaced by their final (redirected, de-tracked)
+    URL and dead links are set to None. Returns counts for telemetry.
+    """
+    holders = [h for digest in digests for h in _link_holders(digest)]
+    with span("url_verify") as verify_span:
+        started = time.monotonic()
+        results = await verify_urls([h["url"] for h in holders], client)
+
+        rewritten = dead = 0
+        for holder in holders:
+            result = results.get(holder["url"])
+            if not result:
+                continue
+            if result["dead"]:
+                holder["url"] = None
+                dead += 1
+            elif result["ok"] and result["final_url"] != holder["url"]:
+                holder["url"] = result["final_url"]
+                rewritten += 1
+
+        stats = {"links": len(results), "rewritten": rewritten, "dead": dead}
+        verify_span.add(**stats)
+    print(f"Verified {len(results)} links in {time.monotonic() - started:.2f}s "
+          f"({rewritten} rewritten, {dead} dead)")
+    return stats
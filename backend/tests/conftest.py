@@ -0,0 +1,65 @@
+import json
+
+import pytest
+import httpx
+from unittest.mock import MagicMock
+from services import (
+    article_extractor, daily_shortlist, digest_feed, digest_search, digest_synthesizer, feed_scraper, news_fetcher, rate_limiter,
+    scrape_cache, search_memory, story_memory, trends, url_verifier,
+)
+
+
+@pytest.fixture(autouse=True)
+def unthrottled_limiter(monkeypatch):
+    """Mocked Anthropic calls should never wait on the shared per-minute budget."""
+    monkeypatch.setattr(rate_limiter, "_limiters", {})
+    monkeypatch.setenv("ANTHROPIC_RPM", str(10**6))
+    monkeypatch.setenv("ANTHROPIC_ITPM", str(10**9))
+    monkeypatch.setenv("ANTHROPIC_OTPM", str(10**9))
+
+
+@pytest.fixture(autouse=True)
+def isolated_news_cache(monkeypatch, tmp_path):
+    """Keeps the once-per-week news cache out of backend/data during tests."""
+    monkeypatch.setattr(digest_synthesizer, "NEWS_CACHE_DIR", tmp_path / "news_cache")
+    monkeypatch.setattr(news_fetcher, "FEED_SCRAPE_PATH", tmp_path / "feed_articles.json")
+
+
+def archive(digests: list) -> MagicMock:
+    """A Supabase stand-in whose digests table holds digests — local indexes seed from it, never the real one."""
+    supabase = MagicMock()
+    supabase.table.return_value.select.return_value.execute.return_value.data = digests
+    return supabase
+
+
+def write_scraped(path, articles):
+    """Writes (title, published_date) pairs as a scraper output file."""
+    path.write_text(json.dumps({"articles": [
+        {"title": title, "url": f"https://example.com/{title.replace(' ', '-')}", "summary": "s",
+         "source": "TechCrunch", "published_date": published, "scraped_at": "2025-03-11T05:30:00"}
+        for title, published in articles
+    ]}))
+
+
+@pytest.fixture(autouse=True)
+def isolated_story_memory(monkeypatch, tmp_path):
+    """Digests and searches from tests must not leak into the real story, search or trend indexes."""
+    monkeypatch.setattr(story_memory, "STORY_MEMORY_PATH", tmp_path / "story_memory.db")
+    monkeypatch.setattr(story_memory, "_supabase", lambda: archive([]))
+    monkeypatch.setattr(digest_search, "DIGEST_SEARCH_PATH", tmp_path / "digest_search.db")
+    monkeypatch.setattr(trends, "TRENDS_PATH", tmp_path / "trends.db")
+    monkeypatch.setattr(search_memory, "SEARCH_MEMORY_PATH", tmp_path / "search_memory.db")
+    monkeypatch.setattr(feed_scraper, "FEED_STATE_PATH", tmp_path / "feed_state.db")
+    monkeypatch.setattr(scrape_cache, "SCRAPE_CACHE_PATH", tmp_path / "scrape_cache.db")
+    monkeypatch.setattr(article_extractor, "ARTICLE_CACHE_PATH", tmp_path / "article_cache.db")
+    monkeypatch.setattr(digest_feed, "DIGEST_FEED_PATH", tmp_path / "digest_feed.db")
+    monkeypatch.setattr(daily_shortlist, "SHORTLIST_PATH", tmp_path / "daily_shortlist.db")
+
+
+@pytest.fixture(autouse=True)
+def offline_link_checks(monkeypatch, tmp_path):
+    """Digest links are verified against a local always-200 stub, never the network."""
+    original = url_verifier.http_client
+    ok = httpx.MockTransport(lambda request: httpx.Response(200))
+    monkeypatch.setattr(url_verifier, "http_client", lambda *args: original(*args, transport=ok))
+    monkeypatch.setattr(url_verifier, "URL_CACHE_PATH", tmp_path / "url_cache.db")
@@ -0,0 +1,147 @@
+"""
+Recorded-fixture replay transports for Anthropic, Supabase and Resend.
+
+Each service gets a ReplayTransport loaded from tests/fixtures/replay/<name>.json.
+A recording matches on method, path prefix and an optional body substring,
+and is served after a simulated latency so offline runs keep realistic
+timing. Refresh fixtures against live services with RecordingTransport.
+"""
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import anthropic
+import httpx
+from supabase import create_client
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "replay"
+
+# Typical round-trip latencies (seconds) observed against production
+DEFAULT_LATENCY = {
+    "anthropic": 0.02,
+    "supabase": 0.005,
+    "resend": 0.01,
+}
+
+
+# supabase-py validates the key's JWT shape, so use a structurally valid dummy
+REPLAY_SUPABASE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.cmVwbGF5"
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    def __init__(self, fixture: str, latency: float | None = None):
+        self.recordings = json.loads((FIXTURES_DIR / f"{fixture}.json").read_text())
+        self.latency = DEFAULT_LATENCY.get(fixture, 0.0) if latency is None else latency
+        self.requests: list[httpx.Request] = []
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        body = request.content.decode("utf-8", errors="ignore")
+        for recording in self.recordings:
+            if (
+                recording["method"] == request.method
+                and request.url.path.startswith(recording["path"])
+                and recording.get("body_contains", "") in body
+            ):
+                self.requests.append(request)
+                return httpx.Response(
+                    recording["status"],
+                    headers=recording.get("headers", {}),
+                    content=json.dumps(recording["body"]).encode("utf-8"),
+                    request=request,
+                )
+        raise AssertionError(f"No replay recording for {request.method} {request.url}")
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        time.sleep(self.latency)
+        return self._respond(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency)
+        return self._respond(request)
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Passes requests through to a live transport and saves them as replay recordings."""
+
+    def __init__(self, fixture: str, match_body: str | None = None):
+        self.fixture = fixture
+        self.match_body = match_body
+        self.live = httpx.HTTPTransport()
+        self.recordings: list[dict] = []
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self.live.handle_request(request)
+        response.read()
+        recording = {
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "headers": {"content-type": response.headers.get("content-type", "application/json")},
+            "body": response.json(),
+        }
+        if self.match_body:
+            recording["body_contains"] = self.match_body
+        self.recordings.append(recording)
+        return response
+
+    def save(self):
+        path = FIXTURES_DIR / f"{self.fixture}.json"
+        path.write_text(json.dumps(self.recordings, indent=2) + "\n")
+
+
+def replay_anthropic(transport: ReplayTransport) -> anthropic.Anthropic:
+    return anthropic.Anthropic(
+        api_key="replay-key",
+        max_retries=0,
+        http_client=httpx.Client(transport=transport),
+    )
+
+
+def replay_supabase(transport: ReplayTransport):
+    client = create_client("https://replay.supabase.co", REPLAY_SUPABASE_KEY)
+    session = client.postgrest.session
+    client.postgrest.session = httpx.Client(
+        base_url=session.base_url,
+        headers=session.headers,
+        transport=transport,
+    )
+    return client
+
+
+class ReplayRequests:
+    """Stands in for the `requests` module inside resend.request."""
+
+    def __init__(self, transport: ReplayTransport):
+        self.transport = transport
+
+    def request(self, method, url, json=None, headers=None, **kwargs):
+        request = httpx.Request(method.upper(), url, json=json, headers=headers)
+        response = self.transport.handle_request(request)
+        response.read()
+        return response
+
+
+def install_replay(monkeypatch, latency: float | None = None) -> dict:
+    """
+    Points every external client the pipeline uses at replay transports.
+    Returns the transports so tests can inspect the requests made.
+    """
+    import resend.request
+    from services import digest_synthesizer, email_sender, news_fetcher
+
+    transports = {
+        name: ReplayTransport(name, latency)
+        for name in ("anthropic", "supabase", "resend")
+    }
+
+    claude = replay_anthropic(transports["anthropic"])
+    monkeypatch.setattr(news_fetcher, "client", claude)
+    monkeypatch.setattr(digest_synthesizer, "client", claude)
+
+    supabase = replay_supabase(transports["supabase"])
+    monkeypatch.setattr(digest_synthesizer, "get_supabase", lambda: supabase)
+    monkeypatch.setattr(email_sender, "get_supabase", lambda: supabase)
+
+    monkeypatch.setattr(resend.request, "requests", ReplayRequests(transports["resend"]))
+    return transports
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from services import article_extractor
+from services.article_extractor import USER_AGENT, extract_articles, extract_text
+from services.clients import http_client
+from services.news_fetcher import fetch_from_scraped
+
+ARTICLE_HTML = """<html><head><script>var tracking = 1;</script></head><body>
+<header><nav><a href="/">Home</a> <a href="/ai">AI</a></nav></header>
+<div class="sidebar"><p>Subscribe to our newsletter for the latest, greatest and most important news.</p></div>
+<article class="post"><h1>Cursor raises</h1>
+<p>The AI coding startup Cursor raised $900M, valuing it at $9B, according to people familiar with the deal.
+<p>Investors said demand from engineering teams, bootcamps, and workforce programs drove the round.</p>
+<div class="share-buttons"><p>Share this story on Twitter, Facebook, LinkedIn, and email right now please.</p></div>
+<p>The company plans to hire {n} engineers, mostly in New York and San Francisco, over the next year.</p>
+</article>
+<div id="comments"><p>Great article, thanks for writing this up, I learned a lot from it today!</p></div>
+<footer><p>Copyright 2025 Example Media, all rights reserved, do not copy this content.</p></footer>
+</body></html>"""
+
+
+def _page_server(requests: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path.startswith("/missing"):
+            return httpx.Response(404)
+        if request.url.path.endswith(".pdf"):
+            return httpx.Response(200, content=b"%PDF", headers={"content-type": "application/pdf"})
+        n = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(200, text=ARTICLE_HTML.replace("{n}", n), headers={"content-type": "text/html"})
+    return handler
+
+
+def test_extract_text_keeps_the_article_and_drops_boilerplate():
+    text = extract_text(ARTICLE_HTML.replace("{n}", "200"))
+
+    assert text.split("\n\n") == [
+        "The AI coding startup Cursor raised $900M, valuing it at $9B, according to people familiar with the deal.",
+        "Investors said demand from engineering teams, bootcamps, and workforce programs drove the round.",
+        "The company plans to hire 200 engineers, mostly in New York and San Francisco, over the next year.",
+    ]
+    assert extract_text("<html><body><p>Too short.</p></body></html>") == ""
+
+
+@pytest.mark.asyncio
+async def test_pages_are_parsed_in_a_process_pool_and_cached_by_url(tmp_path):
+    requests, cache = [], tmp_path / "articles.db"
+    urls = ["https://news.example.com/a/7", "https://news.example.com/a/7?utm_source=x",
+            "https://news.example.com/missing", "https://news.example.com/report.pdf"]
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        async with http_client(USER_AGENT, transport=httpx.MockTransport(_page_server(requests))) as client:
+            texts = await extract_articles(urls, client, cache, executor)
+            again = await extract_articles(urls, client, cache, executor)
+
+    assert "hire 7 engineers" in texts[urls[0]] and texts[urls[1]] == texts[urls[0]]
+    assert texts[urls[2]] == "" and texts[urls[3]] == ""
+    # tracking-param duplicate shares one fetch; the 404 is tried again, everything else is cache
+    assert [r.url.path for r in requests] == ["/a/7", "/missing", "/report.pdf", "/missing"]
+    assert again == texts
+
+
+@pytest.mark.asyncio
+async def test_failed_downloads_are_retried_and_empty_pages_expire_sooner(tmp_path):
+    requests, cache, flaky = [], tmp_path / "articles.db", [httpx.ReadTimeout("slow")]
+    pages = _page_server(requests)
+
+    def handler(request):
+        if request.url.path == "/a/9" and flaky:
+            raise flaky.pop()
+        return pages(request)
+
+    urls = ["https://news.example.com/a/9", "https://news.example.com/report.pdf"]
+    async with http_client(USER_AGENT, transport=httpx.MockTransport(handler)) as client:
+        first = await extract_articles(urls, client, cache, executor=None)
+        second = await extract_articles(urls, client, cache, executor=None)
+        with patch("services.article_extractor.time.time", return_value=time.time() + 2 * 86400):
+            await extract_articles(urls, client, cache, executor=None)
+
+    assert first[urls[0]] == "" and "hire 9 engineers" in second[urls[0]]
+    # the timeout was never cached; the unreadable PDF is refetched once its short TTL lapses
+    assert [r.url.path for r in requests] == ["/report.pdf", "/a/9", "/report.pdf"]
+
+
+def test_one_small_process_pool_is_shared(monkeypatch):
+    monkeypatch.setenv("ARTICLE_EXTRACTION_WORKERS", "3")
+    article_extractor.shutdown()
+    try:
+        pool = article_extractor._executor()
+        assert article_extractor._executor() is pool and pool._max_workers == 3
+    finally:
+        article_extractor.shutdown()
+    assert article_extractor._executor.cache_info().currsize == 0
+
+    monkeypatch.delenv("ARTICLE_EXTRACTION_WORKERS")
+    assert article_extractor.max_workers() == article_extractor.DEFAULT_WORKERS
+
+
+@pytest.mark.asyncio
+async def test_thousands_of_pages_never_block_the_event_loop(tmp_path):
+    urls = [f"https://site{i % 50}.example.com/story/{i}" for i in range(2000)]
+    gaps, done = [], asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    async with http_client(USER_AGENT, transport=httpx.MockTransport(_page_server([]))) as client:
+        texts = await extract_articles(urls, client, tmp_path / "articles.db")
+    done.set()
+    await tick
+
+    assert all("hire" in texts[url] for url in urls)
+    assert max(gaps) < 0.5
+
+
+@pytest.mark.asyncio
+async def test_extracted_text_reaches_the_selection_prompt(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTICLE_EXTRACTION", "1")
+    scraped = tmp_path / "scraped.json"
+    scraped.write_text(json.dumps({"articles": [
+        {"title": "Cursor raises", "url": "https://news.example.com/a/1", "summary": "Cursor raised."},
+    ]}))
+    selection = MagicMock(content=[MagicMock(type="text", text='{"developments": [], "jobs_and_hiring": []}')])
+
+    with patch("services.news_fetcher.extract_articles", new_callable=AsyncMock,
+               return_value={"https://news.example.com/a/1": "Full story text. " * 200}), \
+         patch("services.news_fetcher.create_message", return_value=selection) as mock_create, \
+         patch("services.news_fetcher.fetch_companies_from_web", return_value=[]):
+        await fetch_from_scraped(scraped)
+
+    prompt = mock_create.call_args.kwargs["messages"][0]["content"]
+    assert '"content": "Full story text.' in prompt
+    assert prompt.count("Full story text.") < 200  # excerpt, not the whole page
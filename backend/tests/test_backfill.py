@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from datetime import date, datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services import backfill as backfill_module
+from services.backfill import backfill, load_checkpoint, week_range
+
+
+def test_week_range_snaps_to_monday():
+    weeks = week_range(date(2025, 3, 5), date(2025, 3, 19))
+    assert weeks == [date(2025, 3, 3), date(2025, 3, 10), date(2025, 3, 17)]
+
+
+@pytest.fixture(autouse=True)
+def slack_sync():
+    with patch("services.backfill.sync_from_settings", new_callable=AsyncMock) as mock_sync:
+        yield mock_sync
+
+
+def _supabase_with_existing(weeks: list) -> MagicMock:
+    supabase = MagicMock()
+    query = supabase.table.return_value.select.return_value.gte.return_value.lte.return_value
+    query.is_.return_value.execute.return_value.data = [{"week_start": str(w)} for w in weeks]
+    return supabase
+
+
+@pytest.mark.asyncio
+async def test_backfill_skips_complete_weeks_and_bounds_workers(monkeypatch, tmp_path):
+    monkeypatch.setattr(backfill_module, "CHECKPOINT_DIR", tmp_path)
+    in_flight, peak = 0, 0
+
+    async def fake_generate(week, audience=None, sync_slack=True, archived_only=False):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"success": True, "digest_id": f"d-{week}"}
+
+    supabase = _supabase_with_existing([date(2025, 3, 10)])
+    with patch("services.backfill.get_supabase", return_value=supabase), \
+         patch("services.backfill.generate_digest", side_effect=fake_generate) as mock_generate:
+        summary = await backfill(date(2025, 3, 3), date(2025, 4, 7), workers=2)
+
+    generated = sorted(c.args[0] for c in mock_generate.call_args_list)
+    assert date(2025, 3, 10) not in generated and len(generated) == 5
+    assert peak == 2
+    assert summary["success"] is True
+    assert summary["skipped"] == 1 and summary["generated"] == 5
+    assert list(tmp_path.iterdir()) == []  # checkpoint removed after a clean run
+
+
+@pytest.mark.asyncio
+async def test_backfill_syncs_slack_once_without_moving_the_live_watermark(monkeypatch, tmp_path, slack_sync):
+    monkeypatch.setattr(backfill_module, "CHECKPOINT_DIR", tmp_path)
+    supabase = _supabase_with_existing([])
+
+    with patch("services.backfill.get_supabase", return_value=supabase), \
+         patch("services.backfill.generate_digest", new_callable=AsyncMock,
+               return_value={"success": True, "digest_id": "d"}) as mock_generate:
+        await backfill(date(2025, 3, 3), date(2025, 3, 24), workers=3)
+
+    slack_sync.assert_awaited_once()
+    assert slack_sync.call_args.kwargs["record"] is False
+    assert slack_sync.call_args.kwargs["since"] == datetime(2025, 2, 24, tzinfo=timezone.utc)
+    assert mock_generate.await_count == 4
+    assert all(c.kwargs["sync_slack"] is False and c.kwargs["archived_only"] is True
+               for c in mock_generate.call_args_list)
+
+
+@pytest.mark.asyncio
+async def test_backfill_resumes_from_checkpoint(monkeypatch, tmp_path):
+    monkeypatch.setattr(backfill_module, "CHECKPOINT_DIR", tmp_path)
+    failing = {date(2025, 3, 17)}
+
+    async def flaky_generate(week, audience=None, sync_slack=True, archived_only=False):
+        if week in failing:
+            return {"success": False, "error": "Anthropic API error: overloaded"}
+        return {"success": True, "digest_id": f"d-{week}"}
+
+    supabase = _supabase_with_existing([])
+    with patch("services.backfill.get_supabase", return_value=supabase), \
+         patch("services.backfill.generate_digest", side_effect=flaky_generate) as mock_generate:
+        first = await backfill(date(2025, 3, 3), date(2025, 3, 17), regenerate=True)
+        checkpoint = next(tmp_path.iterdir())
+        assert load_checkpoint(checkpoint) == {date(2025, 3, 3), date(2025, 3, 10)}
+
+        failing.clear()
+        mock_generate.reset_mock()
+        second = await backfill(date(2025, 3, 3), date(2025, 3, 17), regenerate=True)
+
+    assert first["success"] is False and first["failed"][0]["week_start"] == "2025-03-17"
+    assert [c.args[0] for c in mock_generate.call_args_list] == [date(2025, 3, 17)]
+    assert second["success"] is True and second["skipped"] == 2
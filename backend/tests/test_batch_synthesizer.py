@@ -0,0 +1,187 @@
+import json
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import anthropic
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from services import batch_synthesizer
+from services.model_router import estimate_cost
+
+
+def fake_batch_server(reply) -> tuple[FastAPI, dict]:
+    """
+    Local stand-in for the Message Batches API. The first poll reports
+    the batch in progress, the next one ended. reply(custom_id, params)
+    returns the digest text, or None to mark that request errored.
+    """
+    app = FastAPI()
+    state = {"requests": [], "polls": 0}
+
+    def batch_object(status: str) -> dict:
+        n = len(state["requests"])
+        return {
+            "id": "msgbatch_test", "type": "message_batch", "processing_status": status,
+            "request_counts": {"processing": n if status != "ended" else 0, "succeeded": 0,
+                               "errored": 0, "canceled": 0, "expired": 0},
+            "created_at": "2025-03-10T00:00:00Z", "expires_at": "2025-03-11T00:00:00Z",
+            "ended_at": None, "cancel_initiated_at": None,
+            "results_url": "http://testserver/v1/messages/batches/msgbatch_test/results" if status == "ended" else None,
+        }
+
+    @app.post("/v1/messages/batches")
+    async def create(body: dict):
+        state["requests"] = body["requests"]
+        return batch_object("in_progress")
+
+    @app.get("/v1/messages/batches/{batch_id}")
+    async def retrieve(batch_id: str):
+        state["polls"] += 1
+        return batch_object("ended" if state["polls"] > 1 else "in_progress")
+
+    @app.get("/v1/messages/batches/{batch_id}/results")
+    async def results(batch_id: str):
+        lines = []
+        for request in state["requests"]:
+            text = reply(request["custom_id"], request["params"])
+            if text is None:
+                result = {"type": "errored", "error": {"type": "error", "error": {
+                    "type": "invalid_request_error", "message": "prompt is too long"}}}
+            else:
+                result = {"type": "succeeded", "message": {
+                    "id": "msg_1", "type": "message", "role": "assistant", "model": request["params"]["model"],
+                    "content": [{"type": "text", "text": text}], "stop_reason": "end_turn",
+                    "stop_sequence": None, "usage": {"input_tokens": 20000, "output_tokens": 2000},
+                }}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "result": result}))
+        return Response("\n".join(lines), media_type="application/binary")
+
+    return app, state
+
+
+def _supabase() -> tuple[MagicMock, dict]:
+    """A Supabase mock with one MagicMock per table."""
+    tables = {}
+    supabase = MagicMock()
+    supabase.table.side_effect = lambda name: tables.setdefault(name, MagicMock())
+    tables["settings"] = MagicMock()
+    tables["settings"].select.return_value.limit.return_value.execute.return_value.data = []
+    tables["digests"] = MagicMock()
+    tables["digest_batches"] = MagicMock()
+    claim = tables["digest_batches"].update.return_value.eq.return_value.eq.return_value
+    claim.execute.return_value.data = [{"batch_id": "msgbatch_test"}]
+    return supabase, tables
+
+
+@pytest.mark.asyncio
+async def test_batch_mode_submits_polls_and_stores_in_bulk(monkeypatch):
+    audiences = [None, {"id": "aud-1", "name": "Kim Lee", "pursuit_context": "VP Programs"}]
+    weeks = [date(2025, 3, 3), date(2025, 3, 10)]
+    mock_news = {"success": True, "source_count": 4, "data": {"developments": []}}
+
+    def reply(custom_id, params):
+        if custom_id == "2025-03-10_aud-1":
+            return None
+        return json.dumps({"week_summary": f"Summary {custom_id}", "slack_highlights": []})
+
+    app, state = fake_batch_server(reply)
+    monkeypatch.setattr(batch_synthesizer, "client", anthropic.Anthropic(
+        api_key="test-key", base_url="http://testserver", max_retries=0, http_client=TestClient(app),
+    ))
+    mock_supabase, tables = _supabase()
+    tables["digests"].insert.return_value.execute.return_value.data = [{"id": f"digest-{i}"} for i in range(3)]
+
+    with patch("services.digest_synthesizer.fetch_ai_news", new_callable=AsyncMock, return_value=mock_news) as mock_fetch, \
+         patch("services.batch_synthesizer.get_supabase", return_value=mock_supabase):
+        result = await batch_synthesizer.generate_digests_batch(weeks, audiences, poll_interval=0)
+
+    assert mock_fetch.await_count == 2
+    assert state["polls"] == 3  # in_progress, ended, then results() looks up the results_url
+    assert [r["custom_id"] for r in state["requests"]] == [
+        "2025-03-03_primary", "2025-03-03_aud-1", "2025-03-10_primary", "2025-03-10_aud-1",
+    ]
+    assert state["requests"][1]["params"]["messages"][0]["content"].startswith("THIS EDITION IS FOR Kim Lee")
+
+    # One bulk insert for the three successes; the errored request is reported, not stored
+    tables["digests"].insert.assert_called_once()
+    inserted = tables["digests"].insert.call_args.args[0]
+    assert [r["week_summary"] for r in inserted] == [
+        "Summary 2025-03-03_primary", "Summary 2025-03-03_aud-1", "Summary 2025-03-10_primary",
+    ]
+    assert result["success"] is False
+    assert [d.get("digest_id") for d in result["digests"]] == ["digest-0", "digest-1", "digest-2", None]
+    assert result["digests"][3]["error"] == "Batch request errored"
+    manifest = tables["digest_batches"].insert.call_args.args[0]
+    assert manifest["batch_id"] == "msgbatch_test" and manifest["status"] == "pending"
+    assert "prompt" not in manifest["manifest"]["2025-03-03_aud-1"]
+    assert [c.args[0] for c in tables["digest_batches"].update.call_args_list] == [
+        {"status": "collecting"}, {"status": "collected", "collected_at": "now()"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batches_left_pending_by_a_restart_are_collected(monkeypatch):
+    app, state = fake_batch_server(lambda custom_id, params: json.dumps({"week_summary": "Resumed"}))
+    monkeypatch.setattr(batch_synthesizer, "client", anthropic.Anthropic(
+        api_key="test-key", base_url="http://testserver", max_retries=0, http_client=TestClient(app),
+    ))
+    monkeypatch.setenv("BATCH_POLL_INTERVAL", "0")
+    # What the previous process submitted before the dyno restarted
+    state["requests"] = [{"custom_id": "2025-03-03_primary", "params": {"model": "claude-sonnet-4-6"}}]
+    job = {"week_start": "2025-03-03", "audience": "primary", "audience_id": None, "source_count": 4, "slack_count": 0}
+
+    mock_supabase, tables = _supabase()
+    tables["digest_batches"].select.return_value.eq.return_value.execute.return_value.data = [
+        {"batch_id": "msgbatch_test", "manifest": {"2025-03-03_primary": job}},
+    ]
+    tables["digests"].insert.return_value.execute.return_value.data = [{"id": "digest-0"}]
+
+    results = await batch_synthesizer.resume_pending_batches(mock_supabase)
+
+    assert results[0]["digests"] == [{"audience": "primary", "week_start": "2025-03-03", "success": True,
+                                      "week_number": results[0]["digests"][0]["week_number"],
+                                      "source_count": 4, "digest_id": "digest-0"}]
+    assert tables["digests"].insert.call_args.args[0][0]["week_summary"] == "Resumed"
+    tables["digest_batches"].update.return_value.eq.return_value.eq.assert_called_once_with("status", "pending")
+    assert tables["digest_batches"].update.call_args.args[0]["status"] == "collected"
+
+
+@pytest.mark.asyncio
+async def test_a_batch_claimed_by_another_process_is_not_stored_twice(monkeypatch):
+    monkeypatch.setenv("BATCH_POLL_INTERVAL", "0")
+    monkeypatch.setattr(batch_synthesizer, "client", MagicMock())
+    batch_synthesizer.client.beta.messages.batches.retrieve.return_value.processing_status = "ended"
+    job = {"week_start": "2025-03-03", "audience": "primary", "audience_id": None, "source_count": 4, "slack_count": 0}
+    mock_supabase, tables = _supabase()
+    tables["digest_batches"].select.return_value.eq.return_value.execute.return_value.data = [
+        {"batch_id": "msgbatch_test", "manifest": {"2025-03-03_primary": job}},
+    ]
+    # The other dyno's conditional update won the row
+    tables["digest_batches"].update.return_value.eq.return_value.eq.return_value.execute.return_value.data = []
+
+    results = await batch_synthesizer.resume_pending_batches(mock_supabase)
+
+    assert results[0]["error"] == "Batch already claimed"
+    batch_synthesizer.client.beta.messages.batches.results.assert_not_called()
+    tables["digests"].insert.assert_not_called()
+
+
+def test_unsaved_manifest_cancels_the_batch_and_raises(monkeypatch):
+    monkeypatch.setattr(batch_synthesizer, "client", MagicMock())
+    batch_synthesizer.client.beta.messages.batches.create.return_value.id = "msgbatch_test"
+    mock_supabase, tables = _supabase()
+    tables["digest_batches"].insert.return_value.execute.side_effect = Exception("relation does not exist")
+
+    with pytest.raises(Exception, match="relation does not exist"):
+        batch_synthesizer.submit_batch({"2025-03-03_primary": {"week_start": "2025-03-03", "prompt": "p"}},
+                                       mock_supabase)
+
+    batch_synthesizer.client.beta.messages.batches.cancel.assert_called_once_with("msgbatch_test")
+
+
+def test_batch_pricing_halves_token_cost():
+    full = estimate_cost("claude-sonnet-4-6", 20000, 2000)
+    assert estimate_cost("claude-sonnet-4-6", 20000, 2000, batch=True) == pytest.approx(full / 2)
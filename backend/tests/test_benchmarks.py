@@ -0,0 +1,120 @@
+"""
+Offline pipeline benchmarks — every external call is served by replay
+transports with simulated latency, so numbers are reproducible.
+
+    pytest tests/test_benchmarks.py --benchmark-autosave
+    pytest tests/test_benchmarks.py --benchmark-compare --benchmark-compare-fail=mean:20%
+
+Skip them in a quick run with --benchmark-skip.
+"""
+import asyncio
+import json
+from datetime import date
+
+import pytest
+
+from replay import FIXTURES_DIR, install_replay
+from services.digest_search import index_digests, search_local
+from services.digest_synthesizer import compress_news, generate_digest
+from services.email_sender import build_email_html, send_digest_email
+from services.entity_resolver import get_resolver
+from services.news_fetcher import fetch_from_scraped
+
+SIZES = [100, 1_000, 10_000]
+
+
+def _scraped_articles(n: int) -> dict:
+    return {
+        "scraped_at": "2025-03-03T00:00:00",
+        "total_articles": n,
+        "articles": [
+            {
+                "title": f"AI workforce story {i}",
+                "url": f"https://news.example.com/2025/03/story-{i}",
+                "summary": "Employers across health, finance and government are piloting AI agents. " * 6,
+                "published_date": "2025-03-01T09:00:00.000-05:00",
+                "source": f"Source {i % 25}",
+                "tier": "TIER1_NEWSLETTER",
+                "scraped_at": "2025-03-03T00:00:00",
+                "tags": ["ai-companies", "workforce"],
+            }
+            for i in range(n)
+        ],
+    }
+
+
+@pytest.fixture
+def scraped_file(tmp_path, request):
+    path = tmp_path / "scraped_articles.json"
+    path.write_text(json.dumps(_scraped_articles(request.param)))
+    return path
+
+
+@pytest.fixture
+def replay(monkeypatch):
+    return install_replay(monkeypatch)
+
+
+@pytest.mark.parametrize("scraped_file", SIZES, indirect=True)
+def test_bench_fetch_from_scraped(benchmark, replay, scraped_file):
+    result = benchmark.pedantic(
+        lambda: asyncio.run(fetch_from_scraped(scraped_file)), rounds=3, iterations=1
+    )
+    assert result["success"] is True
+    assert len(result["data"]["companies_to_watch"]) == 2
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_bench_compress_news(benchmark, n):
+    item = {"headline": "H", "what_happened": "x" * 400, "why_it_matters": "y" * 300,
+            "name": "Acme", "insight": "z" * 400, "source": "S", "url": "https://e.com"}
+    news = {"developments": [item] * n, "companies_to_watch": [item] * n,
+            "jobs_and_hiring": [item] * n, "featured_resource": {"title": "T", "why_read": "w" * 300}}
+
+    compressed = benchmark(compress_news, news)
+    assert len(compressed["developments"]) == 5
+
+
+@pytest.mark.parametrize("scraped_file", SIZES, indirect=True)
+def test_bench_generate_digest(benchmark, replay, scraped_file, monkeypatch):
+    monkeypatch.setattr("services.news_fetcher.SCRAPED_DATA_PATH", scraped_file)
+
+    result = benchmark.pedantic(
+        lambda: asyncio.run(generate_digest(date(2025, 3, 3))), rounds=3, iterations=1
+    )
+    assert result["success"] is True
+    assert result["digest_id"] == "replay-digest-1"
+
+
+def test_bench_search_local(benchmark, tmp_path):
+    path = tmp_path / "search.db"
+    digests = [{"id": f"digest-{i}", "week_number": i % 52 + 1, "week_start": "2025-03-03",
+                "week_summary": "Agents moved into payroll and HR this week."} for i in range(520)]
+    index_digests(digests + [{"id": "digest-520", "week_start": "2025-03-03", "week_summary": "Cursor raised again"}], path)
+
+    results = benchmark(search_local, "curs", path=path)
+    assert [r["id"] for r in results] == ["digest-520"]
+
+
+def test_bench_resolve_company_names(benchmark):
+    resolver = get_resolver()
+    names = [f"Startup {i} Labs" if i % 2 else "Google Cloud" for i in range(20_000)]
+
+    keys = benchmark(lambda: [resolver.key(n) for n in names])
+    assert keys[:3] == ["google", "startup 1", "google"] and len(set(keys)) == 10_001
+
+
+def test_bench_build_email_html(benchmark):
+    stored = json.loads((FIXTURES_DIR / "supabase.json").read_text())
+    digest = next(r for r in stored if r["method"] == "GET" and r["path"] == "/rest/v1/digests")["body"][0]
+
+    html = benchmark(build_email_html, digest)
+    assert "Anthropic ships Claude agent SDK" in html
+
+
+def test_replay_send_digest_email(replay):
+    result = asyncio.run(send_digest_email())
+
+    assert result["success"] is True
+    assert result["email_id"] == "replay-email-1"
+    assert [r.url.path for r in replay["supabase"].requests] == ["/rest/v1/digests", "/rest/v1/email_log"]
@@ -0,0 +1,170 @@
+import json
+import re
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from conftest import write_scraped
+from services.daily_shortlist import (
+    day_articles, load_shortlists, prefetch_companies, preselect_day, roll_up, run_daily, window_days,
+)
+from services.news_fetcher import fetch_ai_news
+from services.story_memory import StoryMemory, normalize_url
+
+WEEK = date(2025, 3, 10)  # covers 2025-03-03 .. 2025-03-09
+WEB_COMPANIES = [{"name": "Ramp"}, {"name": "Abridge"}]
+
+
+def _week_of_articles(path):
+    """A launch, a funding round and a hiring story on every day the digest covers."""
+    articles = []
+    for day in window_days(WEEK):
+        articles += [(f"Launch {day}", f"{day}T09:00:00Z"), (f"Funding {day}", f"{day}T12:00:00Z"),
+                     (f"Hiring {day}", f"{day}T15:00:00Z")]
+    write_scraped(path, articles)
+
+
+async def fake_preselect(client, stage, **kwargs):
+    """Scores each article in the prompt; titles decide the kind, the last pick points nowhere."""
+    assert stage == "news_preselect"
+    prompt = kwargs["messages"][0]["content"]
+    titles = re.findall(r'"title": "([^"]+)"', prompt)
+    picks = [
+        {"article": i, "kind": "jobs" if t.startswith("Hiring") else "development",
+         "score": 9 if t.startswith("Launch") else 5, "headline": f"Headline: {t}", "what_happened": t,
+         "insight": f"Insight: {t}"}
+        for i, t in enumerate(titles)
+    ]
+    picks.append({"article": 99, "kind": "development", "score": 10})
+    return MagicMock(content=[MagicMock(text=json.dumps({"candidates": picks}))])
+
+
+def test_day_articles_by_publication_day_then_scrape_day():
+    articles = [
+        {"title": "Late Sunday", "published_date": "2025-03-09T23:30:00-05:00"},  # Monday in UTC
+        {"title": "Sunday", "published_date": "2025-03-09T10:00:00Z"},
+        {"title": "Undated", "published_date": "", "scraped_at": "2025-03-09T05:30:00"},
+    ]
+
+    assert [a["title"] for a in day_articles(articles, date(2025, 3, 9))] == ["Sunday", "Undated"]
+
+
+@pytest.mark.asyncio
+async def test_preselect_day_keeps_its_shortlist_until_the_day_changes(tmp_path):
+    scraped = tmp_path / "scraped.json"
+    _week_of_articles(scraped)
+    day = date(2025, 3, 4)
+
+    with patch("services.daily_shortlist.create_message", side_effect=fake_preselect) as mock_create:
+        first = await preselect_day(day, scraped)
+        second = await preselect_day(day, scraped)
+        assert mock_create.call_count == 1
+
+        write_scraped(scraped, [(f"Launch {day}", f"{day}T09:00:00Z"), ("Another launch", f"{day}T18:00:00Z")])
+        await preselect_day(day, scraped)
+        assert mock_create.call_count == 2
+
+    candidates = load_shortlists([day])[day]
+    assert first == {"success": True, "day": "2025-03-04", "articles": 3, "candidates": 3}
+    assert second["cached"] is True
+    assert [c["url"] for c in candidates] == ["https://example.com/Launch-2025-03-04",
+                                              "https://example.com/Another-launch"]
+    assert candidates[0]["headline"] == "Headline: Launch 2025-03-04"
+
+
+@pytest.mark.asyncio
+async def test_roll_up_merges_the_week_and_catches_up_missed_days(tmp_path, monkeypatch):
+    scraped = tmp_path / "scraped.json"
+    _week_of_articles(scraped)
+    monkeypatch.setattr("services.news_fetcher.SCRAPED_DATA_PATH", scraped)
+    covered = StoryMemory(urls={normalize_url("https://example.com/Launch-2025-03-05")})
+
+    with patch("services.daily_shortlist.create_message", side_effect=fake_preselect) as mock_create, \
+         patch("services.daily_shortlist.fetch_companies_from_web", return_value=WEB_COMPANIES):
+        for day in window_days(WEEK)[:5]:
+            await preselect_day(day)
+        await prefetch_companies(WEEK)
+        assert mock_create.call_count == 5
+
+        result = await roll_up(WEEK, covered)
+
+    assert mock_create.call_count == 7  # Saturday and Sunday pre-selected during the roll-up
+    assert result["success"] is True and result["source"] == "daily_shortlists"
+    news = result["data"]
+    assert len(news["developments"]) == 5
+    assert all(d["headline"].startswith("Headline: Launch") for d in news["developments"])
+    assert "https://example.com/Launch-2025-03-05" not in [d["url"] for d in news["developments"]]
+    assert len(news["jobs_and_hiring"]) == 3
+    assert news["featured_resource"] == {}
+    assert [c["name"] for c in news["companies_to_watch"]] == ["Ramp", "Abridge"]
+
+
+@pytest.mark.asyncio
+async def test_a_failed_catch_up_day_falls_back_to_the_weekly_selection(tmp_path, monkeypatch):
+    import anthropic
+    import httpx
+
+    scraped = tmp_path / "scraped.json"
+    _week_of_articles(scraped)
+    monkeypatch.setattr("services.news_fetcher.SCRAPED_DATA_PATH", scraped)
+    overloaded = anthropic.InternalServerError(
+        "overloaded", response=httpx.Response(529, request=httpx.Request("POST", "https://api.anthropic.com")),
+        body=None)
+
+    async def flaky_preselect(client, stage, **kwargs):
+        if "2025-03-08" in kwargs["messages"][0]["content"]:
+            raise overloaded
+        return await fake_preselect(client, stage, **kwargs)
+
+    with patch("services.daily_shortlist.create_message", side_effect=fake_preselect):
+        for day in window_days(WEEK)[:5]:
+            await preselect_day(day)
+    with patch("services.daily_shortlist.create_message", side_effect=flaky_preselect), \
+         patch("services.news_fetcher.create_message", return_value=MagicMock(content=[MagicMock(
+             type="text", text='{"developments": [], "jobs_and_hiring": []}')])) as weekly_create, \
+         patch("services.news_fetcher.fetch_companies_from_web", return_value=WEB_COMPANIES):
+        result = await fetch_ai_news(WEEK)
+
+    assert load_shortlists(window_days(WEEK)).keys() == set(window_days(WEEK)) - {date(2025, 3, 8)}
+    assert result["success"] is True and result["source"] == "scraper+web"
+    assert weekly_create.call_args.kwargs["stage"] == "news_selection"
+
+
+@pytest.mark.asyncio
+async def test_monday_only_merges_and_synthesizes(tmp_path, monkeypatch):
+    scraped = tmp_path / "scraped.json"
+    _week_of_articles(scraped)
+    monkeypatch.setattr("services.news_fetcher.SCRAPED_DATA_PATH", scraped)
+
+    with patch("services.daily_shortlist.create_message", side_effect=fake_preselect), \
+         patch("services.daily_shortlist.fetch_companies_from_web", return_value=WEB_COMPANIES):
+        for day in window_days(WEEK)[:-1]:
+            await run_daily(date.fromordinal(day.toordinal() + 1))
+        sunday = await run_daily(WEEK)  # Monday morning shortlists Sunday; Sunday's run searched companies
+
+    with patch("services.daily_shortlist.create_message") as daily_create, \
+         patch("services.news_fetcher.create_message") as weekly_create, \
+         patch("services.daily_shortlist.fetch_companies_from_web") as companies_search:
+        result = await fetch_ai_news(WEEK)
+
+    assert sunday["success"] is True
+    assert result["source"] == "daily_shortlists"
+    daily_create.assert_not_called()
+    weekly_create.assert_not_called()
+    companies_search.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_weeks_without_shortlists_keep_the_weekly_selection(tmp_path, monkeypatch):
+    scraped = tmp_path / "scraped.json"
+    write_scraped(scraped, [("Only story", "2025-03-04T09:00:00Z")])
+    monkeypatch.setattr("services.news_fetcher.SCRAPED_DATA_PATH", scraped)
+
+    assert await roll_up(WEEK, StoryMemory()) is None
+
+    with patch("services.daily_shortlist.create_message", side_effect=fake_preselect):
+        await preselect_day(date(2025, 3, 4))
+        thin = await roll_up(WEEK, StoryMemory())
+
+    assert thin["fallback"] is True and "Only 1 developments" in thin["error"]
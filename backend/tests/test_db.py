@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from main import app
+from services import db
+
+QUERY_SECONDS = 0.2
+
+
+class SlowQuery:
+    """A supabase query builder whose execute() blocks like a Postgres round-trip."""
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        with self.tracker["lock"]:
+            self.tracker["in_flight"] += 1
+            self.tracker["peak"] = max(self.tracker["peak"], self.tracker["in_flight"])
+        time.sleep(QUERY_SECONDS)
+        with self.tracker["lock"]:
+            self.tracker["in_flight"] -= 1
+        return MagicMock(data=[{"id": "d1", "week_number": 1}])
+
+
+@pytest.fixture
+def slow_supabase():
+    tracker = {"lock": threading.Lock(), "in_flight": 0, "peak": 0}
+    supabase = MagicMock()
+    supabase.table.side_effect = lambda name: SlowQuery(tracker)
+    db.shutdown()
+    yield supabase, tracker
+    db.shutdown()
+
+
+async def _latest(n: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[client.get("/digest/latest") for _ in range(n)])
+        elapsed = time.perf_counter() - start
+    assert all(r.json()["digest"]["is_read"] is True for r in responses)
+    return elapsed
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_overlap_their_queries(slow_supabase):
+    supabase, tracker = slow_supabase
+
+    with patch("routers.digest.get_supabase", return_value=supabase):
+        elapsed = await _latest(8)
+
+    # Two queries per request: serialised on the event loop this would take 16 round-trips
+    assert elapsed < 8 * QUERY_SECONDS
+    assert tracker["peak"] > 1
+
+
+@pytest.mark.asyncio
+async def test_pool_size_caps_queries_in_flight(slow_supabase, monkeypatch):
+    supabase, tracker = slow_supabase
+    monkeypatch.setenv("SUPABASE_MAX_CONCURRENCY", "2")
+
+    with patch("routers.digest.get_supabase", return_value=supabase):
+        await _latest(6)
+
+    assert tracker["peak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_event_loop_keeps_running_while_a_query_blocks(slow_supabase):
+    supabase, _ = slow_supabase
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    await db.execute(supabase.table("digests").select("*"))
+    task.cancel()
+
+    assert ticks >= QUERY_SECONDS / 0.01 / 2
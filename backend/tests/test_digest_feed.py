@@ -0,0 +1,121 @@
+import json
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from conftest import archive
+from main import app
+from services.digest_feed import feed_headers, rebuild_from_digests, record_digests
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def _digest(week: str, digest_id: str, generated_at: str, audience_id: str | None = None) -> dict:
+    return {
+        "id": digest_id,
+        "audience_id": audience_id,
+        "week_number": 1,
+        "week_start": week,
+        "week_end": week,
+        "week_summary": f"Summary for {week} & friends.",
+        "ai_developments": [{"headline": "Claude ships <agents>", "url": "https://anthropic.com/news",
+                             "why_it_matters": "Pursuit teaches agents."}],
+        "generated_at": generated_at,
+    }
+
+
+def test_feeds_are_rendered_when_digests_are_stored():
+    rebuild_from_digests(archive([]))
+    record_digests([_digest("2025-03-03", "d1", "2025-03-10T12:00:00+00:00")])
+    before = feed_headers("xml")
+    record_digests([_digest("2025-03-10", "d2", "2025-03-17T12:00:00+00:00")])
+    after = feed_headers("xml")
+
+    assert before["ETag"] != after["ETag"]
+    assert after["Last-Modified"] == "Mon, 17 Mar 2025 12:00:00 GMT"
+
+    response = TestClient(app).get("/digest/feed.xml")
+    feed = ET.fromstring(response.content)
+    entries = feed.findall(f"{ATOM}entry")
+    assert response.headers["content-type"].startswith("application/atom+xml")
+    assert [e.find(f"{ATOM}title").text.split(" · ")[2] for e in entries] == ["2025-03-10 to 2025-03-10",
+                                                                             "2025-03-03 to 2025-03-03"]
+    assert "Claude ships &lt;agents&gt;</a>" in entries[0].find(f"{ATOM}content").text
+
+
+def test_regenerated_week_replaces_its_entry():
+    rebuild_from_digests(archive([]))
+    record_digests([_digest("2025-03-03", "old", "2025-03-10T12:00:00+00:00")])
+    record_digests([_digest("2025-03-03", "new", "2025-03-11T12:00:00+00:00")])
+    record_digests([_digest("2025-03-03", "old", "2025-03-10T12:00:00+00:00")])  # a late backfill can't undo it
+
+    items = TestClient(app).get("/digest/feed.json").json()["items"]
+
+    assert [item["id"] for item in items] == ["new"]
+    assert items[0]["content_html"].startswith("<p>Summary for 2025-03-03 &amp; friends.</p>")
+
+
+def test_null_fields_render_as_empty_text():
+    rebuild_from_digests(archive([]))
+    digest = {**_digest("2025-03-03", "d1", "2025-03-10T12:00:00+00:00"),
+              "ai_developments": [{"headline": None, "url": None, "why_it_matters": None}]}
+    record_digests([digest])
+
+    items = TestClient(app).get("/digest/feed.json").json()["items"]
+
+    assert "<li><strong></strong> </li>" in items[0]["content_html"]
+
+
+def test_conditional_gets_cost_a_304():
+    rebuild_from_digests(archive([]))
+    record_digests([_digest("2025-03-03", "d1", "2025-03-10T12:00:00+00:00")])
+    client = TestClient(app)
+
+    with patch("routers.digest.get_supabase") as mock_supabase:
+        first = client.get("/digest/feed.json")
+        by_etag = client.get("/digest/feed.json", headers={"If-None-Match": first.headers["etag"]})
+        by_date = client.get("/digest/feed.json", headers={"If-Modified-Since": first.headers["last-modified"]})
+        stale = client.get("/digest/feed.json", headers={"If-None-Match": '"other"',
+                                                         "If-Modified-Since": first.headers["last-modified"]})
+
+    assert first.status_code == 200 and json.loads(first.content)["items"][0]["id"] == "d1"
+    assert by_etag.status_code == 304 and by_etag.content == b""
+    assert by_etag.headers["etag"] == first.headers["etag"]
+    assert by_date.status_code == 304
+    assert stale.status_code == 200  # If-None-Match wins over If-Modified-Since
+    mock_supabase.assert_not_called()
+
+
+def test_first_request_seeds_the_feed_from_supabase():
+    supabase = archive([
+        _digest("2025-03-03", "d1", "2025-03-10T12:00:00+00:00"),
+        _digest("2025-03-03", "a1", "2025-03-10T13:00:00+00:00", audience_id="aud-1"),
+    ])
+    client = TestClient(app)
+
+    with patch("routers.digest.get_supabase", return_value=supabase):
+        primary = client.get("/digest/feed.json")
+        audience = client.get("/digest/feed.json", params={"audience_id": "aud-1"})
+        unknown = client.get("/digest/feed.xml", params={"audience_id": "nobody"})
+
+    assert [item["id"] for item in primary.json()["items"]] == ["d1"]
+    assert [item["id"] for item in audience.json()["items"]] == ["a1"]
+    assert unknown.status_code == 404
+    assert supabase.table.call_count == 1
+
+
+def test_digest_stored_after_a_restart_still_seeds_the_archive():
+    older = _digest("2025-03-03", "d1", "2025-03-10T12:00:00+00:00")
+    newer = _digest("2025-03-10", "d2", "2025-03-17T12:00:00+00:00")
+    record_digests([newer])  # the week's digest lands on the fresh disk before anyone polls
+    supabase = archive([older, newer])
+    client = TestClient(app)
+
+    with patch("routers.digest.get_supabase", return_value=supabase):
+        first = client.get("/digest/feed.json")
+        second = client.get("/digest/feed.json")
+
+    assert [item["id"] for item in first.json()["items"]] == ["d2", "d1"]
+    assert second.json() == first.json()
+    assert supabase.table.call_count == 1
@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.digest_search import _connect, fts_query, index_digests, search_digests, search_local
+
+
+def _digest(i: int, summary: str = "Agents moved into payroll and HR this week.", **extra) -> dict:
+    return {
+        "id": f"digest-{i}",
+        "week_number": i + 1,
+        "week_start": str(date(2025, 3, 3) + timedelta(weeks=i)),
+        "week_summary": summary,
+        "ai_developments": [{"headline": f"Launch number {i} ships"}],
+        "companies_to_watch": [{"name": "Ramp"}],
+        "pursuit_implications": [{"implication": "Teach builders to review agent output."}],
+        **extra,
+    }
+
+
+def test_fts_query_is_safe_and_prefixes_last_word():
+    assert fts_query('Cursor "AND" agen') == '"cursor" "and" "agen"*'
+    assert fts_query("  ?? ") == ""
+
+
+def test_summary_matches_outrank_implication_matches(tmp_path):
+    path = tmp_path / "search.db"
+    index_digests([
+        _digest(0, pursuit_implications=[{"implication": "Cursor is worth piloting with builders."}]),
+        _digest(1, summary="Cursor shipped background agents and everyone noticed."),
+    ] + [_digest(i) for i in range(2, 10)], path)
+
+    results = search_local("cursor", path=path)
+
+    assert [r["id"] for r in results] == ["digest-1", "digest-0"]
+    assert "<mark>Cursor</mark>" in results[0]["snippet"]
+    assert results[0]["rank"] > results[1]["rank"]
+
+
+def test_snippets_escape_the_digest_text(tmp_path):
+    path = tmp_path / "search.db"
+    index_digests([_digest(0, summary='Cursor <img src=x onerror="alert(1)"> & <mark>fake</mark>')], path)
+
+    snippet = search_local("cursor", path=path)[0]["snippet"]
+
+    assert snippet.startswith("<mark>Cursor</mark> &lt;img src=x onerror=&quot;alert(1)&quot;&gt; &amp;")
+    assert "&lt;mark&gt;fake&lt;/mark&gt;" in snippet and "<img" not in snippet
+
+    supabase = MagicMock()
+    supabase.rpc.return_value.execute.return_value.data = [{"id": "d", "snippet": "\x02Cursor\x03 <script>x</script>"}]
+    with patch.dict("os.environ", {"DIGEST_SEARCH_BACKEND": "postgres"}):
+        [result] = search_digests(supabase, "cursor")
+    assert result["snippet"] == "<mark>Cursor</mark> &lt;script&gt;x&lt;/script&gt;"
+
+
+def test_reindexing_replaces_and_audiences_are_separate(tmp_path):
+    path = tmp_path / "search.db"
+    index_digests([_digest(0, summary="Old text about Cursor")], path)
+    index_digests([_digest(0, summary="New text about Windsurf")], path)
+    index_digests([_digest(1, summary="Windsurf for Kim", audience_id="aud-1")], path)
+
+    assert search_local("cursor", path=path) == []
+    assert [r["id"] for r in search_local("windsurf", path=path)] == ["digest-0"]
+    assert [r["id"] for r in search_local("windsurf", audience_id="aud-1", path=path)] == ["digest-1"]
+
+
+def test_search_over_years_of_history_uses_the_fts_index(tmp_path):
+    path = tmp_path / "search.db"
+    index_digests([_digest(i) for i in range(520)] + [_digest(520, summary="Cursor raised again")], path)
+
+    results = search_local("curs", path=path)
+    with _connect(path) as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT digest_id FROM digest_fts WHERE digest_fts MATCH ? AND audience_id = ?",
+            (fts_query("curs"), ""),
+        ).fetchall()
+
+    assert [r["id"] for r in results] == ["digest-520"]
+    assert len(search_local("payroll", path=path)) == 20  # capped at the default limit
+    assert "VIRTUAL TABLE INDEX" in plan[0][-1]  # a MATCH lookup, not a scan of every row
+
+
+def test_search_route_is_not_shadowed_by_digest_id(monkeypatch, tmp_path):
+    from services import digest_search
+
+    monkeypatch.setenv("DIGEST_SEARCH_BACKEND", "sqlite")
+    index_digests([_digest(0, summary="Cursor everywhere")], digest_search.DIGEST_SEARCH_PATH)
+    client = TestClient(app)
+
+    with patch("routers.digest.get_supabase"):
+        response = client.get("/digest/search", params={"q": "cursor"})
+        too_short = client.get("/digest/search", params={"q": "c"})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["id"] == "digest-0"
+    assert too_short.status_code == 400
@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from services.email_sender import build_email_html, send_digest_email
+from services.email_sender import build_email_html, render_email, send_digest_email
 
 
 def test_build_email_html_renders():
@@ -57,8 +57,66 @@ async def test_send_digest_email_no_digests():
     mock_result.data = []
 
     with patch("services.email_sender.supabase") as mock_supabase:
-        mock_supabase.table.return_value.select.return_value.order.return_value.limit.return_value.execute.return_value = mock_result
+        mock_supabase.table.return_value.select.return_value.is_.return_value.order.return_value.limit.return_value.execute.return_value = mock_result
         result = await send_digest_email()
 
     assert result["success"] is False
     assert "No digest found" in result["error"]
+
+
+def _long_digest(n_developments: int = 5) -> dict:
+    paragraph = "Agents now handle routine support tickets at scale. " * 40
+    return {
+        "week_number": 2,
+        "week_summary": "Agents everywhere.",
+        "ai_developments": [
+            {"headline": f"Story {i}", "synthesis": paragraph, "why_it_matters": paragraph,
+             "source": "TechCrunch", "url": f"https://techcrunch.com/{i}"}
+            for i in range(n_developments)
+        ],
+        "pursuit_implications": [{"implication": "Teach agents.", "reasoning": paragraph, "priority": "HIGH"}] * 5,
+        "companies_to_watch": [{"name": "Acme AI", "what_they_do": paragraph, "why_watch_now": "Raised $10M."}] * 3,
+        "featured_resource": {"title": "Read this", "url": "https://hbr.org", "why_joanna": paragraph},
+    }
+
+
+def test_render_email_minifies_without_losing_content():
+    rendered = render_email(_long_digest(), budget=10_000_000)
+
+    assert rendered["trimmed"] == []
+    assert rendered["size_bytes"] < rendered["raw_bytes"] - 1500
+    assert "\n" not in rendered["html"] and "<!--" not in rendered["html"]
+    assert 'style="font-size:11px;font-weight:600;color:#c9a84c;letter-spacing:.1em;' in rendered["html"]
+    for text in ("Story 4", "Teach agents.", "Acme AI", "Read this", "Raised $10M."):
+        assert text in rendered["html"]
+
+
+def test_render_email_drops_optional_sections_to_fit_the_budget():
+    full = render_email(_long_digest(), budget=10_000_000)
+    rendered = render_email(_long_digest(), budget=full["size_bytes"] - 1000)
+
+    assert rendered["size_bytes"] <= full["size_bytes"] - 1000
+    assert rendered["trimmed"][0] == "featured_resource"
+    assert "Read this" not in rendered["html"]
+    assert "Story 4" in rendered["html"]
+
+    tight = render_email(_long_digest(), budget=8000)
+    assert tight["size_bytes"] <= 8000
+    assert "Story 2" in tight["html"] and "Story 3" not in tight["html"]
+    assert "Agents everywhere." in tight["html"]
+
+
+@pytest.mark.asyncio
+async def test_send_digest_email_logs_the_rendered_size():
+    digest = {**_long_digest(), "id": "digest-1"}
+    mock_result = MagicMock()
+    mock_result.data = [digest]
+
+    with patch("services.email_sender.supabase") as mock_supabase, \
+         patch("services.email_sender.resend.Emails.send", return_value={"id": "email-1"}) as send:
+        mock_supabase.table.return_value.select.return_value.is_.return_value.order.return_value.limit.return_value.execute.return_value = mock_result
+        result = await send_digest_email()
+
+    logged = mock_supabase.table.return_value.insert.call_args.args[0]
+    assert result["success"] is True
+    assert logged["size_bytes"] == result["size_bytes"] == len(send.call_args.args[0]["html"].encode("utf-8"))
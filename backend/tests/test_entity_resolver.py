@@ -0,0 +1,45 @@
+from services.entity_resolver import PhraseMatcher, get_resolver
+from services.news_fetcher import _dedupe_companies, _filter_big_tech
+
+
+def test_aliases_resolve_to_their_parent():
+    resolver = get_resolver()
+    assert resolver.resolve("Google DeepMind") == ("google", "Google")
+    assert resolver.key("Alphabet Inc.") == "google"
+    assert resolver.key("AWS") == "amazon"
+    assert resolver.key("Meta Platforms, Inc.") == "meta"
+    assert resolver.resolve("Duolingo, Inc.") == ("duolingo", "Duolingo, Inc.")
+
+
+def test_only_the_company_name_itself_resolves():
+    resolver = get_resolver()
+    assert resolver.key("Meta AI") == "meta" and resolver.key("Anthropic, PBC") == "anthropic"
+    assert not resolver.is_big_tech("Metaview")
+    assert not resolver.is_big_tech("Pineapple Health")
+    # Startups named after, or built on, a Big Tech product are their own companies
+    for name in ("Claude Health", "GitHub Copilot startup Codeium", "Meta Health Labs", "Apple Seed Ventures",
+                 "the Microsoft Azure team"):
+        assert not resolver.is_big_tech(name), name
+    assert resolver.key("Meta Health Labs") == "meta health"
+
+
+def test_filter_and_dedupe_share_one_identity():
+    companies = [
+        {"name": "Google DeepMind"}, {"name": "AWS"}, {"name": "Meta Platforms"},
+        {"name": "Abridge"}, {"name": "Abridge AI"}, {"name": "Ramp"},
+    ]
+    assert [c["name"] for c in _dedupe_companies(_filter_big_tech(companies))] == ["Abridge", "Ramp"]
+
+
+def test_phrase_matcher_finds_overlapping_phrases_in_one_pass():
+    matcher = PhraseMatcher({"agents": "agents", "ai agents": "ai agents", "claude code": "coding", "claude": "model"})
+    found = sorted(matcher.find("Claude Code ships AI agents"))
+    assert [value for _, _, value in found] == ["model", "coding", "ai agents", "agents"]
+
+
+def test_long_names_that_mention_an_alias_keep_their_own_identity():
+    resolver = get_resolver()
+    names = [f"Startup {i} partners with Google Cloud" for i in range(200)]
+
+    assert len({resolver.key(n) for n in names}) == 200
+    assert not any(resolver.is_big_tech(n) for n in names)
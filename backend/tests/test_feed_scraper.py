@@ -0,0 +1,144 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+import pytest
+
+from services.clients import http_client
+from services.feed_scraper import USER_AGENT, parse_feed, scrape_feeds, write_scraped
+from services.news_fetcher import fetch_from_scraped
+
+FEEDS_DIR = Path(__file__).resolve().parent / "fixtures" / "feeds"
+
+SOURCES = [
+    {"name": "TechCrunch AI", "url": "https://techcrunch.com/feed/", "tier": "TIER2_NEWS", "tags": ["ai-companies"]},
+    {"name": "TensorFlow Blog", "url": "https://blog.tensorflow.org/feeds/posts/default",
+     "tier": "TIER1_NEWSLETTER", "tags": ["ai-companies"]},
+]
+
+# Everything in the fixtures except the 2024 story
+WINDOW_DAYS = (datetime.now(timezone.utc) - datetime(2025, 2, 1, tzinfo=timezone.utc)).days
+
+
+class FeedServer:
+    """Serves fixture feeds with ETag/Last-Modified and tracks concurrency per host."""
+
+    def __init__(self):
+        self.requests = []
+        self.in_flight = {}
+        self.max_in_flight = {}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests.append(request)
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.max_in_flight[host] = max(self.max_in_flight.get(host, 0), self.in_flight[host])
+        await asyncio.sleep(0.01)
+        self.in_flight[host] -= 1
+
+        body = (FEEDS_DIR / ("techcrunch.xml" if host == "techcrunch.com" else "tensorflow.xml")).read_bytes()
+        etag = f'"{host}-v1"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, content=body, headers={
+            "ETag": etag, "Last-Modified": "Tue, 04 Mar 2025 15:00:00 GMT",
+        })
+
+
+def test_parses_rss_and_atom():
+    rss = parse_feed((FEEDS_DIR / "techcrunch.xml").read_bytes())
+    atom = parse_feed((FEEDS_DIR / "tensorflow.xml").read_bytes())
+
+    assert rss[0]["summary"] == "The AI coding startup’s new round values it at $9B."
+    assert rss[1]["summary"].startswith("Students and workforce programs")
+    assert rss[1]["published"].isoformat() == "2025-03-02T09:30:00-05:00"
+    assert atom[0]["url"] == "https://blog.tensorflow.org/2025/03/whats-new-in-tensorflow-2-20.html"
+    assert atom[0]["summary"] == "tf.lite is being replaced by LiteRT."
+
+
+@pytest.mark.asyncio
+async def test_unchanged_feeds_cost_a_304_and_keep_their_articles(tmp_path):
+    server = FeedServer()
+    state = tmp_path / "feed_state.db"
+
+    async with http_client(USER_AGENT, transport=httpx.MockTransport(server)) as client:
+        first = await scrape_feeds(SOURCES, client, state, max_age_days=WINDOW_DAYS)
+        second = await scrape_feeds(SOURCES, client, state, max_age_days=WINDOW_DAYS)
+
+    assert first["feeds"] == {"fetched": 2, "not_modified": 0, "error": 0}
+    assert second["feeds"] == {"fetched": 0, "not_modified": 2, "error": 0}
+    assert [r.headers.get("if-none-match") for r in server.requests[2:]] == ['"techcrunch.com-v1"',
+                                                                           '"blog.tensorflow.org-v1"']
+    assert server.requests[3].headers["if-modified-since"] == "Tue, 04 Mar 2025 15:00:00 GMT"
+    assert [a["url"] for a in second["articles"]] == [a["url"] for a in first["articles"]]
+
+    # Newest first, the syndicated duplicate and the 2024 story dropped
+    assert [a["title"] for a in first["articles"]] == [
+        "Cursor raises $900M as coding agents go mainstream",
+        "What's new in TensorFlow 2.20",
+        "Community colleges add AI courses for adult learners",
+    ]
+    assert first["articles"][2]["tags"] == ["ai-companies", "education", "jobs"]
+    assert first["total_articles"] == 5
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit_and_failed_feeds(tmp_path):
+    server = FeedServer()
+    sources = [{**SOURCES[0], "url": f"https://techcrunch.com/feed/{i}"} for i in range(6)]
+    sources.append({"name": "Down", "url": "https://down.example.com/feed"})
+
+    async def handler(request):
+        if request.url.host == "down.example.com":
+            raise httpx.ConnectError("unreachable", request=request)
+        return await server(request)
+
+    async with http_client(USER_AGENT, transport=httpx.MockTransport(handler)) as client:
+        result = await scrape_feeds(sources, client, tmp_path / "state.db", max_age_days=WINDOW_DAYS)
+
+    assert server.max_in_flight["techcrunch.com"] == 2
+    assert result["feeds"] == {"fetched": 6, "not_modified": 0, "error": 1}
+    assert len(result["articles"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_one_broken_feed_keeps_its_articles_and_the_rest_land(tmp_path):
+    state = tmp_path / "state.db"
+    async with http_client(USER_AGENT, transport=httpx.MockTransport(FeedServer())) as client:
+        await scrape_feeds(SOURCES, client, state, max_age_days=WINDOW_DAYS)
+    server = FeedServer()
+
+    async def handler(request):
+        if request.url.host == "techcrunch.com":
+            raise ValueError("malformed response")
+        return await server(request)
+
+    async with http_client(USER_AGENT, transport=httpx.MockTransport(handler)) as client:
+        result = await scrape_feeds(SOURCES, client, state, max_age_days=WINDOW_DAYS)
+
+    assert result["feeds"] == {"fetched": 0, "not_modified": 1, "error": 1}
+    assert result["articles"][0]["title"] == "Cursor raises $900M as coding agents go mainstream"
+    assert datetime.fromisoformat(result["scraped_at"]).utcoffset() == timedelta(0)
+
+
+@pytest.mark.asyncio
+async def test_output_feeds_the_news_fetcher(tmp_path, monkeypatch):
+    async with http_client(USER_AGENT, transport=httpx.MockTransport(FeedServer())) as client:
+        document = await scrape_feeds(SOURCES, client, tmp_path / "state.db", max_age_days=WINDOW_DAYS)
+    path = write_scraped(document)
+    assert path == tmp_path / "feed_articles.json"  # never the committed scrape
+
+    captured = {}
+
+    async def fake_create(client, stage, **kwargs):
+        captured["prompt"] = kwargs["messages"][0]["content"]
+        raise RuntimeError("stop after the prompt is built")
+
+    monkeypatch.setattr("services.news_fetcher.create_message", fake_create)
+    with pytest.raises(RuntimeError):
+        await fetch_from_scraped()
+
+    assert json.loads(path.read_text())["articles"][0]["source"] == "TechCrunch AI"
+    assert '"published_date": "2025-03-04"' in captured["prompt"]
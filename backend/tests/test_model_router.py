@@ -0,0 +1,25 @@
+from unittest.mock import MagicMock
+from services.model_router import estimate_cost, model_for, record_stage, stage_report
+
+
+def test_only_synthesis_uses_the_large_tier(monkeypatch):
+    monkeypatch.delenv("MODEL_TIER_FAST", raising=False)
+    monkeypatch.delenv("MODEL_COMPANIES_BACKUP", raising=False)
+
+    assert model_for("synthesis") == "claude-sonnet-4-6"
+    assert model_for("companies_backup") == "claude-haiku-4-5"
+
+    monkeypatch.setenv("MODEL_COMPANIES_BACKUP", "claude-sonnet-4-6")
+    assert model_for("companies_backup") == "claude-sonnet-4-6"
+
+
+def test_record_stage_accumulates_latency_and_cost():
+    usage = MagicMock(input_tokens=2_000_000, output_tokens=100_000, server_tool_use=None)
+
+    call = record_stage("test_stage", "claude-haiku-4-5", 1.5, usage)
+    record_stage("test_stage", "claude-haiku-4-5", 0.5, usage)
+
+    assert call["cost_usd"] == estimate_cost("claude-haiku-4-5", 2_000_000, 100_000) == 2.5
+    row = next(r for r in stage_report() if r["stage"] == "test_stage")
+    assert row["calls"] == 2
+    assert row["avg_latency_s"] == 1.0
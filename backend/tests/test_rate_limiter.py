@@ -0,0 +1,153 @@
+import pytest
+import httpx
+import anthropic
+from unittest.mock import MagicMock
+from services.rate_limiter import AnthropicRateLimiter, _record_response, create_message, get_limiter, stream_message
+
+
+def test_reservations_wait_once_a_bucket_is_spent():
+    limiter = AnthropicRateLimiter(rpm=60, itpm=1000, otpm=1000)
+
+    assert limiter._try_reserve({"requests": 1, "input-tokens": 800, "output-tokens": 100}) == 0.0
+    wait = limiter._try_reserve({"requests": 1, "input-tokens": 800, "output-tokens": 100})
+
+    # ~600 input tokens short at 1000/min refill
+    assert 35 < wait < 37
+
+
+def test_headers_tighten_buckets_and_block_on_retry_after():
+    limiter = AnthropicRateLimiter(rpm=50, itpm=30000, otpm=8000)
+
+    limiter.update_from_headers({
+        "anthropic-ratelimit-input-tokens-limit": "40000",
+        "anthropic-ratelimit-input-tokens-remaining": "1200",
+        "retry-after": "20",
+    })
+
+    bucket = limiter.buckets["input-tokens"]
+    assert bucket.capacity == 40000
+    assert bucket.tokens <= 1200
+    assert limiter._try_reserve({"requests": 1, "input-tokens": 10, "output-tokens": 10}) > 19
+
+
+@pytest.mark.asyncio
+async def test_create_message_retries_after_rate_limit(monkeypatch):
+    limiter = AnthropicRateLimiter(rpm=50, itpm=30000, otpm=8000)
+    monkeypatch.setattr("services.rate_limiter.get_limiter", lambda model: limiter)
+    monkeypatch.setattr(limiter, "backoff", lambda seconds: None)
+
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    rate_limited = anthropic.RateLimitError(
+        "rate limited",
+        response=httpx.Response(429, headers={"retry-after": "0"}, request=request),
+        body=None,
+    )
+    ok = MagicMock()
+    client = MagicMock()
+    client.messages.create.side_effect = [rate_limited, ok]
+
+    response = await create_message(client, stage="synthesis", model="m", max_tokens=100, messages=[{"role": "user", "content": "hi"}])
+
+    assert response is ok
+    assert client.messages.create.call_count == 2
+    # Only the call that went through spent its reservation
+    assert abs(limiter.buckets["output-tokens"].tokens - (8000 - 100)) < 1
+
+
+@pytest.mark.asyncio
+async def test_overloaded_api_is_retried_under_the_limiter(monkeypatch):
+    limiter = AnthropicRateLimiter(rpm=50, itpm=30000, otpm=8000)
+    monkeypatch.setattr("services.rate_limiter.get_limiter", lambda model: limiter)
+    monkeypatch.setattr(limiter, "backoff", lambda seconds: None)
+
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    overloaded = anthropic.InternalServerError("overloaded", response=httpx.Response(529, request=request), body=None)
+    client = MagicMock()
+    client.messages.create.side_effect = [overloaded, overloaded, overloaded]
+
+    with pytest.raises(anthropic.InternalServerError):
+        await create_message(client, stage="synthesis", model="m", max_tokens=100,
+                             messages=[{"role": "user", "content": "hi"}])
+
+    assert client.messages.create.call_count == 3
+    assert abs(limiter.buckets["output-tokens"].tokens - 8000) < 1
+
+
+def test_limited_clients_leave_retries_to_the_limiter(monkeypatch):
+    from services import clients
+
+    monkeypatch.setattr(clients, "get_settings", lambda: MagicMock(anthropic_api_key="test-key"))
+    clients.get_anthropic.cache_clear()
+    clients.get_async_anthropic.cache_clear()
+    try:
+        assert clients.get_anthropic().max_retries == 0
+        assert clients.get_async_anthropic().max_retries == 0
+    finally:
+        clients.get_anthropic.cache_clear()
+        clients.get_async_anthropic.cache_clear()
+
+
+class _FakeStream:
+    def __init__(self, chunks, usage):
+        self.chunks = chunks
+        self.usage = usage
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def get_final_message(self):
+        return MagicMock(usage=self.usage)
+
+
+@pytest.mark.asyncio
+async def test_stream_message_retries_and_settles_with_final_usage(monkeypatch):
+    limiter = AnthropicRateLimiter(rpm=50, itpm=30000, otpm=8000)
+    monkeypatch.setattr("services.rate_limiter.get_limiter", lambda model: limiter)
+    monkeypatch.setattr(limiter, "backoff", lambda seconds: None)
+    recorded = []
+    monkeypatch.setattr("services.model_router.record_stage",
+                        lambda stage, model, latency, usage, *args: recorded.append((stage, model, usage)) or {})
+
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    rate_limited = anthropic.RateLimitError(
+        "rate limited",
+        response=httpx.Response(429, headers={"retry-after": "0"}, request=request),
+        body=None,
+    )
+    usage = MagicMock(input_tokens=10, output_tokens=20)
+    client = MagicMock()
+    client.messages.stream.side_effect = [rate_limited, _FakeStream(["Hel", "lo"], usage)]
+
+    async with stream_message(client, stage="synthesis", model="m", max_tokens=1000,
+                              messages=[{"role": "user", "content": "hi"}]) as stream:
+        text = "".join([chunk async for chunk in stream.text_stream])
+
+    assert text == "Hello"
+    assert client.messages.stream.call_count == 2
+    assert recorded == [("synthesis", "m", usage)]
+    # The 429'd attempt is refunded; the stream's 1000 is settled down to the 20 it used
+    assert abs(limiter.buckets["output-tokens"].tokens - (8000 - 20)) < 1
+
+
+def test_each_model_is_limited_by_its_own_responses():
+    def response(model: str, remaining: str) -> httpx.Response:
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages", json={"model": model})
+        return httpx.Response(200, request=request, headers={
+            "anthropic-ratelimit-requests-limit": "4000",
+            "anthropic-ratelimit-requests-remaining": remaining,
+        })
+
+    _record_response(response("claude-haiku-4-5", "3999"))
+    _record_response(response("claude-sonnet-4-6", "0"))
+
+    assert get_limiter("claude-haiku-4-5").buckets["requests"].tokens > 3000
+    assert get_limiter("claude-sonnet-4-6").buckets["requests"].tokens < 1
+    assert get_limiter("claude-haiku-4-5") is not get_limiter("claude-sonnet-4-6")
@@ -0,0 +1,98 @@
+import os
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from conftest import write_scraped
+from services.news_fetcher import fetch_ai_news, fetch_from_scraped
+from services.scrape_cache import ScrapeWatermark
+
+WEEK = date(2025, 3, 10)  # covers 2025-03-03 .. 2025-03-09
+
+SELECTION = MagicMock(content=[MagicMock(type="text", text='{"developments": [], "jobs_and_hiring": []}')])
+WEB_COMPANIES = [{"name": "Ramp"}, {"name": "Abridge"}]
+
+
+@pytest.mark.asyncio
+async def test_only_articles_from_the_covered_week_reach_the_prompt(tmp_path):
+    scraped = tmp_path / "scraped.json"
+    write_scraped(scraped, [
+        ("Last month's launch", "2025-02-10T09:00:00Z"),
+        ("Monday's launch", "2025-03-03T08:00:00-05:00"),
+        ("Sunday night funding round", "2025-03-09T23:00:00+00:00"),
+        ("Next week's story", "2025-03-10T09:00:00Z"),
+        ("Undated explainer", ""),
+    ])
+
+    with patch("services.news_fetcher.create_message", return_value=SELECTION) as mock_create, \
+         patch("services.news_fetcher.fetch_companies_from_web", return_value=WEB_COMPANIES):
+        result = await fetch_from_scraped(scraped, week_start=WEEK)
+
+    prompt = mock_create.call_args.kwargs["messages"][0]["content"]
+    assert result["success"] is True
+    assert [t for t in ("Last month", "Monday", "Sunday night", "Next week", "Undated") if t in prompt] == \
+        ["Monday", "Sunday night", "Undated"]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_scrape_costs_no_parsing_and_no_tokens(tmp_path):
+    scraped = tmp_path / "scraped.json"
+    write_scraped(scraped, [("Monday's launch", "2025-03-03T09:00:00Z")])
+
+    with patch("services.news_fetcher.create_message", return_value=SELECTION) as mock_create, \
+         patch("services.news_fetcher.fetch_companies_from_web", return_value=WEB_COMPANIES):
+        first = await fetch_from_scraped(scraped, week_start=WEEK)
+        with patch.object(ScrapeWatermark, "read", side_effect=AssertionError("file re-read")):
+            second = await fetch_from_scraped(scraped, week_start=WEEK)
+        assert mock_create.call_count == 1
+
+        write_scraped(scraped, [("Tuesday's launch", "2025-03-04T09:00:00Z")])
+        os.utime(scraped, ns=(0, 1))
+        await fetch_from_scraped(scraped, week_start=WEEK)
+
+    assert first["data"] == second["data"]
+    assert mock_create.call_count == 2
+    assert "Tuesday" in mock_create.call_args.kwargs["messages"][0]["content"]
+
+
+@pytest.mark.asyncio
+async def test_stale_scrape_falls_back_to_web_search(tmp_path, monkeypatch):
+    scraped = tmp_path / "scraped.json"
+    write_scraped(scraped, [("Last year's news", "2024-06-01T09:00:00Z")])
+    monkeypatch.setattr("services.news_fetcher.SCRAPED_DATA_PATH", scraped)
+
+    stale = await fetch_from_scraped(scraped, week_start=WEEK)
+    assert stale["success"] is False and stale["fallback"] is True
+    assert "newest is 2024-06-01" in stale["error"]
+
+    web = MagicMock(content=[MagicMock(type="text", text='{"developments": [], "jobs_and_hiring": []}')])
+    with patch.object(ScrapeWatermark, "read", side_effect=AssertionError("file re-read")), \
+         patch("services.news_fetcher.create_message", new_callable=AsyncMock, return_value=web) as mock_create, \
+         patch("services.news_fetcher.fetch_companies_from_web", return_value=[]):
+        result = await fetch_ai_news(WEEK)
+
+    assert result["source"] == "web_search"
+    assert mock_create.call_args.kwargs["stage"] == "news_search"
+
+
+@pytest.mark.asyncio
+async def test_backfilled_week_never_gets_todays_web_news(tmp_path, monkeypatch):
+    scraped = tmp_path / "scraped.json"
+    write_scraped(scraped, [("Last year's news", "2024-06-01T09:00:00Z")])
+    monkeypatch.setattr("services.news_fetcher.SCRAPED_DATA_PATH", scraped)
+
+    with patch("services.news_fetcher.create_message", new_callable=AsyncMock) as mock_create, \
+         patch("services.news_fetcher.fetch_companies_from_web", new_callable=AsyncMock) as mock_companies:
+        missing = await fetch_ai_news(WEEK, archived_only=True)
+
+        write_scraped(scraped, [("Monday's launch", "2025-03-03T09:00:00Z")])
+        os.utime(scraped, ns=(0, 1))
+        mock_create.return_value = SELECTION
+        archived = await fetch_ai_news(WEEK, archived_only=True)
+
+    assert missing["success"] is False and missing["error"].startswith("No archived news for week of 2025-03-10")
+    assert archived["success"] is True and archived["archived"] is True and archived["source"] == "scraper"
+    # companies come from the week's own articles, not a fresh web search
+    assert [c.kwargs["stage"] for c in mock_create.call_args_list] == ["news_selection", "companies_backup"]
+    mock_companies.assert_not_called()
@@ -0,0 +1,82 @@
+import json
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import news_fetcher
+from services.search_memory import WeekSearches, capture, search_tool
+
+
+def _search_response(query: str, urls: list, payload: dict) -> SimpleNamespace:
+    """A web_search response shaped like the API's server tool blocks."""
+    return SimpleNamespace(content=[
+        SimpleNamespace(type="server_tool_use", input={"query": query}),
+        SimpleNamespace(type="web_search_tool_result", content=[
+            {"type": "web_search_result", "url": url, "title": f"Story {i}", "page_age": "2 days ago"}
+            for i, url in enumerate(urls)
+        ]),
+        SimpleNamespace(type="text", text=json.dumps(payload), citations=[
+            {"type": "web_search_result_location", "url": urls[0], "title": "Story 0", "cited_text": "Agents ship."},
+        ]),
+    ])
+
+
+def test_search_tool_budgets_and_domains(monkeypatch):
+    assert search_tool("news_search")["max_uses"] == 5
+    assert "allowed_domains" not in search_tool("news_search")
+
+    monkeypatch.setenv("WEB_SEARCH_MAX_USES_COMPANIES_SEARCH", "2")
+    monkeypatch.setenv("WEB_SEARCH_BLOCKED_DOMAINS", "reddit.com, Medium.com")
+    monkeypatch.setenv("WEB_SEARCH_ALLOWED_DOMAINS_NEWS_SEARCH", "techcrunch.com")
+
+    companies = search_tool("companies_search")
+    assert companies["max_uses"] == 2
+    assert companies["blocked_domains"] == ["reddit.com", "medium.com"]
+    # Only one list may be sent — the stage's allow list wins
+    assert search_tool("news_search")["allowed_domains"] == ["techcrunch.com"]
+    assert "blocked_domains" not in search_tool("news_search")
+
+
+def test_capture_merges_results_and_citations():
+    urls = ["https://techcrunch.com/a?utm_source=x", "https://www.theverge.com/b"]
+    queries, results = capture(_search_response("AI news this week", urls, {}))
+
+    assert queries == ["AI news this week"]
+    assert [r["url"] for r in results] == urls
+    assert results[0]["cited_text"] == "Agents ship."
+    assert capture(MagicMock(content=[MagicMock(type="text")])) == ([], [])
+
+
+@pytest.mark.asyncio
+async def test_later_calls_reuse_the_weeks_searches(monkeypatch, tmp_path):
+    monkeypatch.setattr(news_fetcher, "SCRAPED_DATA_PATH", tmp_path / "missing.json")
+    news_urls = [f"https://news.example.com/{i}" for i in range(6)]
+    news = {"developments": [], "jobs_and_hiring": [], "featured_resource": {}}
+    companies = {"companies_to_watch": [{"name": "Ramp"}, {"name": "Abridge"}]}
+    responses = [
+        _search_response("AI news this week", news_urls, news),
+        _search_response("AI startups education health", ["https://co.example.com/ramp"], companies),
+        _search_response("not recorded", ["https://not-recorded.example.com"], news),
+        _search_response("AI startups fintech", ["https://co.example.com/abridge"], companies),
+    ]
+
+    with patch("services.news_fetcher.client") as mock_client:
+        mock_client.messages.create.side_effect = responses
+        first = await news_fetcher.fetch_ai_news(date(2025, 3, 3))
+        second = await news_fetcher.fetch_ai_news(date(2025, 3, 3))
+
+    calls = [c.kwargs for c in mock_client.messages.create.call_args_list]
+    assert first["success"] and second["success"]
+
+    # Companies search sees the news results instead of re-running "AI news this week"
+    assert calls[1]["tools"][0]["max_uses"] == 3
+    assert "https://news.example.com/5" in calls[1]["messages"][0]["content"]
+    assert "AI news this week" in calls[1]["messages"][0]["content"]
+
+    # A second run in the same week answers news from stored sources, no tool
+    assert "tools" not in calls[2]
+    assert "https://news.example.com/0" in calls[2]["messages"][0]["content"]
+    assert len(WeekSearches.load(date(2025, 3, 3))) == 8
+    assert len(WeekSearches.load(date(2025, 3, 10))) == 0
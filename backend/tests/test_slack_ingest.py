@@ -0,0 +1,137 @@
+import httpx
+import pytest
+from datetime import date, timedelta
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from services.slack_ingest import (
+    THREAD_LOOKBACK_DAYS,
+    datetime_to_ts,
+    load_messages,
+    sync_slack_channel,
+    ts_to_datetime,
+)
+from services.scrape_cache import article_window
+
+# Monday 2025-03-10 digest covers 2025-03-03 .. 2025-03-09
+IN_WEEK = ["1741168800.000100", "1741255200.000200", "1741341600.000300"]
+
+
+def stub_slack_server(history: list, replies: dict | None = None, throttle_first: bool = True) -> tuple[FastAPI, list]:
+    """Local stand-in for the Slack Web API: cursor pages of 2, one 429 up front."""
+    app = FastAPI()
+    calls = []
+
+    @app.get("/conversations.history")
+    async def conversations_history(request: Request):
+        params = dict(request.query_params)
+        calls.append(("history", params))
+        if throttle_first and len(calls) == 1:
+            return JSONResponse({"ok": False, "error": "ratelimited"}, status_code=429, headers={"Retry-After": "0"})
+        if request.headers.get("authorization") != "Bearer xoxb-test":
+            return {"ok": False, "error": "invalid_auth"}
+
+        newer = [m for m in history if m["ts"] > params.get("oldest", "0")]
+        newer.sort(key=lambda m: m["ts"], reverse=True)
+        start = int(params.get("cursor") or 0)
+        page = newer[start:start + 2]
+        next_cursor = str(start + 2) if start + 2 < len(newer) else ""
+        return {"ok": True, "messages": page, "response_metadata": {"next_cursor": next_cursor}}
+
+    @app.get("/conversations.replies")
+    async def conversations_replies(request: Request):
+        params = dict(request.query_params)
+        calls.append(("replies", params))
+        return {"ok": True, "messages": (replies or {}).get(params["ts"], [])}
+
+    return app, calls
+
+
+def test_ts_round_trips_through_datetime():
+    ts = "1741255200.000200"
+    assert datetime_to_ts(ts_to_datetime(ts)) == ts
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_throttles_and_resumes_from_watermark(tmp_path):
+    store = tmp_path / "slack.db"
+    history = [{"ts": ts, "user": "U1", "text": f"msg {i}"} for i, ts in enumerate(IN_WEEK)]
+    history[0].update(reply_count=1, latest_reply="1741172400.000000", thread_ts=IN_WEEK[0])
+    replies = {IN_WEEK[0]: [history[0], {"ts": "1741172400.000000", "thread_ts": IN_WEEK[0], "user": "U2", "text": "reply"}]}
+    app, calls = stub_slack_server(history, replies)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://slack.test") as client:
+        first = await sync_slack_channel("xoxb-test", "C1", None, client=client, store_path=store)
+
+        history.append({"ts": "1741428000.000400", "user": "U3", "text": "new this week"})
+        calls.clear()
+        second = await sync_slack_channel("xoxb-test", "C1", None, client=client, store_path=store)
+
+    assert first["success"] is True
+    assert first["new_messages"] == 4
+    assert first["last_synced"] == ts_to_datetime(IN_WEEK[-1]).isoformat()
+
+    # Second run resumes from the stored watermark, re-scanning a week of parents for replies
+    assert second["new_messages"] == 1
+    lookback = ts_to_datetime(IN_WEEK[-1]) - timedelta(days=THREAD_LOOKBACK_DAYS)
+    assert [c for c in calls if c[0] == "history"][-1][1]["oldest"] == datetime_to_ts(lookback)
+
+    messages = load_messages("C1", *article_window(date(2025, 3, 10)), path=store)
+    assert [m["text"] for m in messages] == ["msg 0", "reply", "msg 1", "msg 2", "new this week"]
+
+
+@pytest.mark.asyncio
+async def test_sync_picks_up_new_replies_to_older_threads(tmp_path):
+    store = tmp_path / "slack.db"
+    parent = {"ts": IN_WEEK[0], "user": "U1", "text": "parent", "thread_ts": IN_WEEK[0], "reply_count": 0}
+    history = [parent, {"ts": IN_WEEK[1], "user": "U1", "text": "later"}]
+    replies = {IN_WEEK[0]: [parent]}
+    app, _ = stub_slack_server(history, replies, throttle_first=False)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://slack.test") as client:
+        await sync_slack_channel("xoxb-test", "C1", None, client=client, store_path=store)
+
+        reply = {"ts": "1741428000.000500", "thread_ts": IN_WEEK[0], "user": "U2", "text": "late reply"}
+        parent.update(reply_count=1, latest_reply=reply["ts"])
+        replies[IN_WEEK[0]] = [parent, reply]
+        second = await sync_slack_channel("xoxb-test", "C1", None, client=client, store_path=store)
+
+    assert second["new_messages"] == 1
+    messages = load_messages("C1", *article_window(date(2025, 3, 10)), path=store)
+    assert [m["text"] for m in messages] == ["parent", "later", "late reply"]
+
+
+@pytest.mark.asyncio
+async def test_wiped_store_refetches_from_the_week_it_needs(tmp_path):
+    history = [{"ts": ts, "user": "U1", "text": f"msg {i}"} for i, ts in enumerate(IN_WEEK)]
+    app, _ = stub_slack_server(history, throttle_first=False)
+    since = article_window(date(2025, 3, 10))[0]
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://slack.test") as client:
+        await sync_slack_channel("xoxb-test", "C1", since, client=client, store_path=tmp_path / "old.db")
+        # A restart wipes the disk; the next run still gets the whole week
+        result = await sync_slack_channel("xoxb-test", "C1", since, client=client, store_path=tmp_path / "new.db")
+
+    assert result["new_messages"] == 3
+    assert len(load_messages("C1", *article_window(date(2025, 3, 10)), path=tmp_path / "new.db")) == 3
+
+
+@pytest.mark.asyncio
+async def test_sync_reports_slack_errors(tmp_path):
+    app, _ = stub_slack_server([], throttle_first=False)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://slack.test") as client:
+        result = await sync_slack_channel("xoxb-wrong", "C1", None, client=client, store_path=tmp_path / "slack.db")
+
+    assert result == {"success": False, "error": "invalid_auth"}
+
+
+@pytest.mark.asyncio
+async def test_non_json_error_page_is_a_slack_error(tmp_path):
+    def handler(request):
+        return httpx.Response(502, text="<html>Bad Gateway</html>", headers={"content-type": "text/html"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://slack.test") as client:
+        result = await sync_slack_channel("xoxb-test", "C1", None, client=client, store_path=tmp_path / "slack.db")
+
+    assert result == {"success": False, "error": "http_502"}
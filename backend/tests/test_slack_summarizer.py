@@ -0,0 +1,98 @@
+import threading
+import time
+import anthropic
+import httpx
+import pytest
+from unittest.mock import MagicMock
+from services.rate_limiter import MAX_RATE_LIMIT_RETRIES
+from services.slack_summarizer import build_chunks, summarize_messages
+
+DAY_1 = "1741168800"  # 2025-03-05
+DAY_2 = "1741255200"  # 2025-03-06
+
+
+def _messages():
+    return [
+        {"ts": f"{DAY_1}.000100", "thread_ts": f"{DAY_1}.000100", "user": "U1", "text": "Cursor rules template"},
+        {"ts": f"{DAY_1}.000500", "thread_ts": f"{DAY_1}.000100", "user": "U2", "text": "using it in cohort 12"},
+        {"ts": f"{DAY_1}.000300", "thread_ts": None, "user": "U3", "text": "Claude Code tips"},
+        {"ts": f"{DAY_2}.000100", "thread_ts": None, "user": "U1", "text": "agents report"},
+    ]
+
+
+def test_build_chunks_groups_threads_by_day():
+    chunks = build_chunks(_messages())
+
+    assert [c["day"] for c in chunks] == ["2025-03-05", "2025-03-06"]
+    assert chunks[0]["text"] == "U1: Cursor rules template\n↳ U2: using it in cohort 12\n\nU3: Claude Code tips"
+
+    # A tight budget splits a day between threads, never inside one
+    assert len(build_chunks(_messages(), budget=60)) == 3
+
+
+class _CountingClient:
+    """Fake Anthropic client that tracks how many calls overlap."""
+
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self.messages = self
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        block = MagicMock(type="text", text='{"highlights": ["someone shared a tool"]}')
+        return MagicMock(content=[block])
+
+
+@pytest.mark.asyncio
+async def test_summaries_are_capped_and_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv("SLACK_SUMMARY_CONCURRENCY", "2")
+    messages = [
+        {"ts": f"{int(DAY_1) + day * 86400}.000100", "thread_ts": None, "user": "U1", "text": f"day {day}"}
+        for day in range(6)
+    ]
+    client = _CountingClient()
+
+    first = await summarize_messages(client, messages, store_path=tmp_path / "slack.db")
+    second = await summarize_messages(client, messages, store_path=tmp_path / "slack.db")
+
+    assert len(first) == 6
+    assert client.peak == 2
+    # Unchanged days come from the cache — no new calls
+    assert client.calls == 6
+    assert second == first
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_falls_back_to_its_text_and_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr("services.rate_limiter.AnthropicRateLimiter.backoff", lambda self, seconds: None)
+    messages = [
+        {"ts": f"{int(DAY_1) + day * 86400}.000100", "thread_ts": None, "user": "U1", "text": f"day {day} news"}
+        for day in range(3)
+    ]
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    overloaded = anthropic.InternalServerError("overloaded", response=httpx.Response(529, request=request), body=None)
+
+    def create(**kwargs):
+        if "day 1 news" in kwargs["messages"][0]["content"]:
+            raise overloaded
+        return MagicMock(content=[MagicMock(type="text", text='{"highlights": ["someone shared a tool"]}')])
+
+    client = MagicMock()
+    client.messages.create.side_effect = create
+
+    first = await summarize_messages(client, messages, store_path=tmp_path / "slack.db")
+    second = await summarize_messages(client, messages, store_path=tmp_path / "slack.db")
+
+    assert first == ["someone shared a tool", "U1: day 1 news", "someone shared a tool"]
+    assert second == first
+    # Only the failed day is asked for again, each time through the limiter's retries
+    assert client.messages.create.call_count == 2 + 2 * MAX_RATE_LIMIT_RETRIES
@@ -0,0 +1,78 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Cold-start budget for `import main` (FastAPI included); override on slow CI
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", 1500))
+# What the app adds on top of FastAPI itself
+APP_IMPORT_BUDGET_MS = float(os.environ.get("APP_IMPORT_BUDGET_MS", 150))
+
+# SDKs that must only load on first use, never at import
+LAZY_PACKAGES = ("anthropic", "supabase", "resend", "apscheduler")
+
+
+def _importtime(code: str) -> tuple[str, dict]:
+    """Runs code in a fresh interpreter under -X importtime → (stdout, {module: cumulative µs})."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| +(\S+)", line)
+        if match:
+            cumulative.setdefault(match.group(2), int(match.group(1)))
+    return result.stdout, cumulative
+
+
+def test_importing_main_stays_within_cold_start_budget():
+    _, cumulative = _importtime("import main")
+
+    assert not [m for m in cumulative if m.split(".")[0] in LAZY_PACKAGES]
+    assert cumulative["main"] / 1000 < IMPORT_BUDGET_MS
+    assert (cumulative["main"] - cumulative["fastapi"]) / 1000 < APP_IMPORT_BUDGET_MS
+
+
+def test_importing_services_has_no_side_effects():
+    stdout, _ = _importtime(
+        "import services.digest_synthesizer, services.email_sender, services.batch_synthesizer\n"
+        "from services import clients, config\n"
+        "print(sum(f.cache_info().currsize for f in (config.get_settings, clients.get_anthropic,"
+        " clients.get_async_anthropic, clients.get_batch_anthropic, clients.get_supabase)))"
+    )
+
+    assert stdout.strip() == "0"
+
+
+def test_entry_points_load_env_before_reading_settings():
+    """Every `python -m services.x` entry point loads backend/.env before os.environ is read."""
+    for path in sorted((BACKEND_DIR / "services").glob("*.py")):
+        source = path.read_text()
+        if '__name__ == "__main__"' not in source:
+            continue
+        entry = source.split('if __name__ == "__main__":', 1)[1]
+        if "main()" in entry.split("\n", 2)[1]:
+            entry = source.split("def main(", 1)[1]
+        assert "load_env()" in entry, f"{path.name} reads settings before loading .env"
+
+
+def test_load_env_makes_dotenv_visible_to_direct_reads(monkeypatch, tmp_path):
+    from services import config
+    from services.article_extractor import extraction_enabled
+
+    env = tmp_path / ".env"
+    env.write_text("ARTICLE_EXTRACTION=1\n")
+    monkeypatch.delenv("ARTICLE_EXTRACTION", raising=False)
+    monkeypatch.setattr(config, "ENV_PATH", env)
+    config.get_settings.cache_clear()
+
+    try:
+        assert not extraction_enabled()
+        config.load_env()
+        assert extraction_enabled()
+    finally:
+        config.get_settings.cache_clear()
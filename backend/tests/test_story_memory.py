@@ -0,0 +1,87 @@
+import json
+import pytest
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from services.news_fetcher import fetch_from_scraped
+from services.story_memory import StoryMemory, normalize_url, remember_digests
+
+EARLIER_DIGEST = {
+    "week_start": "2025-03-03",
+    "ai_developments": [
+        {"headline": "Anthropic ships Claude agent SDK", "url": "https://www.example.com/sdk/?utm_source=x"},
+    ],
+    "companies_to_watch": [{"name": "Duolingo, Inc.", "url": None}],
+    "jobs_and_hiring": {"key_insights": [{"insight": "x", "url": "https://jobs.example.com/report"}]},
+    "featured_resource": {"title": "The agent economy", "url": None},
+}
+
+
+def test_normalize_url_ignores_tracking_and_cosmetics():
+    assert normalize_url("http://WWW.Example.com/sdk/?utm_source=news&id=7#top") == "https://example.com/sdk?id=7"
+    assert normalize_url(None) == ""
+
+
+def test_memory_only_sees_earlier_weeks(tmp_path):
+    path = tmp_path / "memory.db"
+    remember_digests([EARLIER_DIGEST], path)
+
+    later = StoryMemory.load(before=date(2025, 3, 10), path=path)
+    assert later.seen_story(url="https://example.com/sdk")
+    assert later.seen_story(title="ANTHROPIC ships Claude agent SDK!")
+    assert later.seen_company("duolingo")
+    assert not later.seen_company("Khan Academy")
+
+    # Regenerating the week that first published them must not filter them out
+    same_week = StoryMemory.load(before=date(2025, 3, 3), path=path)
+    assert len(same_week) == 0
+
+
+def test_malformed_sections_are_skipped_not_fatal(tmp_path):
+    path = tmp_path / "memory.db"
+    malformed = {**EARLIER_DIGEST, "jobs_and_hiring": ["Hiring is up"], "featured_resource": "A report",
+                 "companies_to_watch": None, "ai_developments": ["stray text", *EARLIER_DIGEST["ai_developments"]]}
+
+    assert remember_digests([malformed], path) == 2
+    assert StoryMemory.load(before=date(2025, 3, 10), path=path).seen_story(url="https://example.com/sdk")
+
+
+def test_fresh_disk_reseeds_from_stored_digests(tmp_path, monkeypatch):
+    archive = MagicMock()
+    archive.table.return_value.select.return_value.execute.return_value.data = [EARLIER_DIGEST]
+    monkeypatch.setattr("services.story_memory._supabase", lambda: archive)
+    path = tmp_path / "memory.db"
+
+    # After a restart the first digest stored lands on an empty disk before anything loads
+    remember_digests([{"week_start": "2025-03-10", "ai_developments": [
+        {"headline": "Cursor raises a new round", "url": "https://example.com/cursor"}]}], path)
+    memory = StoryMemory.load(before=date(2025, 3, 17), path=path)
+    StoryMemory.load(before=date(2025, 3, 17), path=path)
+
+    assert memory.seen_story(url="https://example.com/sdk")
+    assert memory.seen_story(url="https://example.com/cursor")
+    assert archive.table.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_covered_articles_and_companies_never_reach_the_prompt(tmp_path):
+    path = tmp_path / "memory.db"
+    remember_digests([EARLIER_DIGEST], path)
+    memory = StoryMemory.load(before=date(2025, 3, 10), path=path)
+
+    scraped = tmp_path / "scraped.json"
+    scraped.write_text(json.dumps({"articles": [
+        {"title": "Old news", "url": "https://example.com/sdk?utm_medium=email", "summary": "s"},
+        {"title": "A brand new story this week", "url": "https://example.com/new", "summary": "s"},
+    ]}))
+
+    selection = MagicMock(content=[MagicMock(type="text", text='{"developments": [], "jobs_and_hiring": []}')])
+    web = [{"name": "Duolingo"}, {"name": "Khan Academy"}, {"name": "Ramp"}]
+
+    with patch("services.news_fetcher.create_message", return_value=selection) as mock_create, \
+         patch("services.news_fetcher.fetch_companies_from_web", return_value=web):
+        result = await fetch_from_scraped(scraped, memory)
+
+    prompt = mock_create.call_args.kwargs["messages"][0]["content"]
+    assert "https://example.com/new" in prompt and "Old news" not in prompt
+    assert [c["name"] for c in result["data"]["companies_to_watch"]] == ["Khan Academy", "Ramp"]
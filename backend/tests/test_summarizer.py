@@ -0,0 +1,64 @@
+import time
+
+from services.digest_synthesizer import compress_news
+from services.summarizer import split_sentences, summarize
+
+ARTICLE = (
+    "Posted by the TensorFlow team. "
+    "TensorFlow 2.20 has been released with a new default runtime. "
+    "For ongoing updates related to Keras, please note that all news and releases are now published on keras.io. "
+    "Anthropic said Claude Code agents now open 40% of pull requests at partner companies. "
+    "The company also thanked its community. "
+    "Hiring for junior developer roles fell 12% as workforce programs retool their training."
+)
+
+
+def test_short_text_is_returned_unchanged():
+    assert summarize("Cursor raised $900M.", 75) == "Cursor raised $900M."
+    assert summarize("", 75) == ""
+    assert summarize(None, 75) is None
+
+
+def test_keeps_whole_sentences_within_the_budget():
+    summary = summarize(ARTICLE, max_tokens=50)
+    sentences = split_sentences(ARTICLE)
+
+    assert len(summary) <= 200
+    assert all(s in sentences for s in split_sentences(summary))
+    # Original order is kept
+    kept = [sentences.index(s) for s in split_sentences(summary)]
+    assert kept == sorted(kept)
+
+
+def test_prefers_sentences_about_priority_topics():
+    summary = summarize(ARTICLE, max_tokens=50)
+
+    assert "Claude Code agents" in summary
+    assert "thanked its community" not in summary
+    assert "keras.io" not in summary
+
+
+def test_one_long_sentence_is_cut_at_a_word_boundary():
+    summary = summarize("word " * 200, max_tokens=10)
+
+    assert len(summary) <= 40
+    assert summary.endswith("word…")
+
+
+def test_compress_news_no_longer_cuts_mid_sentence():
+    news = {"developments": [{"headline": "h", "what_happened": ARTICLE, "why_it_matters": ARTICLE}]}
+    development = compress_news(news)["developments"][0]
+
+    assert development["what_happened"].endswith(".")
+    assert "..." not in development["why_it_matters"]
+
+
+def test_thousands_of_articles_per_second():
+    articles = [f"{ARTICLE} Story {i} adds one more detail about skills." * 2 for i in range(2000)]
+
+    started = time.perf_counter()
+    summaries = [summarize(a, 75) for a in articles]
+    elapsed = time.perf_counter() - started
+
+    assert all(len(s) <= 300 for s in summaries)
+    assert len(articles) / elapsed > 1000
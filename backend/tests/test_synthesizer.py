@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import date
@@ -54,3 +55,157 @@ async def test_generate_digest_success():
 
     assert result["success"] is True
     assert "digest_id" in result
+
+
+def test_section_stream_parser_emits_sections_as_they_complete():
+    from services.digest_synthesizer import SectionStreamParser
+
+    parser = SectionStreamParser()
+    chunks = ['```json\n{"week_summary": "Agents, {every', 'where}."', ', "ai_developments": [{"headline": "A"}',
+              ', {"headline": "B"}], "slack_highlights": []}\n```']
+
+    emitted = [parser.feed(chunk) for chunk in chunks]
+
+    assert emitted[0] == []
+    assert emitted[1] == []
+    assert emitted[2] == [("week_summary", "Agents, {everywhere}.")]
+    assert emitted[3] == [
+        ("ai_developments", [{"headline": "A"}, {"headline": "B"}]),
+        ("slack_highlights", []),
+    ]
+
+
+class _FakeStream:
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        for chunk in self._chunks:
+            yield chunk
+
+    async def get_final_message(self):
+        return MagicMock()
+
+
+@pytest.mark.asyncio
+async def test_stream_digest_yields_sections_then_done():
+    from services.digest_synthesizer import stream_digest
+
+    mock_news = {"success": True, "source_count": 2, "data": {"developments": []}}
+    chunks = ['{"week_summary": "Test week",', ' "ai_developments": []}']
+
+    mock_supabase = MagicMock()
+    mock_supabase.table.return_value.select.return_value.limit.return_value.execute.return_value.data = []
+    mock_supabase.table.return_value.insert.return_value.execute.return_value.data = [{"id": "test-uuid-456"}]
+
+    with patch("services.digest_synthesizer.fetch_ai_news", new_callable=AsyncMock, return_value=mock_news), \
+         patch("services.digest_synthesizer.get_supabase", return_value=mock_supabase), \
+         patch("services.digest_synthesizer.async_client") as mock_client:
+        mock_client.messages.stream.return_value = _FakeStream(chunks)
+        events = [event async for event in stream_digest(date(2025, 3, 3))]
+
+    assert [e for e, _ in events] == ["status", "status", "section", "section", "done"]
+    assert events[2][1] == {"key": "week_summary", "value": "Test week"}
+    assert events[-1][1]["digest_id"] == "test-uuid-456"
+
+
+@pytest.mark.asyncio
+async def test_multi_audience_fetches_news_once():
+    from services.digest_synthesizer import generate_digests_for_audiences
+
+    mock_news = {"success": True, "source_count": 3, "data": {"developments": []}}
+    mock_content = MagicMock(type="text", text='{"week_summary": "Test week", "slack_highlights": []}')
+    audiences = [
+        None,
+        {"id": "aud-1", "name": "Kim Lee", "pursuit_context": "VP Programs", "email_to": "kim@pursuit.org"},
+    ]
+
+    mock_supabase = MagicMock()
+    mock_supabase.table.return_value.select.return_value.limit.return_value.execute.return_value.data = []
+    mock_supabase.table.return_value.insert.return_value.execute.return_value.data = [{"id": "test-uuid-789"}]
+
+    with patch("services.digest_synthesizer.fetch_ai_news", new_callable=AsyncMock, return_value=mock_news) as mock_fetch, \
+         patch("services.digest_synthesizer.get_supabase", return_value=mock_supabase), \
+         patch("services.digest_synthesizer.client") as mock_client:
+        mock_client.messages.create.return_value = MagicMock(content=[mock_content])
+        result = await generate_digests_for_audiences(date(2025, 3, 3), audiences)
+        again = await generate_digests_for_audiences(date(2025, 3, 3), audiences[1:])
+
+    assert result["success"] is True and again["success"] is True
+    assert mock_fetch.await_count == 1
+    assert mock_client.messages.create.call_count == 3
+
+    prompts = [c.kwargs["messages"][0]["content"] for c in mock_client.messages.create.call_args_list]
+    assert sum(p.startswith("THIS EDITION IS FOR Kim Lee") for p in prompts) == 2
+    inserted = [c.args[0] for c in mock_supabase.table.return_value.insert.call_args_list]
+    assert sorted(str(r.get("audience_id")) for r in inserted) == ["None", "aud-1", "aud-1"]
+
+
+@pytest.mark.asyncio
+async def test_missing_audiences_table_still_builds_the_primary_digest():
+    from services.digest_synthesizer import generate_digests_for_audiences
+
+    mock_news = {"success": True, "source_count": 3, "data": {"developments": []}}
+    mock_content = MagicMock(type="text", text='{"week_summary": "Test week", "slack_highlights": []}')
+    mock_supabase = MagicMock()
+    mock_supabase.table.return_value.select.return_value.limit.return_value.execute.return_value.data = []
+    mock_supabase.table.return_value.select.return_value.eq.return_value.execute.side_effect = \
+        Exception('relation "audiences" does not exist')
+    mock_supabase.table.return_value.insert.return_value.execute.return_value.data = [{"id": "test-uuid-790"}]
+
+    with patch("services.digest_synthesizer.fetch_ai_news", new_callable=AsyncMock, return_value=mock_news), \
+         patch("services.digest_synthesizer.get_supabase", return_value=mock_supabase), \
+         patch("services.digest_synthesizer.client") as mock_client:
+        mock_client.messages.create.return_value = MagicMock(content=[mock_content])
+        result = await generate_digests_for_audiences(date(2025, 3, 10))
+
+    assert result["success"] is True
+    assert [d["audience"] for d in result["digests"]] == ["primary"]
+
+
+@pytest.mark.asyncio
+async def test_past_week_from_live_news_stays_out_of_story_memory():
+    from services.story_memory import StoryMemory
+
+    story = {"headline": "Cursor raises $900M", "url": "https://news.example.com/cursor"}
+    web_news = {"success": True, "source": "web_search", "source_count": 1, "data": {"developments": [story]}}
+    mock_content = MagicMock(type="text", text=json.dumps({"week_summary": "Old week", "ai_developments": [story]}))
+    mock_supabase = MagicMock()
+    mock_supabase.table.return_value.select.return_value.limit.return_value.execute.return_value.data = []
+    mock_supabase.table.return_value.insert.return_value.execute.return_value.data = [{"id": "test-uuid-791"}]
+
+    with patch("services.digest_synthesizer.fetch_ai_news", new_callable=AsyncMock, return_value=web_news), \
+         patch("services.digest_synthesizer.get_supabase", return_value=mock_supabase), \
+         patch("services.digest_synthesizer.client") as mock_client:
+        mock_client.messages.create.return_value = MagicMock(content=[mock_content])
+        result = await generate_digest(date(2025, 3, 3), sync_slack=False)
+
+    assert result["success"] is True
+    assert len(StoryMemory.load(date(2099, 1, 5))) == 0
+
+
+@pytest.mark.asyncio
+async def test_index_failure_after_the_insert_is_not_a_failed_digest():
+    mock_news = {"success": True, "source_count": 1, "data": {"developments": []}}
+    mock_content = MagicMock(type="text", text='{"week_summary": "Test week"}')
+    mock_supabase = MagicMock()
+    mock_supabase.table.return_value.select.return_value.limit.return_value.execute.return_value.data = []
+    mock_supabase.table.return_value.insert.return_value.execute.return_value.data = [{"id": "test-uuid-792"}]
+
+    with patch("services.digest_synthesizer.fetch_ai_news", new_callable=AsyncMock, return_value=mock_news), \
+         patch("services.digest_synthesizer.get_supabase", return_value=mock_supabase), \
+         patch("services.digest_synthesizer.record_trends", side_effect=OSError("disk full")), \
+         patch("services.digest_synthesizer.record_feed") as mock_feed, \
+         patch("services.digest_synthesizer.client") as mock_client:
+        mock_client.messages.create.return_value = MagicMock(content=[mock_content])
+        result = await generate_digest(date(2025, 3, 3), sync_slack=False)
+
+    assert result["success"] is True and result["digest_id"] == "test-uuid-792"
+    mock_feed.assert_called_once()  # later indexes still run
@@ -0,0 +1,35 @@
+import json
+import pytest
+from services.telemetry import pipeline_run, render_prometheus, snapshot, span
+
+
+def test_spans_aggregate_into_prometheus_metrics():
+    with span("test_stage", input_tokens=100, output_tokens=20, web_searches=2):
+        pass
+    with pytest.raises(ValueError):
+        with span("test_stage", input_tokens=50):
+            raise ValueError("boom")
+
+    stats = snapshot()["test_stage"]
+    assert stats["count"] == 2
+    assert stats["errors"] == 1
+    assert stats["input_tokens"] == 150
+
+    text = render_prometheus()
+    assert "# TYPE digest_stage_input_tokens_total counter" in text
+    assert 'digest_stage_web_searches_total{stage="test_stage"} 2' in text
+
+
+def test_spans_export_as_json_lines_with_run_id(tmp_path, monkeypatch):
+    export = tmp_path / "spans.jsonl"
+    monkeypatch.setenv("TELEMETRY_EXPORT_PATH", str(export))
+
+    with pipeline_run() as run_id:
+        with span("export_stage") as s:
+            s.add(cached_tokens=7, model="claude-haiku-4-5")
+
+    record = json.loads(export.read_text().strip())
+    assert record["run_id"] == run_id
+    assert record["span"] == "export_stage"
+    assert record["cached_tokens"] == 7
+    assert record["model"] == "claude-haiku-4-5"
@@ -0,0 +1,115 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from conftest import archive
+from main import app
+from services import trends
+from services.trends import extract_entities, query_trends, record_digests
+
+
+def _digest(week: str, companies: list, headlines: list = (), audience_id: str | None = None) -> dict:
+    return {
+        "week_start": week,
+        "audience_id": audience_id,
+        "companies_to_watch": [{"name": name, "industry": industry} for name, industry in companies],
+        "ai_developments": [{"headline": h} for h in headlines],
+    }
+
+
+def test_extract_entities_normalizes_names_and_topics():
+    entities = extract_entities(_digest(
+        "2025-03-03",
+        [("Duolingo, Inc.", "Education"), ("Khanmigo", " education ")],
+        ["Cursor ships background agents", "Hospitals deploy clinical AI agents"],
+    ))
+
+    assert entities[("company", "duolingo")] == ("Duolingo, Inc.", 1)
+    assert entities[("industry", "education")] == ("Education", 2)
+    assert entities[("topic", "ai agents")] == ("AI agents", 2)
+    assert ("topic", "coding tools") in entities and ("topic", "health") in entities
+
+
+def test_weekly_series_from_precomputed_counts(tmp_path):
+    path = tmp_path / "trends.db"
+    record_digests([
+        _digest("2025-03-03", [("Duolingo", "Education"), ("Ramp", "Fintech")]),
+        _digest("2025-03-10", [("Duolingo Inc", "Education")]),
+        _digest("2025-03-17", [("Abridge", "Health Tech")]),
+        _digest("2025-03-17", [("Ramp", "Fintech")], audience_id="aud-1"),
+    ], path)
+
+    result = query_trends("company", top=2, path=path)
+    assert result["weeks"] == ["2025-03-03", "2025-03-10", "2025-03-17"]
+    assert result["series"][0] == {"key": "duolingo", "label": "Duolingo Inc", "total": 2, "counts": [1, 1, 0]}
+    assert len(result["series"]) == 2
+
+    since = query_trends("industry", since="2025-03-10", path=path)
+    assert [(s["key"], s["counts"]) for s in since["series"]] == [("education", [1, 0]), ("health tech", [0, 1])]
+
+    assert query_trends("company", audience_id="aud-1", path=path)["series"][0]["key"] == "ramp"
+
+
+def test_regenerating_a_week_replaces_its_counts(tmp_path):
+    path = tmp_path / "trends.db"
+    record_digests([_digest("2025-03-03", [("Ramp", "Fintech")])], path)
+    record_digests([_digest("2025-03-03", [("Abridge", "Health Tech")])], path)
+
+    assert [s["key"] for s in query_trends("company", path=path)["series"]] == ["abridge"]
+
+
+def test_rebuild_counts_only_the_latest_version_of_a_week(tmp_path):
+    path = tmp_path / "trends.db"
+    earlier = {**_digest("2025-03-03", [("Ramp", "Fintech")]), "generated_at": "2025-03-09T08:00:00+00:00"}
+    latest = {**_digest("2025-03-03", [("Abridge", "Health Tech")]), "generated_at": "2025-03-09T12:00:00+00:00"}
+
+    trends.rebuild_from_digests(archive([latest, earlier]), path)
+
+    assert [s["key"] for s in query_trends("company", path=path)["series"]] == ["abridge"]
+
+
+def test_trends_route_reads_aggregates_without_touching_digests():
+    trends.rebuild_from_digests(archive([]))
+    record_digests([_digest("2025-03-03", [("Ramp", "Fintech")], ["New agent framework"])], trends.TRENDS_PATH)
+    client = TestClient(app)
+
+    with patch("routers.digest.get_supabase", return_value=MagicMock()) as mock_supabase:
+        response = client.get("/digest/trends", params={"kind": "topic"})
+        bad_kind = client.get("/digest/trends", params={"kind": "people"})
+
+    assert response.status_code == 200
+    assert response.json()["series"][0]["label"] == "AI agents"
+    assert bad_kind.status_code == 400
+    mock_supabase.assert_not_called()
+
+
+def test_trends_are_read_off_the_event_loop():
+    trends.rebuild_from_digests(archive([]))
+    threads = []
+    original = trends.query_trends
+
+    def query_trends_spy(*args):
+        threads.append(threading.current_thread().name)
+        return original(*args)
+
+    with patch("services.trends.query_trends", query_trends_spy):
+        assert TestClient(app).get("/digest/trends").status_code == 200
+
+    assert threads and threads[0].startswith("supabase")
+
+
+def test_fresh_disk_recounts_the_archive_once():
+    # After a restart the first digest stored lands on an empty disk
+    record_digests([_digest("2025-03-10", [("Ramp", "Fintech")])], trends.TRENDS_PATH)
+    supabase = archive([_digest("2025-03-03", [("Abridge", "Health Tech")]),
+                        _digest("2025-03-10", [("Ramp", "Fintech")])])
+    client = TestClient(app)
+
+    with patch("routers.digest.get_supabase", return_value=supabase):
+        first = client.get("/digest/trends").json()
+        client.get("/digest/trends")
+
+    assert first["weeks"] == ["2025-03-03", "2025-03-10"]
+    assert sorted(s["key"] for s in first["series"]) == ["abridge", "ramp"]
+    assert supabase.table.call_count == 1
@@ -0,0 +1,134 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import RedirectResponse, Response
+
+from services import url_verifier
+from services.url_verifier import strip_tracking, verify_digest_links, verify_urls
+
+
+def stub_site() -> tuple[FastAPI, dict]:
+    """Local stand-in for news sites: a redirect, a 404, a HEAD-hostile server and a slow page."""
+    app = FastAPI()
+    state = {"hits": 0, "in_flight": 0, "peak": 0}
+
+    @app.middleware("http")
+    async def count(request: Request, call_next):
+        state["hits"] += 1
+        return await call_next(request)
+
+    @app.api_route("/old", methods=["GET", "HEAD"])
+    async def old():
+        return RedirectResponse("http://news.test/article?id=7&utm_source=newsletter", status_code=301)
+
+    @app.api_route("/article", methods=["GET", "HEAD"])
+    async def article():
+        return Response("ok")
+
+    @app.api_route("/paywalled", methods=["GET", "HEAD"])
+    async def paywalled():
+        return RedirectResponse("http://accounts.test/login?next=%2Fpaywalled", status_code=302)
+
+    @app.api_route("/login", methods=["GET", "HEAD"])
+    async def login():
+        return Response("sign in")
+
+    @app.api_route("/gone", methods=["GET", "HEAD"])
+    async def gone():
+        return Response(status_code=404)
+
+    @app.api_route("/no-head", methods=["GET", "HEAD"])
+    async def no_head(request: Request):
+        return Response(status_code=405) if request.method == "HEAD" else Response("ok")
+
+    @app.api_route("/slow/{n}", methods=["GET", "HEAD"])
+    async def slow(n: int):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.02)
+        state["in_flight"] -= 1
+        return Response("ok")
+
+    return app, state
+
+
+class UnreachableHost(httpx.AsyncBaseTransport):
+    """Routes to the stub app, except dead.test which refuses connections."""
+
+    def __init__(self, app):
+        self.app = httpx.ASGITransport(app=app)
+
+    async def handle_async_request(self, request):
+        if request.url.host == "dead.test":
+            raise httpx.ConnectError("Name or service not known", request=request)
+        return await self.app.handle_async_request(request)
+
+
+def stub_client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=UnreachableHost(app), follow_redirects=True)
+
+
+def test_strip_tracking_keeps_real_params():
+    assert strip_tracking("https://a.com/x?id=1&utm_source=y&fbclid=z#frag") == "https://a.com/x?id=1"
+    assert strip_tracking("https://a.com/x?ref=feed&refId=9&reference=b") == "https://a.com/x?refId=9&reference=b"
+
+
+@pytest.mark.asyncio
+async def test_digest_links_are_canonicalized_and_dead_ones_dropped():
+    app, _ = stub_site()
+    digest = {
+        "ai_developments": [
+            {"headline": "A", "url": "http://news.test/old"},
+            {"headline": "B", "url": "http://news.test/gone"},
+            {"headline": "F", "url": "http://news.test/paywalled?utm_medium=email"},
+        ],
+        "companies_to_watch": [{"name": "C", "url": "http://dead.test/page"}],
+        "jobs_and_hiring": {"key_insights": [{"insight": "D", "url": "http://news.test/no-head?ref=feed"}]},
+        "featured_resource": {"title": "E", "url": None},
+    }
+
+    async with stub_client(app) as client:
+        stats = await verify_digest_links(digest, client=client)
+
+    assert digest["ai_developments"][0]["url"] == "http://news.test/article?id=7"
+    assert digest["ai_developments"][1]["url"] is None
+    # A cross-site redirect only loses its tracking params; an unreachable host keeps its link
+    assert digest["ai_developments"][2]["url"] == "http://news.test/paywalled"
+    assert digest["companies_to_watch"][0]["url"] == "http://dead.test/page"
+    assert digest["jobs_and_hiring"]["key_insights"][0]["url"] == "http://news.test/no-head"
+    assert stats == {"links": 5, "rewritten": 3, "dead": 1}
+
+
+@pytest.mark.asyncio
+async def test_malformed_sections_are_left_alone():
+    app, _ = stub_site()
+    digest = {
+        "ai_developments": [{"headline": "A", "url": "http://news.test/old"}, "stray text"],
+        "companies_to_watch": None,
+        "jobs_and_hiring": ["Hiring is up", {"url": "http://news.test/gone"}],
+        "featured_resource": "A report",
+    }
+
+    async with stub_client(app) as client:
+        stats = await verify_digest_links(digest, client=client)
+
+    assert digest["ai_developments"][0]["url"] == "http://news.test/article?id=7"
+    assert stats == {"links": 1, "rewritten": 1, "dead": 0}
+
+
+@pytest.mark.asyncio
+async def test_checks_are_bounded_per_host_and_cached(monkeypatch):
+    monkeypatch.setattr(url_verifier, "PER_HOST_LIMIT", 3)
+    app, state = stub_site()
+    urls = [f"http://news.test/slow/{i}" for i in range(12)]
+
+    async with stub_client(app) as client:
+        first = await verify_urls(urls, client)
+        hits = state["hits"]
+        second = await verify_urls(urls, client)
+
+    assert all(r["ok"] for r in first.values())
+    assert state["peak"] == 3
+    assert state["hits"] == hits  # second pass served entirely from the cache
+    assert second == first
@@ -85,6 +85,27 @@ export type DigestListItem = {
   generated_at: string
 }
 
+export type DigestSearchResult = {
+  id: string
+  week_number: number
+  week_start: string
+  rank: number
+  snippet: string
+}
+
+export type TrendSeries = {
+  key: string
+  label: string
+  total: number
+  counts: number[]  // one per entry in weeks
+}
+
+export type DigestTrends = {
+  kind: 'company' | 'industry' | 'topic'
+  weeks: string[]
+  series: TrendSeries[]
+}
+
 export type DigestStats = {
   latest_week_number: number
   total_digests_generated: number
@@ -112,11 +133,42 @@ export const digestAPI = {
   getAll: () => fetchAPI<{ digests: DigestListItem[] }>('/digest/all'),
   getStats: () => fetchAPI<DigestStats>('/digest/stats'),
   getById: (id: string) => fetchAPI<{ digest: Digest }>(`/digest/${id}`),
+  getTrends: (kind: DigestTrends['kind'] = 'company', top = 10) =>
+    fetchAPI<DigestTrends>(`/digest/trends?kind=${kind}&top=${top}`),
+  // Snippets are escaped HTML whose only tags are <mark>…</mark> around matched terms
+  search: (q: string) =>
+    fetchAPI<{ query: string; results: DigestSearchResult[] }>(`/digest/search?q=${encodeURIComponent(q)}`),
   generate: (weekStart?: string) =>
     fetchAPI<{ success: boolean; digest_id: string; week_number: number }>('/digest/generate', {
       method: 'POST',
       body: JSON.stringify(weekStart ? { week_start: weekStart } : {}),
     }),
+  // Server-sent events: one "section" event per digest key as it is written
+  stream: (
+    handlers: {
+      onSection: (key: keyof Digest, value: unknown) => void
+      onDone?: (result: { digest_id: string; week_number: number }) => void
+      onError?: (error: string) => void
+    },
+    weekStart?: string
+  ) => {
+    const query = weekStart ? `?week_start=${encodeURIComponent(weekStart)}` : ''
+    const source = new EventSource(`${BACKEND_URL}/digest/stream${query}`)
+    source.addEventListener('section', (e) => {
+      const { key, value } = JSON.parse((e as MessageEvent).data)
+      handlers.onSection(key, value)
+    })
+    source.addEventListener('done', (e) => {
+      handlers.onDone?.(JSON.parse((e as MessageEvent).data))
+      source.close()
+    })
+    source.addEventListener('error', (e) => {
+      const data = (e as MessageEvent).data
+      handlers.onError?.(data ? JSON.parse(data).error : 'Stream connection lost')
+      source.close()
+    })
+    return source
+  },
 }
 
 export const settingsAPI = {
@@ -133,7 +185,7 @@ export const settingsAPI = {
       body: JSON.stringify(payload),
     }),
   getEmailLog: () =>
-    fetchAPI<{ email_log: Array<{ id: string; week_number: number; subject: string; sent_to: string; sent_at: string; status: string }> }>(
+    fetchAPI<{ email_log: Array<{ id: string; week_number: number; subject: string; sent_to: string; sent_at: string; status: string; size_bytes: number | null }> }>(
       '/settings/email-log'
     ),
 }